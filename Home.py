@@ -1,8 +1,10 @@
 # import libraries
 import streamlit as st
+from utils.instrumentation import rerun
 
 # Set layout
 st.set_page_config(page_title="Interactive Report for Bike Sharing Service", layout="wide")
+rerun('home')
 
 # Display the image
 st.markdown(
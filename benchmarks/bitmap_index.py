@@ -0,0 +1,86 @@
+# import libraries
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.bitmap_index import INDEX_COLUMNS, BitmapIndex
+from utils.synthetic import fit_profile, generate
+
+# Multi-condition slices of the EDA views: a value or a list of values per column
+QUERIES = [
+    ('working days', {'workingday': 1}),
+    ('holidays in summer', {'holiday': 1, 'season': 2}),
+    ('commute hours, good weather', {'workingday': 1, 'hr': [7, 8, 9, 17, 18], 'weathersit': [1, 2]}),
+    ('rainy winter evenings, year 1', {'yr': 1, 'season': 4, 'weathersit': [3, 4], 'hr': [18, 19, 20, 21]}),
+    ('one month, one hour', {'yr': 0, 'mnth': 7, 'hr': 8}),
+]
+
+
+# Synthetic rows with only the indexed columns and the count, in compact dtypes
+def make_data(rows, seed=0):
+    profile = fit_profile()
+    cities = max(1, -(-rows // 17_520))
+    chunks, total = [], 0
+    for chunk in generate(years=2, cities=cities, seed=seed, profile=profile):
+        chunk = chunk[INDEX_COLUMNS + ['cnt']].iloc[:rows - total]
+        chunks.append(chunk.astype({column: np.int8 for column in INDEX_COLUMNS} | {'cnt': np.int32}))
+        total += len(chunk)
+        if total >= rows:
+            break
+    return pd.concat(chunks, ignore_index=True)
+
+
+# Current path: build a boolean mask over the whole frame, then gather
+def mask_filter(data, conditions):
+    mask = np.ones(len(data), dtype=bool)
+    for column, values in conditions.items():
+        mask &= data[column].isin(values).to_numpy() if isinstance(values, list) else (data[column] == values).to_numpy()
+    return mask
+
+
+def _best(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-filter slicing with bitmap indexes vs boolean masks.")
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_data(args.rows)
+    start = time.perf_counter()
+    index = BitmapIndex.build(data)
+    print(f"{len(data):,} rows; index built in {time.perf_counter() - start:.1f}s, {index.nbytes / 2**20:.0f} MB "
+          f"(frame {data.memory_usage().sum() / 2**20:.0f} MB)")
+
+    cnt = data['cnt'].to_numpy()
+    print(f"{'query':<32} {'rows':>11} {'mask count ms':>14} {'bitmap count ms':>16} "
+          f"{'mask mean ms':>13} {'bitmap mean ms':>15}")
+    for name, conditions in QUERIES:
+        mask_count_ms, expected = _best(lambda: int(mask_filter(data, conditions).sum()), args.repeats)
+        count_ms, count = _best(lambda: index.count(conditions), args.repeats)
+        mask_mean_ms, mask_mean = _best(lambda: cnt[mask_filter(data, conditions)].mean(), args.repeats)
+        mean_ms, mean = _best(lambda: cnt[index.select(conditions)].mean(), args.repeats)
+        same = count == expected and np.isclose(mean, mask_mean, equal_nan=True)
+        print(f"{name:<32} {count:>11,} {mask_count_ms:>14.1f} {count_ms:>16.1f} {mask_mean_ms:>13.1f} {mean_ms:>15.1f}"
+              f"{'' if same else '  MISMATCH'}")
+
+    # Cross-filtering: counts per hour under the other filters, as a linked histogram would redraw them
+    conditions = {'workingday': 1, 'weathersit': [1, 2], 'season': 3}
+    mask_ms, by_hour = _best(lambda: data.loc[mask_filter(data, conditions), 'hr'].value_counts().sort_index(), args.repeats)
+    bitmap_ms, counts = _best(lambda: index.count_by('hr', conditions), args.repeats)
+    same = by_hour.reindex(range(24), fill_value=0).tolist() == list(counts.values())
+    print(f"\ncross-filter, counts per hour: mask {mask_ms:.1f} ms, bitmap {bitmap_ms:.1f} ms{'' if same else '  MISMATCH'}")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
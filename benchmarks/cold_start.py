@@ -0,0 +1,68 @@
+# import libraries
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+
+PAGES = ['Home.py'] + sorted(glob.glob('pages/*.py'))
+
+# Runs in a fresh interpreter: time the page's import statements, then the first full script run
+_PROBE = r"""
+import json, sys, time
+page, imports = sys.argv[1], sys.argv[2]
+
+start = time.perf_counter()
+exec(imports, {})
+import_seconds = time.perf_counter() - start
+
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(page, default_timeout=600)
+start = time.perf_counter()
+at.run()
+render_seconds = time.perf_counter() - start
+
+errors = [e.message for e in at.exception]
+print(json.dumps({'import_seconds': import_seconds, 'render_seconds': render_seconds, 'error': errors[0] if errors else None}))
+"""
+
+
+# Top-level import statements of a page, as source code
+def _page_imports(page):
+    with open(page, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+# Measure one page in a fresh process, so nothing is already imported or cached
+def measure(page):
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    result = subprocess.run([sys.executable, '-c', _PROBE, page, _page_imports(page)],
+                            capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        return {'import_seconds': None, 'render_seconds': None, 'error': result.stderr.strip().splitlines()[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time and time to first render of every page, each in a fresh process.")
+    parser.add_argument('--repeats', type=int, default=3, help="Best of this many cold runs is reported")
+    args = parser.parse_args()
+
+    print(f"{'page':<50} {'imports s':>10} {'first render s':>15}  error")
+    for page in PAGES:
+        runs = [measure(page) for _ in range(args.repeats)]
+        ok = [run for run in runs if run['render_seconds'] is not None]
+        best = min(ok, key=lambda run: run['render_seconds']) if ok else runs[0]
+        name = os.path.basename(page)
+        if best['render_seconds'] is None:
+            print(f"{name:<50} {'-':>10} {'-':>15}  {best['error']}")
+        else:
+            print(f"{name:<50} {best['import_seconds']:>10.2f} {best['render_seconds']:>15.2f}  {best['error'] or ''}")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
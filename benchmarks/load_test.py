@@ -0,0 +1,170 @@
+# import libraries
+import argparse
+import gc
+import glob
+import json
+import multiprocessing
+import time
+
+import numpy as np
+
+from utils.instrumentation import rss_mb
+
+TIMEOUT = 300
+
+
+# Page file by its number prefix (the file names contain emoji)
+def _page(prefix):
+    return glob.glob(f'pages/{prefix}_*.py')[0]
+
+
+def _widget(elements, label):
+    return next(element for element in elements if element.label == label)
+
+
+# Scripted interactions per page: every step triggers one rerun of the script
+def _eda_steps():
+    steps = [lambda at: at.run()]
+    for label, options in [
+        ("Select View", ["Month", "Season", "Weekday", "Working/Non-Working Day"]),
+        ("Select Day Type", ["Working Days", "Holidays", "All Days"]),
+        ("Select Analysis Type", ["Temperature Buckets", "Weather Condition", "Wind Condition"]),
+    ]:
+        for option in options:
+            steps.append(lambda at, label=label, option=option: _widget(at.selectbox, label).set_value(option).run())
+    return steps
+
+
+def _prediction_steps():
+    return [
+        lambda at: at.run(),
+        lambda at: _widget(at.selectbox, "Select Time").set_value("08:00").run(),
+        lambda at: _widget(at.slider, "Temperature (°C)").set_value(28.0).run(),
+        lambda at: _widget(at.selectbox, "Weather Situation").set_value("🌦️ Light Rain/Snow").run(),
+        lambda at: _widget(at.button, "Predict Bike Demand").click().run(),
+    ]
+
+
+SCENARIOS = {
+    'home': ('Home.py', lambda: [lambda at: at.run()]),
+    'cleaning': (_page(1), lambda: [lambda at: at.run()]),
+    'eda': (_page(2), _eda_steps),
+    'modeling': (_page(3), lambda: [lambda at: at.run()]),
+    'prediction': (_page(4), _prediction_steps),
+    'recommendations': (_page(5), lambda: [lambda at: at.run()]),
+}
+
+
+# One simulated session: open every page and go through its interactions, timing each rerun
+def run_session(pages, iterations=1):
+    from streamlit.testing.v1 import AppTest
+
+    timings = {page: [] for page in pages}
+    errors = {page: set() for page in pages}
+    for _ in range(iterations):
+        for page in pages:
+            path, steps = SCENARIOS[page]
+            at = AppTest.from_file(path, default_timeout=TIMEOUT)
+            for step in steps():
+                start = time.perf_counter()
+                try:
+                    step(at)
+                except Exception as e:  # a failed interaction still counts as a (failed) rerun
+                    errors[page].add(f"{type(e).__name__}: {e}")
+                timings[page].append((time.perf_counter() - start) * 1000)
+                errors[page].update(exception.message for exception in at.exception)
+                if at.exception:
+                    break
+    return timings, {page: sorted(messages) for page, messages in errors.items()}
+
+
+# N concurrent sessions, each in its own process (AppTest itself is not thread-safe)
+def concurrent_sessions(pages, sessions, iterations):
+    context = multiprocessing.get_context('spawn')
+    start = time.perf_counter()
+    with context.Pool(sessions) as pool:
+        results = pool.starmap(run_session, [(pages, iterations)] * sessions)
+    wall = time.perf_counter() - start
+
+    report = {}
+    for page in pages:
+        timings = np.concatenate([timing[page] for timing, _ in results])
+        report[page] = {
+            'reruns': len(timings),
+            'p50_ms': round(float(np.percentile(timings, 50)), 1),
+            'p90_ms': round(float(np.percentile(timings, 90)), 1),
+            'p99_ms': round(float(np.percentile(timings, 99)), 1),
+            'errors': sorted({message for _, error in results for message in error[page]}),
+        }
+    total_reruns = sum(page['reruns'] for page in report.values())
+    return report, {'wall_seconds': round(wall, 2), 'reruns_per_second': round(total_reruns / wall, 2)}
+
+
+# Memory growth per session: keep sessions alive in one process, like a server does, and watch RSS
+def memory_per_session(pages, sessions):
+    from streamlit.testing.v1 import AppTest
+
+    run_session(pages)  # first session pays imports and module-level caches
+    gc.collect()
+    baseline = rss_mb()
+    alive = []
+    for _ in range(sessions):
+        for page in pages:
+            path, steps = SCENARIOS[page]
+            at = AppTest.from_file(path, default_timeout=TIMEOUT)
+            for step in steps():
+                step(at)
+                if at.exception:
+                    break
+            alive.append(at)
+    gc.collect()
+    return round((rss_mb() - baseline) / sessions, 2)
+
+
+def _memory_worker(pages, sessions, queue):
+    queue.put(memory_per_session(pages, sessions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the pages with N concurrent simulated sessions.")
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=1, help="Times each session goes through all pages")
+    parser.add_argument('--pages', default=','.join(SCENARIOS))
+    parser.add_argument('--output', help="Write the results as JSON")
+    parser.add_argument('--baseline', help="JSON written by an earlier run, to compare p90 latencies against")
+    args = parser.parse_args()
+
+    pages = args.pages.split(',')
+    report, totals = concurrent_sessions(pages, args.sessions, args.iterations)
+
+    # Memory is measured in a fresh process so the numbers do not include this process
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_memory_worker, args=(pages, args.sessions, queue))
+    process.start()
+    totals['mb_per_session'] = queue.get()
+    process.join()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['pages']
+
+    print(f"sessions={args.sessions} wall={totals['wall_seconds']}s throughput={totals['reruns_per_second']} reruns/s "
+          f"memory={totals['mb_per_session']} MB/session")
+    print(f"{'page':<16} {'reruns':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'vs base':>8}  errors")
+    for page, stats in report.items():
+        change = ''
+        if baseline and page in baseline:
+            change = f"{(stats['p90_ms'] / baseline[page]['p90_ms'] - 1) * 100:+.0f}%"
+        print(f"{page:<16} {stats['reruns']:>7} {stats['p50_ms']:>9} {stats['p90_ms']:>9} {stats['p99_ms']:>9} {change:>8}  "
+              f"{'; '.join(stats['errors'])}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'sessions': args.sessions, 'iterations': args.iterations, 'totals': totals, 'pages': report}, f, indent=2)
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
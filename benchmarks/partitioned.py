@@ -0,0 +1,74 @@
+# import libraries
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from utils.cleaning import denormalize, merge_timestamp
+from utils.partitioned import build, matching_files, open_dataset, query
+from utils.synthetic import generate, write
+
+# Selective EDA-style queries: (name, columns, filters); the full-load path filters the same rows in memory
+QUERIES = [
+    ('working days, hourly profile', ['hr', 'cnt'], [('workingday', '==', 1)]),
+    ('one year, monthly totals', ['mnth', 'cnt'], [('yr', '==', 1)]),
+    ('summer of one year', ['temp', 'cnt'], [('yr', '==', 0), ('mnth', 'in', [6, 7, 8])]),
+    ('one month of one city', ['dteday', 'hr', 'cnt'], [('yr', '==', 1), ('mnth', '==', 7), ('city', '==', 3)]),
+]
+
+
+# Boolean mask of the same filters on an in-memory frame
+def _mask(data, filters):
+    mask = pd.Series(True, index=data.index)
+    for column, op, value in filters:
+        mask &= data[column].isin(value) if op == 'in' else data[column] == value
+    return mask
+
+
+# Current path: read the whole CSV, clean it, then filter and project in memory
+def full_load(path, columns, filters):
+    data = denormalize(merge_timestamp(pd.read_csv(path)).drop(columns='instant')).reset_index()
+    return data.loc[_mask(data, filters), columns]
+
+
+def _time(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Selective queries on the partitioned dataset vs loading the full CSV.")
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--cities', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, root = os.path.join(tmp, 'hour.csv'), os.path.join(tmp, 'partitioned')
+        rows = write(generate(args.years, args.cities), csv_path)
+        start = time.perf_counter()
+        build(csv_path, root)
+        print(f"{rows:,} rows, {args.cities} cities; partitioned in {time.perf_counter() - start:.1f}s, "
+              f"CSV {os.path.getsize(csv_path) / 2**20:.0f} MB")
+
+        dataset = open_dataset(root)
+        total_files = len(matching_files(root, dataset=dataset))
+        print(f"{'query':<32} {'full load s':>12} {'partitioned s':>14} {'speedup':>8} {'files read':>11} {'rows':>10}")
+        for name, columns, filters in QUERIES:
+            full_seconds, expected = _time(lambda: full_load(csv_path, columns, filters), args.repeats)
+            seconds, result = _time(lambda: query(root, columns, filters, dataset), args.repeats)
+            files = len(matching_files(root, filters, dataset))
+            same = len(result) == len(expected) and result['cnt'].sum() == expected['cnt'].sum()
+            print(f"{name:<32} {full_seconds:>12.2f} {seconds:>14.3f} {full_seconds / seconds:>7.0f}x "
+                  f"{f'{files}/{total_files}':>11} {len(result):>10,}{'' if same else '  MISMATCH'}")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
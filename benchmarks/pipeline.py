@@ -0,0 +1,186 @@
+# import libraries
+import argparse
+import datetime
+import importlib.metadata
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.charts import _heatmap_values
+from utils.cleaning import (add_daylight_column, add_temp_buckets, add_wind_buckets, denormalize, encode_features,
+                            merge_timestamp)
+from utils.features import FEATURE_COLUMNS
+from utils.modeling import MODEL_PATHS
+from utils.synthetic import fit_profile, generate, write
+
+SIZES = [17_520, 175_200, 1_752_000]
+PACKAGES = ['pandas', 'numpy', 'scikit-learn', 'xgboost', 'catboost', 'streamlit']
+
+
+# The EDA page's aggregations, with the same expressions as the page (the heatmap through the shared chart helper)
+def _eda_stages():
+    return {
+        'eda.groupby.yearly': lambda d: d.groupby('yr')['cnt'].sum(),
+        'eda.groupby.monthly_delta': lambda d: (d[d['yr'] == 1].groupby('mnth')['cnt'].sum()
+                                                - d[d['yr'] == 0].groupby('mnth')['cnt'].sum()),
+        'eda.resample.monthly': lambda d: pd.DataFrame({column: d[column].resample('M').sum()
+                                                        for column in ['cnt', 'casual', 'registered']}),
+        'eda.groupby.view_distribution': lambda d: [d.groupby(key)[['registered', 'casual']].mean().reset_index()
+                                                    for key in ['season', 'mnth', 'weekday', 'workingday']],
+        'eda.groupby.share': lambda d: [(d.groupby(key)['casual'].sum() / d.groupby(key)['cnt'].sum()).reset_index()
+                                        for key in ['mnth', 'season', 'weekday', 'workingday']],
+        'eda.groupby.hourly': lambda d: d[d['workingday'] == 1].groupby('hr')['cnt'].mean().reset_index(),
+        'eda.groupby.heatmap': lambda d: [_heatmap_values(d, ['hr', key], "Mean")
+                                          for key in ['weathersit', 'temp_buckets', 'wind_buckets']],
+    }
+
+
+# Run every stage once on the CSV at `path`, returning milliseconds per stage
+def run_pipeline(path, models):
+    timings = {}
+
+    def stage(name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[name] = (time.perf_counter() - start) * 1000
+        return result
+
+    data = stage('cleaning.load_csv', pd.read_csv, path)
+    data = stage('cleaning.timestamp_merge', merge_timestamp, data)
+    data = stage('cleaning.denormalize', lambda d: denormalize(d.drop(columns='instant')), data)
+    data = stage('cleaning.add_daylight_column', add_daylight_column, data)
+    data = stage('cleaning.temp_buckets', add_temp_buckets, data)
+    data = stage('cleaning.wind_buckets', add_wind_buckets, data)
+    for name, func in _eda_stages().items():
+        stage(name, func, data)
+
+    features = stage('modeling.encode_features', encode_features, data)[FEATURE_COLUMNS]
+    for name in models:
+        model = stage(f'modeling.load.{name}', joblib.load, MODEL_PATHS[name])
+        stage(f'modeling.predict.{name}', model.predict, features)
+    return timings
+
+
+# Synthetic CSV (same schema as hour.csv) with exactly `rows` rows, two years per city
+def make_dataset(rows, path, profile, seed=0):
+    cities = max(1, -(-rows // 17_520))
+
+    def truncated():
+        remaining = rows
+        for chunk in generate(years=2, cities=cities, seed=seed, profile=profile):
+            yield chunk.iloc[:remaining]
+            remaining -= len(chunk)
+            if remaining <= 0:
+                break
+
+    write(truncated(), path)
+
+
+# Where and with what the numbers were measured
+def environment():
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'packages': versions,
+        'commit': commit,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+# Median of the repeats per size and stage
+def benchmark(sizes, models, repeats):
+    profile = fit_profile()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = os.path.join(tmp, f'hour_{rows}.csv')
+            make_dataset(rows, path, profile)
+            runs = [run_pipeline(path, models) for _ in range(repeats)]
+            results[str(rows)] = {name: round(float(np.median([run[name] for run in runs])), 2) for name in runs[0]}
+            os.remove(path)
+    return results
+
+
+# Stages slower than the baseline by more than `threshold` (relative) and `min_ms` (absolute, to ignore noise)
+def regressions(results, baseline, threshold, min_ms):
+    flagged = []
+    for size, stages in results.items():
+        for name, ms in stages.items():
+            before = baseline.get(size, {}).get(name)
+            if before and ms > before * (1 + threshold) and ms - before > min_ms:
+                flagged.append({'size': size, 'stage': name, 'baseline_ms': before, 'ms': ms, 'change': round(ms / before - 1, 3)})
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the cleaning, EDA and modeling stages on synthetic data of several sizes.")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help="Comma-separated row counts")
+    parser.add_argument('--models', default=','.join(MODEL_PATHS), help="Comma-separated model names")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help="Write the results as JSON; use an earlier output as --baseline")
+    parser.add_argument('--baseline', help="JSON written by an earlier run")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Relative slowdown flagged as a regression")
+    parser.add_argument('--min-ms', type=float, default=5.0, help="Absolute slowdown below which changes are noise")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = benchmark(sizes, args.models.split(','), args.repeats)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    flagged = regressions(results, baseline, args.threshold, args.min_ms)
+    flagged_keys = {(item['size'], item['stage']) for item in flagged}
+
+    stages = list(dict.fromkeys(name for stage_times in results.values() for name in stage_times))
+    print(f"{'stage':<32}" + ''.join(f"{size + ' rows':>18}" for size in results))
+    for name in stages:
+        cells = []
+        for size, stage_times in results.items():
+            if name not in stage_times:
+                cells.append(f"{'skipped':>18}")
+                continue
+            cell = f"{stage_times[name]:.1f} ms"
+            before = baseline.get(size, {}).get(name)
+            if before:
+                cell += f" {(stage_times[name] / before - 1) * 100:+.0f}%" + ('!' if (size, name) in flagged_keys else '')
+            cells.append(f"{cell:>18}")
+        print(f"{name:<32}" + ''.join(cells))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'repeats': args.repeats, 'results': results, 'regressions': flagged},
+                      f, indent=2)
+
+    if flagged:
+        print(f"\n{len(flagged)} regression(s) beyond {args.threshold:.0%}:")
+        for item in flagged:
+            print(f"  {item['stage']} at {item['size']} rows: {item['baseline_ms']} -> {item['ms']} ms")
+        sys.exit(1)
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
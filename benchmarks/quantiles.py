@@ -0,0 +1,84 @@
+# import libraries
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from utils.partitioned import build, query
+from utils.quantiles import ALPHA, QUANTILES, GroupedSketch, _with_buckets, sketch_partitioned, sketch_path
+from utils.synthetic import generate, write
+
+# The groupings of the EDA heatmaps
+GROUPINGS = [['hr', 'weathersit'], ['hr', 'temp_buckets'], ['hr', 'wind_buckets']]
+
+
+def _time(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+# Exact quantiles of every grouping with pandas (a sort per group)
+def exact_quantiles(data, interpolation='linear'):
+    return [data.groupby(by, observed=True)['cnt'].quantile(QUANTILES, interpolation=interpolation).unstack()
+            for by in GROUPINGS]
+
+
+# Largest relative error of the sketch quantiles over all groups and quantiles (groups with a zero quantile excluded)
+def max_relative_error(sketches, exact):
+    errors = []
+    for sketch, truth in zip(sketches, exact):
+        truth = truth.loc[sketch.groups]
+        errors.append(np.nanmax(((sketch.quantiles() - truth).abs() / truth.where(truth > 0)).to_numpy()))
+    return max(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merged per-partition quantile sketches vs exact groupby().quantile().")
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--cities', type=int, default=200)
+    parser.add_argument('--workers', type=int, help="Processes for the sketches, default one per CPU")
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, root = os.path.join(tmp, 'hour.csv'), os.path.join(tmp, 'partitioned')
+        rows = write(generate(args.years, args.cities), csv_path)
+        build(csv_path, root)
+        print(f"{rows:,} rows, {args.cities} cities, {os.cpu_count()} CPUs; p50/p90/p99 of hourly rentals per "
+              f"{', '.join('x'.join(by) for by in GROUPINGS)}\n")
+
+        # End to end from the partitioned dataset: load everything and sort, or sketch partitions in parallel and merge
+        load = lambda: _with_buckets(query(root, ['hr', 'weathersit', 'temp', 'windspeed', 'cnt']))
+        exact_seconds, exact = _time(lambda: exact_quantiles(load()), args.repeats)
+        sketch_seconds, sketches = _time(lambda: sketch_partitioned(root, GROUPINGS, workers=args.workers), args.repeats)
+
+        # Served from the merged sketches stored once per data refresh (`python -m utils.quantiles --save`)
+        for by, sketch in zip(GROUPINGS, sketches):
+            sketch.save(sketch_path(by, tmp))
+        stored_seconds, _ = _time(lambda: [GroupedSketch.load(sketch_path(by, tmp)).quantiles() for by in GROUPINGS],
+                                  args.repeats)
+
+        # In memory only: same frame, no reading
+        data = load()
+        memory_exact_seconds, _ = _time(lambda: exact_quantiles(data), args.repeats)
+        memory_sketch_seconds, _ = _time(lambda: [GroupedSketch.build(data, by) for by in GROUPINGS], args.repeats)
+
+        print(f"{'':<34} {'exact s':>8} {'sketch s':>9}")
+        print(f"{'partitioned dataset, end to end':<34} {exact_seconds:>8.2f} {sketch_seconds:>9.2f}")
+        print(f"{'stored merged sketches':<34} {'':>8} {stored_seconds:>9.3f}")
+        print(f"{'in memory':<34} {memory_exact_seconds:>8.2f} {memory_sketch_seconds:>9.2f}")
+        print(f"\nSketch size: {sum(s.nbytes() for s in sketches) / 1024:.0f} KB for "
+              f"{sum(len(s.groups) for s in sketches)} groups (alpha = {ALPHA})")
+        print(f"Max relative error vs exact, interpolation='lower':  {max_relative_error(sketches, exact_quantiles(data, 'lower')):.4f}")
+        print(f"Max relative error vs exact, interpolation='linear': {max_relative_error(sketches, exact):.4f}")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
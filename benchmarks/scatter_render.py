@@ -0,0 +1,40 @@
+# import libraries
+import argparse
+import time
+
+import numpy as np
+
+from utils.charts import SCATTER_MODES, prediction_scatter_figure, scatter_mode
+
+
+# Build time and serialized size (what the browser receives) of the predictions vs actual figure per mode
+def measure(points, mode, seed=0):
+    rng = np.random.default_rng(seed)
+    y_test = rng.gamma(2.0, 95.0, points)  # skewed like the hourly counts
+    y_pred = y_test + rng.normal(0, 40, points)
+    start = time.perf_counter()
+    payload = prediction_scatter_figure(y_test, y_pred, 'catboost', mode).to_json()
+    return (time.perf_counter() - start) * 1000, len(payload) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of the actual vs predicted figure per rendering mode and size.")
+    parser.add_argument('--sizes', default='3500,50000,500000,5000000', help="Comma-separated point counts")
+    parser.add_argument('--max-point-mode-size', type=int, default=500_000,
+                        help="Skip the per-point modes (svg, webgl) above this size")
+    args = parser.parse_args()
+
+    measure(1_000, 'svg')  # the first figure pays plotly's lazy imports
+    print(f"{'points':>10} {'mode':>14} {'build + serialize ms':>21} {'payload KB':>11}")
+    for points in map(int, args.sizes.split(',')):
+        for mode in SCATTER_MODES:
+            if mode in ('svg', 'webgl') and points > args.max_point_mode_size:
+                continue
+            ms, kb = measure(points, mode)
+            label = f"auto={scatter_mode(points)}" if mode == 'auto' else mode
+            print(f"{points:>10,} {label:>14} {ms:>21.0f} {kb:>11,.0f}")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# import libraries
+import argparse
+import tempfile
+import time
+
+import pandas as pd
+
+from utils.explain import cached_shap_values, shap_values
+from utils.modeling import load_cleaned_data, load_model, split_features_target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of CatBoost SHAP explanations: per row, batched and cached.")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--per-row-sample', type=int, default=200, help="Rows explained one by one, extrapolated to --rows")
+    args = parser.parse_args()
+
+    # Repeat the cleaned features until there are enough rows, with a unique hourly index
+    X, _ = split_features_target(load_cleaned_data())
+    X = pd.concat([X] * -(-args.rows // len(X))).iloc[:args.rows]
+    X.index = pd.date_range('2011-01-01', periods=len(X), freq='h', name='dteday')
+    model = load_model('catboost')
+
+    # 1. Naive: one explanation call per row
+    start = time.perf_counter()
+    for i in range(args.per_row_sample):
+        shap_values(model, X.iloc[[i]])
+    per_row = (time.perf_counter() - start) / args.per_row_sample
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # 2. Batched, first call computes and stores the contributions
+        start = time.perf_counter()
+        cached_shap_values(model, X, cache_dir=cache_dir)
+        batched = time.perf_counter() - start
+
+        # 3. Batched, second call is answered from the cache
+        start = time.perf_counter()
+        cached_shap_values(model, X, cache_dir=cache_dir)
+        cached = time.perf_counter() - start
+
+    print(f"rows={len(X):,}")
+    print(f"{'per row (extrapolated)':>24}: {per_row * len(X):8.2f} s")
+    print(f"{'batched, cold':>24}: {batched:8.2f} s")
+    print(f"{'batched, cached':>24}: {cached:8.2f} s")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# import libraries
+import argparse
+import multiprocessing
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+
+from utils.modeling import load_cleaned_data, load_model, unwrap_pipeline
+from utils.shared_matrix import attach, cross_validate, materialize
+
+# Per-process state of the baseline workers
+_worker = {}
+
+
+# Resident memory of a process in kB from /proc/<pid>/status: anonymous (private heap) and file-backed pages
+def _rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            fields = dict(line.split(':', 1) for line in f)
+    except OSError:
+        return None
+    if 'RssAnon' not in fields:  # exiting process
+        return None
+    return int(fields['RssAnon'].split()[0]), int(fields['RssFile'].split()[0])
+
+
+# Sample the pool workers every few milliseconds while func runs and keep each worker's peaks
+def _run_sampled(func, interval=0.005):
+    peaks, done = {}, threading.Event()
+
+    def sample():
+        while not done.is_set():
+            for child in multiprocessing.active_children():
+                rss = _rss_kb(child.pid)
+                if rss is not None:
+                    anon, file = peaks.get(child.pid, (0, 0))
+                    peaks[child.pid] = (max(anon, rss[0]), max(file, rss[1]))
+            time.sleep(interval)
+
+    thread = threading.Thread(target=sample, daemon=True)
+    thread.start()
+    start = time.perf_counter()
+    try:
+        scores = func()
+    finally:
+        done.set()
+        thread.join()
+    return time.perf_counter() - start, scores, peaks
+
+
+# Reference: workers that only unpickle and clone the pipeline, for the interpreter and imports
+def _idle(pipeline):
+    clone(pipeline)
+    time.sleep(0.05)
+    return float('nan')
+
+
+def _cross_validate_idle(pipeline, n_splits, n_workers, mp_context):
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp_context) as pool:
+        return list(pool.map(_idle, [pipeline] * n_splits))
+
+
+# Baseline: every worker receives its own pickled copy of the arrays and indexes the folds with index arrays
+def _init_copy(X, y, columns):
+    _worker['X'], _worker['y'], _worker['columns'] = X, y, columns
+
+
+def _fit_and_score_copy(pipeline, train_idx, test_idx):
+    X, y, columns = _worker['X'], _worker['y'], _worker['columns']
+    model = clone(pipeline)
+    model.fit(pd.DataFrame(X[train_idx], columns=columns), y[train_idx])
+    y_pred = model.predict(pd.DataFrame(X[test_idx], columns=columns))
+    return float(r2_score(y[test_idx], y_pred))
+
+
+def _cross_validate_copy(pipeline, X, y, columns, n_splits, n_workers, mp_context):
+    folds = KFold(n_splits=n_splits).split(np.empty((len(y), 1)))
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp_context,
+                             initializer=_init_copy, initargs=(X, y, columns)) as pool:
+        futures = [pool.submit(_fit_and_score_copy, pipeline, train_idx, test_idx) for train_idx, test_idx in folds]
+        return [future.result() for future in futures]
+
+
+# Repeat the cleaned data until it has the requested number of rows
+def _scaled_data(rows):
+    data = load_cleaned_data()
+    repeats = -(-rows // len(data))
+    data = pd.concat([data] * repeats).iloc[:rows]
+    data.index = pd.date_range(data.index[0], periods=rows, freq='h')
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runtime and per-worker memory of cross_validate(): pickled copies "
+                                                 "with index arrays vs. slices of the shared memory-mapped matrix.")
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--workers', default='1,2,4')
+    parser.add_argument('--model', default='linear', choices=['linear', 'xgb', 'catboost'])
+    parser.add_argument('--splits', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=3, help="Best runtime of this many runs per mode is reported")
+    parser.add_argument('--skip-copy', action='store_true', help="Only run the shared memory-mapped variant")
+    args = parser.parse_args()
+
+    data = _scaled_data(args.rows)
+    pipeline = unwrap_pipeline(load_model(args.model))
+    # Spawned workers pickle their arguments the same way joblib/loky or a non-fork platform would do it
+    context = multiprocessing.get_context('spawn')
+
+    with tempfile.TemporaryDirectory() as matrix_dir:
+        manifest = materialize(data, matrix_dir, n_splits=args.splits)
+        del data
+        X, y, _ = attach(matrix_dir)
+        rows, columns = manifest['rows'], manifest['columns']
+        print(f"rows={rows:,} columns={len(columns)} matrix={X[:rows].nbytes / 2**20:.1f} MB "
+              f"ring file={X.nbytes / 2**20:.1f} MB model={args.model} folds={args.splits}")
+        print(f"{'workers':>8} {'mode':>8} {'seconds':>8} {'mean R2':>8} "
+              f"{'max worker RSS MB':>18} {'private MB':>11} {'memmap MB':>10} {'private over idle MB':>21}")
+
+        for n_workers in [int(n) for n in args.workers.split(',')]:
+            _, _, peaks = _run_sampled(lambda: _cross_validate_idle(pipeline, args.splits, n_workers, context))
+            idle = max(peak[0] for peak in peaks.values()) / 1024
+            modes = [('shared', lambda: cross_validate(pipeline, matrix_dir, n_workers=n_workers, mp_context=context))]
+            if not args.skip_copy:
+                X_copy, y_copy = np.array(X[:rows]), np.array(y[:rows])
+                modes.insert(0, ('copy', lambda: _cross_validate_copy(pipeline, X_copy, y_copy, columns, args.splits,
+                                                                      n_workers, context)))
+            # Runtimes include spawning the workers, which dominates at these sizes and varies between runs
+            for mode, run in modes:
+                runs = [_run_sampled(run) for _ in range(args.repeats)]
+                seconds, scores, peaks = min(runs, key=lambda result: result[0])
+                anon = max(peak[0] for peak in peaks.values()) / 1024
+                file = max(peak[1] for peak in peaks.values()) / 1024
+                print(f"{len(peaks):>8} {mode:>8} {seconds:>8.2f} {np.mean(scores):>8.3f} "
+                      f"{anon + file:>18.1f} {anon:>11.1f} {file:>10.1f} {anon - idle:>21.1f}")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# import libraries
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.synthetic import generate
+from utils.validation import fill_gaps, format_report, validate
+
+
+def _time(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+# Synthetic multi-city data with random missing hours and a few broken rows of every kind
+def make_data(rows, missing_rate, seed=0):
+    cities = max(1, -(-rows // 17_544))
+    data = pd.concat(generate(2, cities, seed=seed, missing_rate=missing_rate), ignore_index=True)
+    rng = np.random.default_rng(seed)
+    broken = rng.choice(len(data), 5, replace=False)
+    data.loc[broken[0], 'hum'] = 1.3
+    data.loc[broken[1], 'weathersit'] = 0
+    data.loc[broken[2], 'cnt'] += 1
+    data.loc[broken[3], 'temp'] = np.nan
+    data.loc[broken[4], ['city', 'dteday', 'hr']] = data.loc[broken[4] - 1, ['city', 'dteday', 'hr']].to_numpy()
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runtime of the ingest validation and gap filling on synthetic data.")
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--missing-rate', type=float, default=0.01)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--fill-rows', type=int, default=2_000_000,
+                        help="Rows passed to fill_gaps (the filled copy needs as much memory as the input); 0 skips it")
+    args = parser.parse_args()
+
+    data = make_data(args.rows, args.missing_rate)
+    seconds, report = _time(lambda: validate(data), args.repeats)
+    print(format_report(report))
+    print(f"\n{'step':<36} {'seconds':>8}")
+    print(f"{'isnull().sum() (previous check)':<36} {_time(lambda: data.isnull().sum(), args.repeats)[0]:>8.3f}")
+    print(f"{'validate, date strings':<36} {seconds:>8.3f}")
+    data['dteday'] = pd.to_datetime(data['dteday'])
+    print(f"{'validate, parsed dates':<36} {_time(lambda: validate(data), args.repeats)[0]:>8.3f}")
+
+    if args.fill_rows:
+        data = data.iloc[:args.fill_rows].drop_duplicates(['city', 'dteday', 'hr'])
+        seconds, filled = _time(lambda: fill_gaps(data), 1)
+        print(f"{f'fill_gaps, {len(data):,} rows':<36} {seconds:>8.3f}  ({len(filled) - len(data):,} hours added)")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
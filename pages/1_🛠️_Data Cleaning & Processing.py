@@ -1,11 +1,20 @@
 # import libraries
 import streamlit as st
 import pandas as pd
+from utils.cleaning import (RAW_DATA_PATH, add_daylight_column, add_temp_buckets, add_wind_buckets, denormalize,
+                            merge_timestamp)
+from utils.instrumentation import rerun, timed
+from utils.validation import fill_gaps, validate
 
 # Define the main function for the "Modeling" page
 def main():
+    rerun('cleaning')
+
     # - Load data
-    data = pd.read_csv('data/hour.csv')
+    with timed('cleaning.load_csv') as t:
+        data = pd.read_csv(RAW_DATA_PATH)
+        t.rows = len(data)
+    raw = data.copy()  # raw rows for the validation and gap filling in section 3
     
     st.title("🛠️ Data Cleaning & Processing")
 
@@ -27,9 +36,8 @@ def main():
                 2. Combine `dteday` with `hr` to create a complete timestamp.
                 3. Set `dteday` as the index and remove the old index.
                 """)
-    data["dteday"] = pd.to_datetime(data["dteday"], format='%Y-%m-%d')
-    data["dteday"] = data["dteday"] + pd.to_timedelta(data['hr'], unit='h')
-    data.set_index('dteday', inplace=True)
+    with timed('cleaning.timestamp_merge', rows=len(data)):
+        data = merge_timestamp(data)
     
     # Display the data after transformation
     st.write("#### Data Table after Date Transformation")
@@ -42,9 +50,39 @@ def main():
         st.success("No missing values detected in the dataset.")
     else:
         st.write("Here is the count of missing values per column:")
+        import plotly.express as px
         fig_nulls = px.bar(null_values[null_values['# of nulls'] > 0], y='# of nulls', title="Missing Values by Column")
         st.plotly_chart(fig_nulls)
 
+    # 3.1 Data quality checks on whole columns of the raw data (the missing hours are handled in 3.2)
+    st.subheader("Data Quality Checks")
+    with timed('cleaning.validate', rows=len(raw)):
+        report = validate(raw, allow_gaps=True)
+    checks = pd.DataFrame([{'Check': name, 'Failed rows': check['failed'], 'Example rows': str(check['examples'])}
+                           for name, check in report['checks'].items()])
+    st.dataframe(checks, hide_index=True)
+    if report['passed']:
+        st.success("Weather ranges, category codes, `casual + registered = cnt` and unique timestamps: all checks passed.")
+    else:
+        st.error("Some rows failed the data quality checks, see the table above.")
+
+    # 3.2 Missing hours: comparison with a complete hourly index
+    st.subheader("Missing Hours")
+    st.write(f"The dataset has {report['rows']:,} rows, but the period from the first to the last timestamp covers "
+             f"{report['expected_rows']:,} hours: **{report['missing_hours']} hours are missing** in "
+             f"{report['gaps']} gaps. The longest gaps:")
+    st.dataframe(pd.DataFrame(report['longest_gaps'], columns=['start', 'hours']), hide_index=True)
+
+    gap_fill = st.radio("Missing Hours", ['Keep gaps', 'Fill with zero rentals', 'Interpolate'], horizontal=True)
+    if gap_fill != 'Keep gaps':
+        counts, weather = ('zero', 'ffill') if gap_fill == 'Fill with zero rentals' else ('interpolate', 'interpolate')
+        with timed('cleaning.fill_gaps', rows=len(raw)):
+            filled = fill_gaps(raw, counts, weather)
+        data = merge_timestamp(filled)
+        st.info(f"{len(filled) - len(raw)} hours added: calendar columns from the calendar, "
+                f"rentals {'set to zero' if counts == 'zero' else 'interpolated'}, weather "
+                f"{'carried forward' if weather == 'ffill' else 'interpolated'}.")
+
     # 4. Dropping irrelevant columns
     st.header("4. Removing Irrelevant Columns")
     st.write("The `instant` column is dropped as it is irrelevant.")
@@ -61,10 +99,8 @@ def main():
                 - `hum`: Scaled to represent percentage.
                 - `windspeed`: Scaled to represent speed in m/s.
                 """)
-    data['temp'] = data['temp'] * 41
-    data['atemp'] = data['atemp'] * 50
-    data['hum'] = data['hum'] * 100
-    data['windspeed'] = data['windspeed'] * 67
+    with timed('cleaning.denormalize', rows=len(data)):
+        data = denormalize(data)
 
     # Display the data after denormalization
     st.write("#### Data Table after Denormalization")
@@ -83,34 +119,8 @@ def main():
                 - **Winter**: 7:00 AM to 5:00 PM
                 """)
 
-    def add_daylight_column(data):
-        data['daylight'] = 0  # Initialize the daylight column
-
-        daylight_hours = {
-            1: (7, 0, 19, 0),  # Spring: 7:00 - 19:00
-            2: (6, 0, 21, 0),  # Summer: 6:00 - 21:00
-            3: (7, 0, 19, 0),  # Fall: 7:00 - 19:00
-            4: (7, 0, 17, 0)   # Winter: 7:00 - 17:00
-        }
-
-        # Iterate through the DataFrame using the index
-        for i in range(len(data)):
-            row = data.iloc[i]
-            season = row['season']
-            hour = data.index[i].hour
-            minute = data.index[i].minute
-
-            # Retrieve start and end times for the current season
-            start_hour, start_minute, end_hour, end_minute = daylight_hours[season]
-
-            # Check if the time is within daylight hours
-            if ((hour > start_hour or (hour == start_hour and minute >= start_minute)) and
-                (hour < end_hour or (hour == end_hour and minute <= end_minute))):
-                data.at[data.index[i], 'daylight'] = 1  # Set daylight to 1 if within daylight hours
-
-        return data
-    
-    data = add_daylight_column(data)
+    with timed('cleaning.add_daylight_column', rows=len(data)):
+        data = add_daylight_column(data)
     st.write("#### Data Table after Adding 'Daylight' Column")
     st.dataframe(data[['season', 'daylight']].head())
 
@@ -121,12 +131,9 @@ def main():
                 """)
     
     # 6.2 Temperature buckets
-    # Define temperature buckets in 5-degree intervals
-    bins = [0, 5, 10, 15, 20, 25, 30, 35, 40]
-    labels = ['0-5', '6-10', '11-15', '16-20', '21-25', '26-30', '31-35', '36-40']
-
-    # Apply the temperature bucketing
-    data['temp_buckets'] = pd.cut(data['temp'], bins=bins, labels=labels, right=False)
+    # Apply the temperature bucketing (5-degree intervals)
+    with timed('cleaning.temp_buckets', rows=len(data)):
+        data = add_temp_buckets(data)
     st.write("#### Data Table after Adding 'Temperature Buckets' Column")
     st.dataframe(data[['temp', 'temp_buckets']].head())
 
@@ -136,12 +143,9 @@ def main():
             """)
 
     # 6.3 Wind buckets
-    # Define wind speed buckets with descriptive labels
-    bins = [0, 10, 20, 30, 40, 50, 60]
-    labels = ['Calm', 'Light', 'Moderate', 'Fresh', 'Strong', 'Gale']
-
-    # Apply wind speed bucketing
-    data['wind_buckets'] = pd.cut(data['windspeed'], bins=bins, labels=labels, right=False)
+    # Apply wind speed bucketing (descriptive labels)
+    with timed('cleaning.wind_buckets', rows=len(data)):
+        data = add_wind_buckets(data)
     
     st.write("#### Data Table after Adding 'Wind Buckets' Column")
     st.dataframe(data[['windspeed', 'wind_buckets']].head())
@@ -1,28 +1,31 @@
 # import libraries
+import os
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objs as go
-import matplotlib.pyplot as plt
-import seaborn as sns
 import joblib
-from datetime import datetime, timedelta
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
 from sklearn import set_config
 from sklearn.utils import estimator_html_repr
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from utils.charts import MODEL_TITLES, SCATTER_MODES, prediction_scatter_figure, scatter_mode
+from utils.fusion import fuse_linear_pipeline
+from utils.instrumentation import rerun, timed
+from utils.modeling import RF_MODEL_PATH
+from utils.warmup import get_model
 
 
 # Define the main function for the "Modeling" page
 def main():    
+    rerun('modeling')
+
     # - Load data and model
-    data_cleaned = pd.read_csv('data/data_cleaned.csv')
-    linear_model = joblib.load('data/trained_linear_model.pkl')
-    rf_model = joblib.load('data/trained_rf_model.pkl')
-    xgb_model = joblib.load('data/trained_xgb_model.pkl')
-    catboost_model = joblib.load('data/trained_catboost_model.pkl')
+    with timed('modeling.load_csv') as t:
+        data_cleaned = pd.read_csv('data/data_cleaned.csv')
+        t.rows = len(data_cleaned)
+    linear_model = get_model('linear')
+    rf_model = joblib.load(RF_MODEL_PATH) if os.path.exists(RF_MODEL_PATH) else None
+    xgb_model = get_model('xgb')
+    catboost_model = get_model('catboost')
     
     st.title("Modeling")
 
@@ -61,10 +64,11 @@ def main():
     # 2. Pipeline visualization
     st.header("2. Pipeline Visualization")
 
-    linear_pipeline_html = estimator_html_repr(linear_model)
-    rf_pipeline_html = estimator_html_repr(rf_model)
-    xgb_pipeline_html = estimator_html_repr(xgb_model)
-    catboost_pipeline_html = estimator_html_repr(catboost_model)
+    with timed('modeling.pipeline_html'):
+        linear_pipeline_html = estimator_html_repr(linear_model)
+        rf_pipeline_html = estimator_html_repr(rf_model) if rf_model is not None else None
+        xgb_pipeline_html = estimator_html_repr(xgb_model)
+        catboost_pipeline_html = estimator_html_repr(catboost_model)
 
     # Create columns for each model pipeline to display them side-by-side
     col1, col2 = st.columns(2)
@@ -75,7 +79,10 @@ def main():
 
     with col2:
         st.write("#### Random Forest")
-        st.components.v1.html(rf_pipeline_html, height=250, scrolling=True)
+        if rf_pipeline_html is None:
+            st.info("The Random Forest model file is not available.")
+        else:
+            st.components.v1.html(rf_pipeline_html, height=250, scrolling=True)
 
     col3, col4 = st.columns(2)
 
@@ -98,41 +105,24 @@ def main():
     # Split data into train and test
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
-    # Use pre-trained models to make predictions
-    y_pred_linear = linear_model.predict(X_test)
-    y_pred_rf = rf_model.predict(X_test)
-    y_pred_xgb = xgb_model.predict(X_test)
-    y_pred_catboost = catboost_model.predict(X_test)
-
-    # Calculate metrics for Linear Regression
-    mae_linear = mean_absolute_error(y_test, y_pred_linear)
-    mse_linear = mean_squared_error(y_test, y_pred_linear)
-    r2_linear = r2_score(y_test, y_pred_linear)
-
-    # Calculate metrics for Random Forest
-    mae_rf = mean_absolute_error(y_test, y_pred_rf)
-    mse_rf = mean_squared_error(y_test, y_pred_rf)
-    r2_rf = r2_score(y_test, y_pred_rf)
-
-    # Calculate metrics for XG Boost
-    mae_xgb = mean_absolute_error(y_test, y_pred_xgb)
-    mse_xgb = mean_squared_error(y_test, y_pred_xgb)
-    r2_xgb = r2_score(y_test, y_pred_xgb)
-
-    # Calculate metrics for Cat Boost
-    mae_catboost = mean_absolute_error(y_test, y_pred_catboost)
-    mse_catboost = mean_squared_error(y_test, y_pred_catboost)
-    r2_catboost = r2_score(y_test, y_pred_catboost)
+    # Use pre-trained models to make predictions (the Random Forest only when its file is present); the linear
+    # pipeline is scored as one fused dot product with the same predictions (utils/fusion.py)
+    models = {'linear': fuse_linear_pipeline(linear_model), 'rf': rf_model, 'xgb': xgb_model, 'catboost': catboost_model}
+    predictions = {}
+    for name, model in models.items():
+        if model is not None:
+            with timed(f'modeling.predict.{name}', rows=len(X_test)):
+                predictions[name] = model.predict(X_test)
 
     # 3.1 Display metrics in a table format
     st.subheader("3.1 Model Metrics")
 
     # Create a DataFrame for metrics
     metrics_data = {
-        "Model": ["Linear Regression", "Random Forest", "XG Boost", "Cat Boost"],
-        "MAE": [f"{mae_linear:.2f}", f"{mae_rf:.2f}", f"{mae_xgb:.2f}", f"{mae_catboost:.2f}"],
-        "MSE": [f"{mse_linear:.2f}", f"{mse_rf:.2f}", f"{mse_xgb:.2f}", f"{mse_catboost:.2f}"],
-        "R² Score": [f"{r2_linear:.2f}", f"{r2_rf:.2f}", f"{r2_xgb:.2f}", f"{r2_catboost:.2f}"]
+        "Model": [MODEL_TITLES[name] for name in predictions],
+        "MAE": [f"{mean_absolute_error(y_test, y_pred):.2f}" for y_pred in predictions.values()],
+        "MSE": [f"{mean_squared_error(y_test, y_pred):.2f}" for y_pred in predictions.values()],
+        "R² Score": [f"{r2_score(y_test, y_pred):.2f}" for y_pred in predictions.values()]
     }
     metrics_df = pd.DataFrame(metrics_data)
 
@@ -168,82 +158,24 @@ def main():
     st.markdown(metrics_table_html, unsafe_allow_html=True)
 
 
-    # Create a row with two columns
+    # Create two rows with two columns, one scatter per model
     st.subheader("3.2 Predictions vs Actual")
-    col1, col2 = st.columns(2)
-
-    # Linear Regression Plot in the first column
-    with col1:
-        fig1 = px.scatter(
-            x=y_test, 
-            y=y_pred_linear, 
-            labels={'x': 'Actual Values', 'y': 'Predicted Values'}, 
-            title="Linear Regression: Predictions vs Actual"
-        )
-        fig1.add_shape(
-            type="line", 
-            x0=y_test.min(), y0=y_test.min(), 
-            x1=y_test.max(), y1=y_test.max(),
-            line=dict(color="red", dash="dash")
-        )
-        fig1.update_traces(marker=dict(size=8, color="blue", line=dict(width=1, color="black")))
-        st.plotly_chart(fig1)
-
-    # Random Forest Plot in the second column
-    with col2:
-        fig2 = px.scatter(
-            x=y_test, 
-            y=y_pred_rf, 
-            labels={'x': 'Actual Values', 'y': 'Predicted Values'}, 
-            title="Random Forest: Predictions vs Actual"
-        )
-        fig2.add_shape(
-            type="line", 
-            x0=y_test.min(), y0=y_test.min(), 
-            x1=y_test.max(), y1=y_test.max(),
-            line=dict(color="red", dash="dash")
-        )
-        fig2.update_traces(marker=dict(size=8, color="orange", line=dict(width=1, color="black")))
-        st.plotly_chart(fig2)
-
-    st.markdown("---")
-
-    # XGBoost and CatBoost Performance Plot
-    col3, col4 = st.columns(2)
 
-    # XGBoost Plot in the first column
-    with col3:
-        fig3 = px.scatter(
-            x=y_test, 
-            y=y_pred_xgb, 
-            labels={'x': 'Actual Values', 'y': 'Predicted Values'}, 
-            title="XG Boost: Predictions vs Actual"
-        )
-        fig3.add_shape(
-            type="line", 
-            x0=y_test.min(), y0=y_test.min(), 
-            x1=y_test.max(), y1=y_test.max(),
-            line=dict(color="red", dash="dash")
-        )
-        fig3.update_traces(marker=dict(size=8, color="green", line=dict(width=1, color="black")))
-        st.plotly_chart(fig3)
-
-    # CatBoost Plot in the second column
-    with col4:
-        fig4 = px.scatter(
-            x=y_test, 
-            y=y_pred_catboost, 
-            labels={'x': 'Actual Values', 'y': 'Predicted Values'}, 
-            title="Cat Boost: Predictions vs Actual"
-        )
-        fig4.add_shape(
-            type="line", 
-            x0=y_test.min(), y0=y_test.min(), 
-            x1=y_test.max(), y1=y_test.max(),
-            line=dict(color="red", dash="dash")
-        )
-        fig4.update_traces(marker=dict(size=8, color="red", line=dict(width=1, color="black")))
-        st.plotly_chart(fig4)
+    # Large evaluation sets are drawn with WebGL or as a binned density instead of one SVG marker per point
+    mode = st.radio("Scatter Rendering", SCATTER_MODES, horizontal=True,
+                    format_func=lambda option: {'auto': 'Auto', 'svg': 'SVG', 'webgl': 'WebGL', 'density': 'Density'}[option])
+    st.caption(f"{len(y_test):,} test points, drawn as {scatter_mode(len(y_test), mode).upper()}.")
+    for row, pair in enumerate([('linear', 'rf'), ('xgb', 'catboost')]):
+        if row:
+            st.markdown("---")
+        for column, name in zip(st.columns(2), pair):
+            with column:
+                if name not in predictions:
+                    st.info(f"{MODEL_TITLES[name]}: model file not available.")
+                    continue
+                fig = prediction_scatter_figure(y_test, predictions[name], name, mode)
+                with timed('modeling.render.scatter', rows=len(y_test)):
+                    st.plotly_chart(fig)
 
     # 4. Title and introductory text with markdown
     st.markdown("### Model Selected: CatBoost")
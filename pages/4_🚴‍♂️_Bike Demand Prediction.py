@@ -2,25 +2,35 @@
 import streamlit as st
 import pandas as pd
 import joblib
+import os
 from datetime import datetime, timedelta
-import numpy as np
-
-# Load data and model
-data_cleaned = pd.read_csv('data/data_cleaned.csv')
-catboost_model = joblib.load('data/trained_catboost_model.pkl')
-
-# Define the function that returns the season based on the selected date
-def get_season(date):
-    month = date.month
-    # Define season based on the month and day
-    if (month >= 3 and month <= 5):  # March to May
-        return "Spring"
-    elif (month >= 6 and month <= 8):  # June to August
-        return "Summer"
-    elif (month >= 9 and month <= 11):  # September to November
-        return "Autumn"
-    else:  # December to February
-        return "Winter"
+from utils.calendar_table import lookup
+from utils.metadata import load_metadata
+from utils.modeling import FLEET_PATH, LAG_MODEL_PATH
+from utils.instrumentation import rerun, timed
+from utils.monitoring import record_observation
+from utils.warmup import get_model
+
+# Load widget bounds and model (preloaded and warmed up when the app is started with `python -m utils.warmup`)
+metadata = load_metadata()
+catboost_model = get_model('catboost')
+
+# Load the per-segment fleet as well when it has been trained
+fleet_model = joblib.load(FLEET_PATH) if os.path.exists(FLEET_PATH) else None
+
+# Load the model with lag features and the demand history its recent-demand features are computed from
+lag_model = joblib.load(LAG_MODEL_PATH) if os.path.exists(LAG_MODEL_PATH) else None
+if lag_model is not None:
+    from utils.lag_features import features_at
+    data_cleaned = pd.read_csv('data/data_cleaned.csv', usecols=['dteday', 'cnt'], parse_dates=['dteday'])
+    demand_history = data_cleaned.set_index('dteday')['cnt']
+
+# Display names of the season codes of hour.csv
+SEASON_NAMES = {1: "Winter", 2: "Spring", 3: "Summer", 4: "Autumn"}
+
+# Weather inputs before the user changes them (Clear, 20 °C, 50 %, 10 m/s); predictions made with all of them left
+# untouched are not recorded for the drift monitor, where they would pile up in one bin of every histogram
+WEATHER_DEFAULTS = {"weathersit_1": 1, "temp": 20.0, "hum": 50.0, "windspeed": 10.0}
     
 # Function to generate a list of times at 15-minute intervals
 def generate_time_options():
@@ -47,62 +57,37 @@ def user_input_features():
     # Combine the selected date and time into a single datetime object
     selected_datetime = datetime.combine(date, datetime.strptime(selected_time, "%H:%M").time())
     
-    # Extract season from selected date
-    season = get_season(selected_datetime)
-    season_mapping = {"Winter": 1, "Spring": 2, 
-                      "Summer": 3, "Autumn": 4}
-    season_encoded = season_mapping[season]
+    # Look up the calendar features of the selected hour in the calendar table
+    calendar = lookup([selected_datetime]).iloc[0]
+
+    # Season of the selected date
+    season_encoded = int(calendar['season'])
+    season = SEASON_NAMES[season_encoded]
 
     # Display the selected season
     st.write(f"Selected Season: **{season}**")
 
-    # Extract month from selected date
+    # Extract month and hour from selected date
     mnth = selected_datetime.month
-
-    # Extract hour from selected date
     hr = selected_datetime.hour
 
-    # Extract day of the week from selected date
-    weekday = selected_datetime.strftime("%A")  # Full day name, e.g., "Monday"
-
     # Display the selected day of the week
-    st.write(f"Selected Day of the Week: **{weekday}**")
-    weekday_mapping = {
-        "Sunday": 0,
-        "Monday": 1,
-        "Tuesday": 2,
-        "Wednesday": 3,
-        "Thursday": 4,
-        "Friday": 5,
-        "Saturday": 6
-    }
-    weekday_encoded = weekday_mapping.get(weekday)
-
-    # Determine if it is a working day
-    if weekday in ["Saturday", "Sunday"]:
-        workingday = 0  # Weekend, not a working day
-    else:
-        workingday = 1  # Weekday, likely a working day
-
-    #total number of hours, months, weeks and seasons
-    h = 24 
-    m = 12
-    w = 7
-    s = 4
-
-    hr_sin = np.sin(2 * np.pi * hr / h)
-    hr_cos = np.cos(2 * np.pi * hr / h)
-    mnth_sin = np.sin(2 * np.pi * mnth / m)
-    mnth_cos = np.cos(2 * np.pi * mnth / m)
-    weekday_sin  = np.sin(2 * np.pi * weekday_encoded / w)
-    weekday_cos = np.cos(2 * np.pi * weekday_encoded / w)
-    season_sin = np.sin(2 * np.pi * season_encoded / s)
-    season_cos = np.cos(2 * np.pi * season_encoded / s)
-
-    # Holiday and Working Day with "Yes" or "No" options
-    holiday = st.selectbox("Is it a holiday?", ["No", "Yes"])
+    st.write(f"Selected Day of the Week: **{selected_datetime.strftime('%A')}**")
+    weekday_encoded = int(calendar['weekday'])  # 0 = Sunday
+
+    # Holiday with "Yes" or "No" options, defaulting to the calendar's holiday flag
+    holiday = st.selectbox("Is it a holiday?", ["No", "Yes"], index=int(calendar['holiday']))
     holiday = 1 if holiday == "Yes" else 0
 
+    # A working day is a weekday that is not a holiday
+    workingday = int(weekday_encoded not in (0, 6) and not holiday)
+
+    # Cyclical encodings of hour, month, weekday and season
+    hr_sin, hr_cos = calendar['hr_sin'], calendar['hr_cos']
+    mnth_sin, mnth_cos = calendar['mnth_sin'], calendar['mnth_cos']
+    weekday_sin, weekday_cos = calendar['weekday_sin'], calendar['weekday_cos']
+    season_sin, season_cos = calendar['season_sin'], calendar['season_cos']
+
     st.subheader("☀️ Weather Features")
 
     # Weather situation selection with descriptive text
@@ -112,9 +97,11 @@ def user_input_features():
                             "🌦️ Light Rain/Snow": [0, 0, 1, 0], "🌧️ Heavy Rain/Snow": [0, 0, 0, 1]}
 
     # Continuous variables
-    temp = st.slider("Temperature (°C)", min_value=float(-20), max_value=float(50), value=20.0, step=1.0)
-    hum = st.slider("Humidity (%)", float(data_cleaned['hum'].min()), float(data_cleaned['hum'].max()), 50.0, step=1.0)
-    windspeed = st.slider("Wind Speed (m/s)", float(data_cleaned['windspeed'].min()), float(60), 10.0, step=1.0)
+    temp = st.slider("Temperature (°C)", min_value=float(-20), max_value=float(50), value=WEATHER_DEFAULTS['temp'], step=1.0)
+    hum = st.slider("Humidity (%)", metadata['numeric']['hum']['min'], metadata['numeric']['hum']['max'],
+                    WEATHER_DEFAULTS['hum'], step=1.0)
+    windspeed = st.slider("Wind Speed (m/s)", metadata['numeric']['windspeed']['min'], float(60),
+                          WEATHER_DEFAULTS['windspeed'], step=1.0)
 
 
     # Combine all features, including mapped flags for categorical variables
@@ -142,29 +129,63 @@ def user_input_features():
         "season_sin": season_sin,
         "season_cos": season_cos
     }
-    return features
+    return features, selected_datetime
 
 # Prediction function
-def predict_demand(features):
+def predict_demand(features, model=catboost_model):
     # Convert features dictionary to DataFrame for model compatibility
     input_df = pd.DataFrame([features])
     
-    # Predict using the random forest model
-    prediction = catboost_model.predict(input_df)[0]
+    # Predict using the selected model
+    with timed('prediction.predict', rows=1):
+        prediction = model.predict(input_df)[0]
     if prediction <0:
         prediction=0
     return prediction
 
 # Define the main function for the "Modeling" page
 def main():
+    rerun('prediction')
+
     # Get user input features
-    features = user_input_features()
+    features, selected_datetime = user_input_features()
     
     st.header("Check Bike Demand")
 
+    # Choose between the single model and the optional fleet / lag-feature models when they are available
+    models = {"Single CatBoost": catboost_model}
+    if fleet_model is not None:
+        models["Segment Fleet"] = fleet_model
+    if lag_model is not None:
+        models["CatBoost with Recent Demand"] = lag_model
+    model_option = st.radio("Model", list(models), horizontal=True) if len(models) > 1 else "Single CatBoost"
+    model = models[model_option]
+
+    # Recent demand of the selected hour, from the recorded demand of the week before it
+    if model_option == "CatBoost with Recent Demand":
+        lag_features = features_at(demand_history, selected_datetime)
+        features.update(lag_features)
+        st.write(f"Recent demand before **{selected_datetime:%Y-%m-%d %H}:00**:")
+        st.dataframe(pd.DataFrame([lag_features]).round(1), hide_index=True)
+        # The model needs every recent-demand feature, which only the recorded hours have
+        if pd.isna(pd.Series(lag_features)).any():
+            st.warning(f"Demand is recorded from {demand_history.index.min():%Y-%m-%d} to "
+                       f"{demand_history.index.max():%Y-%m-%d %H:%M}; pick an hour with a recorded week before it "
+                       "or another model.")
+            return
+
     # Display prediction result on button click
     if st.button("Predict Bike Demand"):
-        prediction = predict_demand(features)
+        prediction = predict_demand(features, model)
+
+        # Record the inputs of the served prediction for the drift monitor (Monitoring page), unless the weather
+        # was left at its defaults or the same inputs were just recorded by this session (repeated clicks)
+        observation = (selected_datetime, tuple(sorted(features.items())))
+        untouched = all(features[name] == value for name, value in WEATHER_DEFAULTS.items())
+        if not untouched and st.session_state.get('monitor_last_observation') != observation:
+            with timed('prediction.monitor'):
+                record_observation(features, selected_datetime.hour, prediction)
+            st.session_state['monitor_last_observation'] = observation
         
         # Display prediction in a visually appealing format
         st.markdown(
@@ -1,8 +1,11 @@
 # impport libraries
 import streamlit as st
+from utils.instrumentation import rerun
 
 # Define the main function for the "Modeling" page
 def main():
+    rerun('recommendations')
+
     st.title("Recommendations")
     
     st.write("##### Based on the analysis and modelling results, the following recommendations are proposed to optimize the bike-sharing service:")
@@ -0,0 +1,121 @@
+# import libraries
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objs as go
+from datetime import datetime
+from utils.explain import EXPECTED_VALUE, cached_shap_values, global_importance
+from utils.features import forecast_features
+from utils.modeling import load_cleaned_data, split_features_target, train_test
+from utils.instrumentation import rerun, timed
+from utils.warmup import get_model
+
+
+# Test set of the Modeling page, read and split once per server process instead of on every widget change
+@st.cache_data(show_spinner=False)
+def load_test_set():
+    X, y = split_features_target(load_cleaned_data())
+    _, X_test, _, _ = train_test(X, y)
+    return X_test.sort_index()
+
+
+# Define the main function for the "Forecast Explanations" page
+def main():
+    rerun('explanations')
+
+    # - Load data and model
+    catboost_model = get_model('catboost')
+
+    st.title("Forecast Explanations")
+    st.write("""
+    Every prediction of the CatBoost model is split into the contribution of each feature (tree SHAP values, computed natively by CatBoost).
+    The contributions of a row add up to the predicted demand, starting from the average prediction of the model.
+    """)
+
+    # 1. Rows to explain: the test set of the Modeling page or a forecast horizon
+    st.header("1. Rows to Explain")
+    source_option = st.radio("Explain", ["Test Set", "Forecast"], horizontal=True)
+
+    if source_option == "Test Set":
+        with timed('explanations.load_test_set'):
+            X_explain = load_test_set()
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            start = st.date_input("Forecast Start", value=datetime.today())
+            hours = st.slider("Horizon (hours)", 24, 24 * 14, 24 * 7, step=24)
+        with col2:
+            temp = st.slider("Temperature (°C)", -20.0, 50.0, 20.0, step=1.0)
+            hum = st.slider("Humidity (%)", 0.0, 100.0, 50.0, step=1.0)
+        with col3:
+            windspeed = st.slider("Wind Speed (m/s)", 0.0, 60.0, 10.0, step=1.0)
+            weathersit = st.selectbox("Weather Situation", [1, 2, 3, 4],
+                                      format_func={1: "☀️ Clear", 2: "🌥️ Cloudy/Mist", 3: "🌦️ Light Rain/Snow", 4: "🌧️ Heavy Rain/Snow"}.get)
+        X_explain = forecast_features(start, hours, temp, hum, windspeed, weathersit)
+
+    # Contributions for the whole batch at once, reused from disk for rows explained before
+    with timed('explanations.shap', rows=len(X_explain)):
+        contributions = cached_shap_values(catboost_model, X_explain)
+    features = contributions.drop(columns=EXPECTED_VALUE)
+    predictions = contributions.sum(axis=1)
+    st.write(f"Explaining **{len(X_explain):,}** hourly predictions.")
+
+    # 2. Global importance
+    st.header("2. Global Feature Importance")
+    importance = global_importance(contributions).reset_index()
+    importance.columns = ['feature', 'mean_abs_contribution']
+    fig = px.bar(importance,
+                 x='mean_abs_contribution',
+                 y='feature',
+                 orientation='h',
+                 labels={'mean_abs_contribution': 'Mean |Contribution| (rentals)', 'feature': 'Feature'},
+                 color_discrete_sequence=['skyblue'],
+                 title='Average Impact of Each Feature on the Predicted Demand')
+    fig.update_yaxes(categoryorder='total ascending')
+    with timed('explanations.render'):
+        st.plotly_chart(fig)
+
+    # 3. Per-hour dependence
+    st.header("3. Contribution by Hour of Day")
+    feature_option = st.selectbox("Select Feature", list(importance['feature']))
+    dependence = pd.DataFrame({
+        'hr': X_explain.index.hour,
+        'contribution': features[feature_option].to_numpy(),
+        'value': X_explain[feature_option].astype(float).to_numpy(),
+    })
+    fig = px.scatter(dependence,
+                     x='hr',
+                     y='contribution',
+                     color='value',
+                     opacity=0.5,
+                     labels={'hr': 'Hour of Day', 'contribution': 'Contribution (rentals)', 'value': feature_option},
+                     title=f'Contribution of `{feature_option}` per Hour of Day')
+    hourly_mean = dependence.groupby('hr')['contribution'].mean()
+    fig.add_scatter(x=hourly_mean.index, y=hourly_mean.values, mode='lines', name='Hourly Average', line=dict(color='red', dash='dash'))
+    with timed('explanations.render'):
+        st.plotly_chart(fig)
+
+    # 4. Single prediction waterfall
+    st.header("4. Why This Prediction?")
+    timestamp = st.selectbox("Select Hour", X_explain.index, format_func=lambda ts: ts.strftime("%A %Y-%m-%d %H:%M"))
+    row = features.loc[timestamp]
+    row = row.reindex(row.abs().sort_values(ascending=False).index)
+
+    # Show the largest contributions and group the rest
+    top = row.iloc[:8]
+    if len(row) > len(top):
+        top = pd.concat([top, pd.Series({'other features': row.iloc[8:].sum()})])
+    fig = go.Figure(go.Waterfall(
+        x=['average prediction'] + list(top.index) + ['prediction'],
+        y=[contributions.loc[timestamp, EXPECTED_VALUE]] + list(top.values) + [0],
+        measure=['absolute'] + ['relative'] * len(top) + ['total'],
+        increasing=dict(marker=dict(color='lightgreen')),
+        decreasing=dict(marker=dict(color='magenta')),
+        totals=dict(marker=dict(color='skyblue'))))
+    fig.update_layout(title=f"Predicted demand: {predictions.loc[timestamp]:.0f} rentals", yaxis_title='Rentals', template='plotly_white')
+    with timed('explanations.render'):
+        st.plotly_chart(fig)
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
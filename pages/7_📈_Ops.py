@@ -0,0 +1,74 @@
+# import libraries
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from utils import instrumentation
+from utils.warmup import status
+
+
+# Define the main function for the "Ops" page
+def main():
+    st.title("Ops")
+    st.write("""
+    Timings, reruns and cache lookups recorded by this server process (all sessions), kept in an in-memory ring buffer
+    of the last events. Set `BIKE_METRICS_PATH` to also append every event to a JSON-lines file.
+    """)
+
+    events = pd.DataFrame(instrumentation.events())
+    if events.empty:
+        st.info("No events recorded yet. Open the other pages first.")
+        return
+
+    # 1. Latency percentiles per section
+    st.header("1. Section Latency")
+    timings = events[events['type'] == 'timing']
+    if not timings.empty:
+        latency = timings.groupby('section')['ms'].describe(percentiles=[0.5, 0.9, 0.99])
+        latency = latency[['count', '50%', '90%', '99%', 'max']].rename(columns={'50%': 'p50 ms', '90%': 'p90 ms', '99%': 'p99 ms', 'max': 'max ms'})
+        latency['rows'] = timings.groupby('section')['rows'].sum(min_count=1)
+        latency = latency.sort_values('p90 ms', ascending=False)
+        st.dataframe(latency.round(2))
+
+        fig = px.bar(latency.reset_index().head(20),
+                     x='p90 ms',
+                     y='section',
+                     orientation='h',
+                     color_discrete_sequence=['skyblue'],
+                     labels={'p90 ms': 'p90 latency (ms)', 'section': 'Section'},
+                     title='Slowest Sections (p90)')
+        fig.update_yaxes(categoryorder='total ascending')
+        st.plotly_chart(fig)
+
+    # 2. Reruns and cache hit rates
+    st.header("2. Reruns & Caches")
+    col1, col2 = st.columns(2)
+    counters = instrumentation.counters()
+    with col1:
+        reruns = {name[len('rerun.'):]: value for name, value in counters.items() if name.startswith('rerun.')}
+        st.write("#### Reruns per Page")
+        st.dataframe(pd.Series(reruns, name='reruns'))
+    with col2:
+        st.write("#### Cache Hit Rates")
+        st.dataframe(pd.DataFrame(instrumentation.cache_hit_rates()).T)
+
+    # 3. Memory over time
+    st.header("3. Process Memory")
+    memory = events[['ts', 'rss_mb']].copy()
+    memory['time'] = pd.to_datetime(memory['ts'], unit='s')
+    fig = px.line(memory, x='time', y='rss_mb', labels={'time': 'Time', 'rss_mb': 'Resident Memory (MB)'}, title='Resident Memory of the Server Process')
+    st.plotly_chart(fig)
+
+    # 4. Model warm-up
+    st.header("4. Model Warm-up")
+    warmup = status()
+    st.write(f"Preloaded before start: **{'yes' if warmup['ready'] else 'no'}**")
+    if warmup['models']:
+        st.dataframe(pd.DataFrame(warmup['models']).T)
+
+    if st.button("Clear Recorded Events"):
+        instrumentation.reset()
+        st.rerun()
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# import libraries
+import os
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from utils.instrumentation import rerun, timed
+from utils.monitoring import (HOUR_BANDS, MAE_ALERT, MAE_WARN, MONITOR_STATE_PATH, NUMERIC_FEATURES, PSI_ALERT, PSI_WARN,
+                              DriftMonitor, reset_state)
+
+
+# Define the main function for the "Monitoring" page
+def main():
+    rerun('monitoring')
+
+    st.title("🚨 Model Monitoring")
+
+    # - Load the monitor state (the reference is built offline from data_cleaned.csv)
+    if not os.path.exists(MONITOR_STATE_PATH):
+        st.info("No monitor state yet. Build the reference from the training data with `python -m utils.monitoring`.")
+        return
+    with timed('monitoring.load_state'):
+        monitor = DriftMonitor.load()
+
+    st.write(f"""
+    Drift of the CatBoost model's inputs and accuracy compared with the training data (`data_cleaned.csv`).
+    The inputs of every prediction made on the Prediction page are recorded; observed hours with their actual
+    rentals are added in batches with `python -m utils.monitoring --observations <csv>`. The statistics are kept
+    in `{MONITOR_STATE_PATH}`.
+    """)
+    st.caption(f"{monitor.observations:,} observations since the last reset; last update: {monitor.updated or 'never'}. "
+               f"Reference: {monitor.reference['rows']:,} training hours, built {monitor.reference['created']}.")
+
+    feature_report = monitor.feature_report()
+    residual_report = monitor.residual_report()
+
+    # 1. Alerts
+    st.header("1. Alerts")
+    alerts = monitor.alerts()
+    if monitor.observations == 0:
+        st.info("No observations yet. Try `python -m utils.monitoring --replay 2000 --shift temp=6` to simulate drift.")
+    elif not alerts:
+        st.success("No drift or accuracy alerts.")
+    for level, message in alerts:
+        (st.error if level == 'alert' else st.warning)(message)
+
+    # 2. Feature drift
+    st.header("2. Feature Drift")
+    st.write(f"""
+    Population Stability Index (PSI) of the live distribution against the training distribution over fixed bins:
+    warning from {PSI_WARN}, alert from {PSI_ALERT}. The shift is the difference of the means in training standard deviations.
+    """)
+    st.dataframe(feature_report.round(3))
+
+    feature = st.selectbox("Feature", NUMERIC_FEATURES + ['weathersit'])
+    histogram = monitor.histogram(feature).melt(id_vars='bin', var_name='distribution', value_name='share')
+    fig = px.bar(histogram, x='bin', y='share', color='distribution', barmode='group',
+                 labels={'bin': feature, 'share': 'Share of Observations', 'distribution': ''},
+                 title=f'Training vs Live Distribution of {feature}')
+    with timed('monitoring.render.histogram'):
+        st.plotly_chart(fig)
+
+    # 3. Accuracy per hour band
+    st.header("3. Accuracy by Hour Band")
+    st.write(f"""
+    Mean absolute error of the live predictions against the model's error on the test split, per band of hours:
+    warning from {MAE_WARN}x, alert from {MAE_ALERT}x. Bias is the mean of actual minus predicted rentals.
+    """)
+    st.dataframe(residual_report.round(2))
+
+    mae = residual_report.reset_index().melt(id_vars='band', value_vars=['reference MAE', 'live MAE'],
+                                             var_name='error', value_name='MAE')
+    fig = px.bar(mae, x='band', y='MAE', color='error', barmode='group',
+                 category_orders={'band': list(HOUR_BANDS)},
+                 labels={'band': 'Hour Band', 'MAE': 'Mean Absolute Error', 'error': ''},
+                 title='Reference vs Live MAE per Hour Band')
+    with timed('monitoring.render.mae'):
+        st.plotly_chart(fig)
+
+    if st.button("Reset Live Statistics"):
+        reset_state()
+        st.rerun()
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.calendar_table import build_calendar, calendar_columns, load_calendar, lookup, save_calendar
+
+COLUMNS = ['season', 'yr', 'mnth', 'hr', 'weekday', 'holiday', 'workingday']
+
+
+@pytest.fixture(scope='module')
+def hours():
+    data = pd.read_csv('data/hour.csv', parse_dates=['dteday'])
+    return data.set_index(data['dteday'] + pd.to_timedelta(data['hr'], unit='h'))
+
+
+@pytest.fixture(scope='module')
+def calendar_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp('calendar') / 'calendar.npy'
+    save_calendar(build_calendar(end_year=2013), str(path))
+    return str(path)
+
+
+# The table reproduces every calendar column of hour.csv, holidays (DC Emancipation Day included) and seasons
+def test_lookup_matches_hour_csv(hours, calendar_path):
+    looked_up = lookup(hours.index, COLUMNS, calendar_path)
+    for column in COLUMNS:
+        np.testing.assert_array_equal(looked_up[column].to_numpy(), hours[column].to_numpy(), err_msg=column)
+
+
+def test_encodings_and_daylight_match_the_cleaned_data(calendar_path):
+    cleaned = pd.read_csv('data/data_cleaned.csv', parse_dates=['dteday']).set_index('dteday')
+    eda = pd.read_csv('data/data_eda.csv', parse_dates=['dteday']).set_index('dteday')
+    looked_up = lookup(cleaned.index, path=calendar_path)
+    for column in ['hr_sin', 'hr_cos', 'mnth_sin', 'mnth_cos', 'weekday_sin', 'weekday_cos']:
+        np.testing.assert_allclose(looked_up[column].to_numpy(), cleaned[column].to_numpy(), err_msg=column)
+    np.testing.assert_array_equal(lookup(eda.index, ['daylight'], calendar_path)['daylight'].to_numpy(),
+                                  eda['daylight'].to_numpy())
+
+
+# Timestamps outside the table are computed directly, and minutes are dropped
+def test_lookup_outside_the_table(calendar_path):
+    timestamps = pd.DatetimeIndex(['2010-12-31 23:00', '2012-07-04 10:45', '2014-01-01 08:00'])
+    expected = calendar_columns(timestamps.floor('h'))
+    looked_up = lookup(timestamps, path=calendar_path)
+    np.testing.assert_allclose(looked_up.to_numpy(float), expected.to_numpy(float))
+    assert load_calendar(calendar_path).shape == (len(pd.date_range('2011-01-01', '2013-12-31 23:00', freq='h')),)
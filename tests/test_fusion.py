@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from sklearn.feature_selection import SelectKBest, f_regression
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from xgboost import XGBRegressor
+
+from utils.fusion import FusedLinearModel, check, fuse_linear_pipeline
+from utils.modeling import load_cleaned_data, load_model, split_features_target
+
+
+@pytest.fixture(scope='module')
+def features():
+    X, y = split_features_target(load_cleaned_data())
+    return X, y
+
+
+# The shipped linear pipeline (StandardScaler -> SelectKBest -> LinearRegression) as one dot product
+def test_fused_matches_pipeline(features):
+    X, _ = features
+    model = load_model('linear')
+    fused = fuse_linear_pipeline(model)
+    np.testing.assert_allclose(fused.predict(X), model.predict(X), rtol=0, atol=1e-6)
+    assert check(fused, model, X) < 1e-6
+
+
+# Columns are taken by name, so a reordered frame scores the same
+def test_fused_uses_column_names(features):
+    X, _ = features
+    fused = fuse_linear_pipeline(load_model('linear'))
+    np.testing.assert_allclose(fused.predict(X[X.columns[::-1]]), fused.predict(X))
+
+
+def test_min_max_scaler_and_save_load(features, tmp_path):
+    X, y = features
+    X = X.iloc[:2000]
+    pipeline = Pipeline([('scale', MinMaxScaler()), ('select', SelectKBest(f_regression, k=8)),
+                         ('model', LinearRegression())]).fit(X, y.iloc[:2000])
+    fused = fuse_linear_pipeline(pipeline)
+    fused.save(tmp_path / 'fused.npz')
+    loaded = FusedLinearModel.load(tmp_path / 'fused.npz')
+    np.testing.assert_allclose(loaded.predict(X), pipeline.predict(X), rtol=0, atol=1e-6)
+
+
+def test_non_linear_pipeline_is_rejected(features):
+    X, y = features
+    pipeline = Pipeline([('scale', StandardScaler()), ('model', XGBRegressor(n_estimators=2))]).fit(X.iloc[:500], y.iloc[:500])
+    with pytest.raises(ValueError):
+        fuse_linear_pipeline(pipeline)
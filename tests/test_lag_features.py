@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.lag_features import LAG_COLUMNS, LagFeatureStore, features_at, lag_features, replay
+from utils.modeling import load_cleaned_data
+
+
+@pytest.fixture(scope='module')
+def cnt():
+    return load_cleaned_data()['cnt'].iloc[:2000]
+
+
+# The online ring buffer produces the same features as the vectorized offline path, gaps in hour.csv included
+def test_replay_matches_offline(cnt):
+    assert cnt.index.to_series().diff().max() > pd.Timedelta(hours=1)  # the slice has missing hours
+    pd.testing.assert_frame_equal(replay(cnt), lag_features(cnt)[LAG_COLUMNS], check_freq=False)
+
+
+def test_features_at_matches_offline(cnt):
+    offline = lag_features(cnt)
+    for timestamp in cnt.index[[200, 777, 1999]]:
+        online = pd.Series(features_at(cnt, timestamp))[LAG_COLUMNS]
+        np.testing.assert_allclose(online.to_numpy(float), offline.loc[timestamp, LAG_COLUMNS].to_numpy(float))
+
+
+# Hours after the end of the series have no recent demand instead of the latest one
+def test_features_after_history_are_missing(cnt):
+    features = features_at(cnt, cnt.index[-1] + pd.Timedelta(hours=30))
+    assert np.isnan(features['cnt_lag_1']) and np.isnan(features['cnt_lag_24'])
+
+
+def test_store_rejects_hours_out_of_order(cnt):
+    store = LagFeatureStore.from_history(cnt)
+    with pytest.raises(ValueError):
+        store.update(cnt.index[-1], 1.0)
@@ -0,0 +1,96 @@
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.modeling import load_cleaned_data, load_model, split_features_target, train_test
+from utils.monitoring import (BINS, NUMERIC_FEATURES, DriftMonitor, Welford, bin_index, psi, record_observation,
+                              reset_state)
+
+
+@pytest.fixture(scope='module')
+def monitor_and_test_split():
+    data = load_cleaned_data()
+    model = load_model('catboost')
+    X, y = split_features_target(data)
+    _, X_test, _, y_test = train_test(X, y)
+    return DriftMonitor.from_training_data(data, model), X_test, y_test, model.predict(X_test)
+
+
+# Welford's single updates and Chan's batch merge give numpy's mean and sample standard deviation
+def test_welford_matches_numpy():
+    values = np.random.default_rng(0).normal(50, 12, 5000)
+    single, batched = Welford(), Welford()
+    for value in values:
+        single.update(value)
+    for chunk in np.array_split(values, 7):
+        batched.update_batch(chunk)
+    for stats in (single, batched):
+        assert stats.n == len(values)
+        assert stats.mean == pytest.approx(values.mean(), rel=1e-12)
+        assert stats.std == pytest.approx(values.std(ddof=1), rel=1e-10)
+
+
+def test_psi_matches_numpy_formula():
+    rng = np.random.default_rng(1)
+    reference, live = rng.integers(0, 500, BINS + 2), rng.integers(0, 500, BINS + 2)
+    expected = reference / reference.sum() + 1e-4
+    actual = live / live.sum() + 1e-4
+    assert psi(reference, live) == pytest.approx(np.sum((actual - expected) * np.log(actual / expected)))
+    assert psi(reference, reference) == pytest.approx(0.0, abs=1e-12)
+
+
+def test_bin_index_matches_numpy_histogram():
+    values = np.random.default_rng(2).uniform(-1, 11, 10000)
+    edges = np.linspace(0, 10, BINS + 1)
+    counts = np.bincount(bin_index(values, edges), minlength=BINS + 2)
+    np.testing.assert_array_equal(counts[1:-1], np.histogram(values, edges)[0])
+    assert counts[0] == (values < 0).sum() and counts[-1] == (values > 10).sum()
+
+
+# One observation at a time gives the same state as one batch; the test split itself shows no drift
+def test_update_matches_update_batch(monitor_and_test_split):
+    monitor, X_test, y_test, predictions = monitor_and_test_split
+    sample = X_test.iloc[:500]
+    one_by_one = DriftMonitor(monitor.reference)
+    for (timestamp, row), prediction, actual in zip(sample.iterrows(), predictions[:500], y_test.iloc[:500]):
+        one_by_one.update(row.to_dict(), timestamp.hour, prediction, actual)
+    batched = DriftMonitor(monitor.reference)
+    batched.update_batch(sample, predictions[:500], y_test.iloc[:500])
+
+    pd.testing.assert_frame_equal(one_by_one.feature_report(), batched.feature_report())
+    pd.testing.assert_frame_equal(one_by_one.residual_report(), batched.residual_report())
+    for name in NUMERIC_FEATURES:
+        assert one_by_one.stats[name].mean == pytest.approx(sample[name].mean())
+    assert (batched.feature_report()['status'] == 'ok').all()
+
+
+def test_shifted_inputs_raise_an_alert(monitor_and_test_split):
+    monitor, X_test, _, _ = monitor_and_test_split
+    shifted = DriftMonitor(monitor.reference)
+    shifted.update_batch(X_test.assign(temp=X_test['temp'] + 8))
+    assert shifted.feature_report().loc['temp', 'status'] == 'alert'
+    assert any('temp' in message for _, message in shifted.alerts())
+
+
+def _record(path, features, times):
+    for _ in range(times):
+        record_observation(features, 12, 100.0, path=path)
+
+
+# Concurrent writers in separate processes do not lose observations (the file lock needs fcntl)
+def test_record_observation_across_processes(monitor_and_test_split, tmp_path):
+    pytest.importorskip('fcntl')
+    monitor, X_test, _, _ = monitor_and_test_split
+    path = str(tmp_path / 'monitor_state.json')
+    monitor.save(path)
+    reset_state(path)
+    features = X_test.iloc[0].to_dict()
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_record, args=(path, features, 50)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert DriftMonitor.load(path).observations == 200
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.partitioned import build, source_mtime
+from utils.quantiles import ALPHA, QUANTILES, GroupedSketch, _with_buckets, load_sketch, sketch_partitioned, sketch_path
+
+BY = ['hr', 'weathersit']
+
+
+@pytest.fixture(scope='module')
+def data():
+    return _with_buckets(pd.read_csv('data/data_eda.csv'))
+
+
+def _assert_same(left, right):
+    right_quantiles = right.quantiles().reindex(left.groups)
+    pd.testing.assert_frame_equal(left.quantiles(), right_quantiles)
+    pd.testing.assert_series_equal(left.count(), right.count().reindex(left.groups))
+
+
+# Sketches of parts merge into exactly the sketch of the concatenated parts, whatever the split
+def test_merge_equals_build_on_concat(data):
+    shuffled = data.sample(frac=1, random_state=0)
+    parts = [shuffled.iloc[i::5] for i in range(5)]
+    merged = GroupedSketch.build(parts[0], BY)
+    for part in parts[1:]:
+        merged = merged.merge(GroupedSketch.build(part, BY))
+    whole = GroupedSketch.build(shuffled, BY)
+    _assert_same(merged, whole)
+    assert merged.source_rows == whole.source_rows == len(data)
+
+
+# Every quantile is within alpha of the exact lower-rank quantile of its group
+def test_quantiles_within_alpha_of_lower_rank(data):
+    sketch = GroupedSketch.build(data, BY).quantiles()
+    for q in QUANTILES:
+        exact = data.groupby(BY)['cnt'].quantile(q, interpolation='lower').reindex(sketch.index)
+        positive = exact > 0
+        relative = np.abs(sketch[q][positive] - exact[positive]) / exact[positive]
+        assert relative.max() <= ALPHA + 1e-9
+        assert (sketch[q][~positive] == 0).all()
+
+
+# Categorical groups keep their categories and order through save/load
+def test_save_load_round_trip(data, tmp_path):
+    sketch = GroupedSketch.build(data, ['hr', 'temp_buckets'])
+    sketch.source_mtime = 123.0
+    sketch.save(tmp_path / 'sketch.npz')
+    loaded = GroupedSketch.load(tmp_path / 'sketch.npz')
+    _assert_same(loaded, sketch)
+    assert loaded.groups.get_level_values('temp_buckets').dtype == sketch.groups.get_level_values('temp_buckets').dtype
+    assert (loaded.source_rows, loaded.source_mtime) == (sketch.source_rows, 123.0)
+
+
+# Partitions sketched in parallel and merged give the sketch of the CSV; the stored sketch is used until the
+# CSV changes
+def test_partitioned_sketch_and_freshness(data, tmp_path):
+    source = tmp_path / 'data_eda.csv'
+    pd.read_csv('data/data_eda.csv').to_csv(source, index=False)
+    root = str(tmp_path / 'partitioned')
+    build(str(source), root)
+    sketch, = sketch_partitioned(root, [BY], workers=2)
+    _assert_same(sketch, GroupedSketch.build(data, BY))
+
+    sketch.source_mtime = source_mtime(root)
+    sketch.save(sketch_path(BY, tmp_path))
+    assert load_sketch(BY, tmp_path, source) is not None
+    os.utime(source, (sketch.source_mtime + 10, sketch.source_mtime + 10))
+    assert load_sketch(BY, tmp_path, source) is None
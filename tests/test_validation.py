@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.validation import fill_gaps, hour_numbers, validate
+
+
+@pytest.fixture(scope='module')
+def hours():
+    return pd.read_csv('data/hour.csv')
+
+
+# hour.csv is clean apart from its missing hours
+def test_hour_csv_gaps(hours):
+    report = validate(hours, allow_gaps=True)
+    assert report['passed'] and report['cities'] == 1
+    assert report['missing_hours'] == report['expected_rows'] - len(hours) > 0
+    assert report['longest_gaps'][0]['city'] is None
+    assert not validate(hours)['passed']
+
+
+@pytest.mark.parametrize('cities', [['DC', 'NYC'], [3, 7]])
+def test_gaps_per_city(hours, cities):
+    data = pd.concat([hours.assign(city=city) for city in cities], ignore_index=True)
+    report = validate(data, allow_gaps=True)
+    single = validate(hours, allow_gaps=True)
+    assert report['cities'] == 2
+    assert report['missing_hours'] == 2 * single['missing_hours']
+    assert report['gaps'] == 2 * single['gaps']
+    assert {gap['city'] for gap in report['longest_gaps']} == set(cities)
+    json.dumps(report)  # plain Python values only
+
+
+# Dropped hours are found with their city and length, and the fill restores the complete index
+def test_dropped_hours_are_found_and_filled(hours):
+    data = pd.concat([hours.assign(city='DC'), hours.assign(city='NYC')], ignore_index=True)
+    dropped = data[~((data['city'] == 'NYC') & data['instant'].between(5000, 5099))]
+    report = validate(dropped, allow_gaps=True, max_gaps=1)
+    assert report['missing_hours'] == validate(data, allow_gaps=True)['missing_hours'] + 100
+    assert report['longest_gaps'][0]['city'] == 'NYC' and report['longest_gaps'][0]['hours'] >= 100
+
+    filled = fill_gaps(dropped)
+    assert len(filled) == report['expected_rows']
+    assert validate(filled)['passed']
+    assert (filled['cnt'] == filled['casual'] + filled['registered']).all()
+
+
+# Date strings and parsed dates give the same hours, in file order and shuffled
+def test_hour_numbers_strings_and_parsed(hours):
+    parsed = hours.assign(dteday=pd.to_datetime(hours['dteday']))
+    np.testing.assert_array_equal(hour_numbers(hours), hour_numbers(parsed))
+    shuffled = hours.sample(frac=1, random_state=0)
+    np.testing.assert_array_equal(hour_numbers(shuffled), hour_numbers(parsed.loc[shuffled.index]))
+
+
+def test_checks_report_bad_rows(hours):
+    data = hours.copy()
+    data.loc[10, 'hum'] = 1.5
+    data.loc[11, 'season'] = 7
+    data.loc[12, 'cnt'] += 1
+    data.loc[13, 'dteday'] = np.nan
+    data = pd.concat([data, data.iloc[[20]]], ignore_index=True)
+    checks = validate(data.drop(index=13), allow_gaps=True)['checks']
+    assert checks['range.hum']['examples'] == [10]
+    assert checks['codes.season']['examples'] == [11]
+    assert checks['sum.casual+registered=cnt']['examples'] == [12]
+    assert checks['duplicates']['failed'] == 2
+    assert validate(data, allow_gaps=True)['checks']['nulls']['examples'] == [13]
@@ -0,0 +1,153 @@
+# import libraries
+import argparse
+import functools
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Low-cardinality columns the EDA views filter on
+INDEX_COLUMNS = ['workingday', 'holiday', 'season', 'weathersit', 'yr', 'mnth', 'hr']
+BITMAP_INDEX_ROOT = 'data/bitmap_index'
+
+# One packed bitmap (1 bit per row, padded to whole 64-bit words) per value of each indexed column.
+# Filters combine bitmaps with bitwise OR within a column and AND across columns, 64 rows per operation.
+class BitmapIndex:
+    def __init__(self, bitmaps, rows, source_mtime=None):
+        self.bitmaps = bitmaps  # {column: {value: uint64 array}}
+        self.rows = rows
+        self.source_mtime = source_mtime  # modification time of the file the rows were read from
+
+    @classmethod
+    def build(cls, data, columns=INDEX_COLUMNS):
+        rows = len(data)
+        bitmaps = {}
+        for column in columns:
+            codes = data[column].to_numpy()
+            bitmaps[column] = {int(value): _pack(codes == value) for value in np.unique(codes)}
+        return cls(bitmaps, rows)
+
+    # Bitmap of the rows matching all conditions; a condition is a value or a list of values (OR)
+    def bitmap(self, conditions):
+        result = None
+        for column, values in conditions.items():
+            values = values if isinstance(values, (list, tuple, set, np.ndarray)) else [values]
+            column_bitmap = np.zeros(self._words, dtype=np.uint64)
+            for value in values:
+                if int(value) in self.bitmaps[column]:
+                    np.bitwise_or(column_bitmap, self.bitmaps[column][int(value)], out=column_bitmap)
+            result = column_bitmap if result is None else np.bitwise_and(result, column_bitmap, out=result)
+        if result is None:  # no condition: every row
+            return _pack(np.ones(self.rows, dtype=bool))
+        return result
+
+    # Row positions matching the conditions, in ascending order; only non-empty 64-row words are unpacked
+    def select(self, conditions):
+        bitmap = self.bitmap(conditions)
+        words = np.flatnonzero(bitmap)
+        bits = np.unpackbits(bitmap[words].view(np.uint8), bitorder='little').reshape(-1, 64).view(bool)
+        return (words[:, None] * 64 + np.arange(64))[bits]
+
+    # Number of matching rows, without materializing the positions
+    def count(self, conditions):
+        return _popcount(self.bitmap(conditions))
+
+    # Matching rows per value of another indexed column (a linked histogram when cross-filtering):
+    # the filter bitmap is computed once and ANDed with each value's bitmap
+    def count_by(self, column, conditions):
+        base = self.bitmap({key: value for key, value in conditions.items() if key != column})
+        return {value: _popcount(np.bitwise_and(base, bitmap)) for value, bitmap in sorted(self.bitmaps[column].items())}
+
+    # Matching rows of the indexed frame (or of some of its columns)
+    def take(self, data, conditions, columns=None):
+        positions = self.select(conditions)
+        return data.iloc[positions] if columns is None else data[columns].iloc[positions]
+
+    @property
+    def _words(self):
+        return (self.rows + 63) // 64
+
+    @property
+    def nbytes(self):
+        return sum(bitmap.nbytes for values in self.bitmaps.values() for bitmap in values.values())
+
+    # One .npy per column (values x words) plus a manifest; load() memory-maps them
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        manifest = {'rows': self.rows, 'source_mtime': self.source_mtime, 'columns': {}}
+        for column, values in self.bitmaps.items():
+            np.save(os.path.join(directory, f'{column}.npy'), np.stack(list(values.values())))
+            manifest['columns'][column] = list(values)
+        with open(os.path.join(directory, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        with open(os.path.join(directory, 'manifest.json')) as f:
+            manifest = json.load(f)
+        bitmaps = {}
+        for column, values in manifest['columns'].items():
+            stacked = np.load(os.path.join(directory, f'{column}.npy'), mmap_mode=mmap_mode)
+            bitmaps[column] = {value: stacked[i] for i, value in enumerate(values)}
+        return cls(bitmaps, manifest['rows'], manifest.get('source_mtime'))
+
+
+# Folder of the index built from a source file
+def index_path(source, root=BITMAP_INDEX_ROOT):
+    return os.path.join(root, os.path.splitext(os.path.basename(source))[0])
+
+
+@functools.lru_cache(maxsize=8)
+def _load_cached(directory, mtime):
+    return BitmapIndex.load(directory)
+
+
+# Stored index of a source file, read once per index version; None when it has not been built or when the
+# source file has changed since
+def load_bitmap_index(source, root=BITMAP_INDEX_ROOT):
+    directory = index_path(source, root)
+    try:
+        index = _load_cached(directory, os.path.getmtime(os.path.join(directory, 'manifest.json')))
+    except FileNotFoundError:
+        return None
+    return index if index.source_mtime == os.path.getmtime(source) else None
+
+
+# Set bits of a uint64 bitmap, counted per word with the usual shift-and-mask steps (SWAR)
+def _popcount(bitmap):
+    x = bitmap - ((bitmap >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return int(((x * np.uint64(0x0101010101010101)) >> np.uint64(56)).sum())
+
+
+# Pack a boolean mask into little-endian bits, padded to whole uint64 words
+def _pack(mask):
+    packed = np.packbits(mask, bitorder='little')
+    padded = np.zeros(((len(mask) + 63) // 64) * 8, dtype=np.uint8)
+    padded[:len(packed)] = packed
+    return padded.view(np.uint64)
+
+
+# Build the index at ingest, next to the data it refers to (rows in file order)
+def main():
+    parser = argparse.ArgumentParser(description="Build bitmap indexes over the categorical columns of a CSV.")
+    parser.add_argument('--source', default='data/data_eda.csv')
+    parser.add_argument('--output', help="Folder, default data/bitmap_index/<source name>")
+    args = parser.parse_args()
+
+    output = args.output or index_path(args.source)
+    data = pd.read_csv(args.source, usecols=INDEX_COLUMNS)
+    start = time.perf_counter()
+    index = BitmapIndex.build(data)
+    index.source_mtime = os.path.getmtime(args.source)
+    index.save(output)
+    print(f"Indexed {index.rows:,} rows in {time.perf_counter() - start:.2f}s: "
+          f"{sum(map(len, index.bitmaps.values()))} bitmaps, {index.nbytes / 2**20:.1f} MB in {output}")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# import libraries
+import argparse
+import functools
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import Holiday, USFederalHolidayCalendar, nearest_workday
+
+# Hourly calendar dimension, one row per hour from START to the end of END_YEAR; row = hours since START
+CALENDAR_PATH = 'data/calendar.npy'
+START = pd.Timestamp('2011-01-01')
+END_YEAR = 2035
+HOUR_NS = 3_600_000_000_000
+
+# First day (month * 100 + day) of seasons 2, 3, 4 and of the next season 1, as in hour.csv
+SEASON_STARTS = [321, 621, 923, 1221]
+
+# Daylight hours per season: (start hour, start minute, end hour, end minute)
+DAYLIGHT_HOURS = {
+    1: (7, 0, 19, 0),  # Spring: 7:00 - 19:00
+    2: (6, 0, 21, 0),  # Summer: 6:00 - 21:00
+    3: (7, 0, 19, 0),  # Fall: 7:00 - 19:00
+    4: (7, 0, 17, 0)   # Winter: 7:00 - 17:00
+}
+
+# int8 codes and float64 encodings (the models were trained on float64 sin/cos values): 72 bytes per hour
+CALENDAR_DTYPE = np.dtype([
+    ('season', 'i1'), ('yr', 'i1'), ('mnth', 'i1'), ('hr', 'i1'), ('weekday', 'i1'),
+    ('holiday', 'i1'), ('workingday', 'i1'), ('daylight', 'i1'),
+    ('hr_sin', 'f8'), ('hr_cos', 'f8'), ('mnth_sin', 'f8'), ('mnth_cos', 'f8'),
+    ('weekday_sin', 'f8'), ('weekday_cos', 'f8'), ('season_sin', 'f8'), ('season_cos', 'f8'),
+])
+
+
+# Holidays of hour.csv: the US federal holidays plus DC Emancipation Day (April 16, observed on the nearest weekday)
+class BikeShareHolidayCalendar(USFederalHolidayCalendar):
+    rules = USFederalHolidayCalendar.rules + [Holiday('DC Emancipation Day', month=4, day=16, observance=nearest_workday)]
+
+
+def holidays(start, end):
+    return BikeShareHolidayCalendar().holidays(start, end)
+
+
+# Every calendar-derived column for an array of timestamps, vectorized; extra_holidays are added to the calendar's
+def calendar_columns(timestamps, extra_holidays=()):
+    timestamps = pd.DatetimeIndex(timestamps)
+    hr = timestamps.hour.to_numpy()
+    minute = timestamps.minute.to_numpy()
+    mnth = timestamps.month.to_numpy()
+    weekday = ((timestamps.dayofweek + 1) % 7).to_numpy()  # 0 = Sunday as in hour.csv
+    season = np.searchsorted(SEASON_STARTS, mnth * 100 + timestamps.day.to_numpy(), side='right') % 4 + 1
+    days = timestamps.normalize()
+    holiday_dates = holidays(days.min(), days.max()).union(pd.DatetimeIndex(extra_holidays)) if len(days) else []
+    holiday = days.isin(holiday_dates).astype(int)
+
+    # 1 if the timestamp falls within the daylight hours of its season
+    start_hour, start_minute, end_hour, end_minute = (np.array([DAYLIGHT_HOURS[s][i] for s in range(1, 5)])[season - 1]
+                                                      for i in range(4))
+    daylight = (((hr > start_hour) | ((hr == start_hour) & (minute >= start_minute))) &
+                ((hr < end_hour) | ((hr == end_hour) & (minute <= end_minute)))).astype(int)
+
+    return pd.DataFrame({
+        'season': season,
+        'yr': timestamps.year.to_numpy() - START.year,
+        'mnth': mnth,
+        'hr': hr,
+        'weekday': weekday,
+        'holiday': holiday,
+        'workingday': ((weekday != 0) & (weekday != 6) & (holiday == 0)).astype(int),
+        'daylight': daylight,
+        'hr_sin': np.sin(2 * np.pi * hr / 24),
+        'hr_cos': np.cos(2 * np.pi * hr / 24),
+        'mnth_sin': np.sin(2 * np.pi * mnth / 12),
+        'mnth_cos': np.cos(2 * np.pi * mnth / 12),
+        'weekday_sin': np.sin(2 * np.pi * weekday / 7),
+        'weekday_cos': np.cos(2 * np.pi * weekday / 7),
+        'season_sin': np.sin(2 * np.pi * season / 4),
+        'season_cos': np.cos(2 * np.pi * season / 4),
+    }, index=timestamps)
+
+
+# The table as a structured array
+def build_calendar(end_year=END_YEAR):
+    timestamps = pd.date_range(START, f'{end_year}-12-31 23:00', freq='h')
+    columns = calendar_columns(timestamps)
+    table = np.empty(len(timestamps), dtype=CALENDAR_DTYPE)
+    for name in CALENDAR_DTYPE.names:
+        table[name] = columns[name].to_numpy()
+    return table
+
+
+# Write the table under a temporary name and rename it, so a concurrent session never maps a partial file
+def save_calendar(table, path=CALENDAR_PATH):
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or '.', suffix='.tmp', delete=False) as f:
+        np.save(f, table)
+    os.replace(f.name, path)
+
+
+# Memory-mapped table, built and saved on first use
+@functools.lru_cache(maxsize=None)
+def load_calendar(path=CALENDAR_PATH):
+    if not os.path.exists(path):
+        save_calendar(build_calendar(), path)
+    return np.load(path, mmap_mode='r')
+
+
+# Calendar features of hourly timestamps by index lookup (minutes are dropped); timestamps outside the table
+# are computed directly. Returns a frame with one row per timestamp and the requested columns.
+def lookup(timestamps, columns=None, path=CALENDAR_PATH):
+    timestamps = pd.DatetimeIndex(timestamps)
+    columns = list(CALENDAR_DTYPE.names) if columns is None else list(columns)
+    table = load_calendar(path)
+    positions = (timestamps.asi8 - START.value) // HOUR_NS
+    inside = (positions >= 0) & (positions < len(table))
+
+    # One gather per column; positions outside the table are clipped first, then overwritten
+    if not inside.all():
+        positions = np.clip(positions, 0, len(table) - 1)
+    result = {name: table[name][positions] for name in columns}
+    if not inside.all():
+        outside = calendar_columns(timestamps[~inside].floor('h'))
+        for name in columns:
+            result[name][~inside] = outside[name].to_numpy()
+    return pd.DataFrame(result, index=timestamps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the hourly calendar dimension table.")
+    parser.add_argument('--end-year', type=int, default=END_YEAR)
+    parser.add_argument('--output', default=CALENDAR_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = build_calendar(args.end_year)
+    save_calendar(table, args.output)
+    print(f"Wrote {len(table):,} hours ({START:%Y}-{args.end_year}) to {args.output}: "
+          f"{table.nbytes / 2**20:.1f} MB in {time.perf_counter() - start:.1f}s")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+# import libraries
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objs as go
+
+from utils.cleaning import add_temp_buckets, add_wind_buckets
+from utils.instrumentation import timed
+from utils.quantiles import GroupedSketch, load_sketch
+
+# Figures of the EDA and Modeling pages, built from data only so the pages and the static report share them
+
+# Define mappings for different groupings
+month_mapping = {1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun', 7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'}
+season_mapping = {1: 'Spring', 2: 'Summer', 3: 'Autumn', 4: 'Winter'}
+weekday_mapping = {0: 'Sunday', 1: 'Monday', 2: 'Tuesday', 3: 'Wednesday', 4: 'Thursday', 5: 'Friday', 6: 'Saturday'}
+workingday_mapping = {0: 'Non-Working Day', 1: 'Working Day'}
+
+# Options of the EDA page's select boxes
+VIEW_OPTIONS = ["Month", "Season", "Weekday", "Working/Non-Working Day"]
+DAY_TYPE_OPTIONS = ["Working Days", "Holidays", "All Days"]
+ANALYSIS_OPTIONS = ["Temperature Buckets", "Weather Condition", "Wind Condition"]
+STATISTIC_OPTIONS = ["Mean", "p50", "p90", "p99"]
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+# Per view: grouping column, label mapping, axis title and category order
+_VIEWS = {
+    "Month": ('mnth', month_mapping, 'Month', list(month_mapping.values())),
+    "Season": ('season', season_mapping, 'Season', ['Spring', 'Summer', 'Autumn', 'Winter']),
+    "Weekday": ('weekday', weekday_mapping, 'Weekday', list(weekday_mapping.values())),
+    "Working/Non-Working Day": ('workingday', workingday_mapping, 'Day Type', ['Non-Working Day', 'Working Day']),
+}
+_VIEW_TITLES = {
+    "Month": 'Average Bike Rentals per Month',
+    "Season": 'Average Bike Rentals by Season',
+    "Weekday": 'Average Bike Rentals per Weekday',
+    "Working/Non-Working Day": 'Average Bike Rentals by Working/Non-Working Day',
+}
+
+# Marker colour per model on the predictions vs actual scatters
+MODEL_COLORS = {'linear': 'blue', 'rf': 'orange', 'xgb': 'green', 'catboost': 'red'}
+MODEL_TITLES = {'linear': 'Linear Regression', 'rf': 'Random Forest', 'xgb': 'XG Boost', 'catboost': 'Cat Boost'}
+
+
+# 1. Total rentals per year
+def yearly_totals_figure(data):
+    with timed('eda.groupby.yearly', rows=len(data)):
+        rental_summary = data.groupby('yr')['cnt'].sum()
+    fig = go.Figure(data=[go.Bar(x=['2011', '2012'],
+                                y=rental_summary.values / 1_000_000,
+                                marker=dict(color='skyblue'))])
+
+    # Add total annotations and layout customization
+    for i, value in enumerate(rental_summary.values / 1_000_000):
+        fig.add_annotation(
+            x=i,
+            y=value + 0.1,
+            text=f"<b>Total: {value:.2f}M</b>",
+            showarrow=False,
+            font=dict(size=12, color="black"),
+            align="center"
+        )
+
+    fig.update_layout(
+        title='Total Rentals for the Year 2011 and 2012',
+        xaxis_title='Year',
+        yaxis_title='Total Rentals (in millions)',
+        template='plotly_white'
+    )
+    return fig
+
+
+# 2. Rental surplus of 2012 over 2011 per month
+def monthly_delta_figure(data):
+    with timed('eda.groupby.monthly_delta', rows=len(data)):
+        monthly_delta = (data[data['yr'] == 1].groupby('mnth')['cnt'].sum()) - (data[data['yr'] == 0]
+                                                                                  .groupby('mnth')['cnt'].sum())
+
+    # Create the bar chart with all months including January
+    fig = go.Figure(data=[go.Bar(
+        x=monthly_delta.index,  # Use the month index directly for x-axis
+        y=monthly_delta.values / 10_000,  # Convert to 10k
+        hoverinfo='none',  # No hover text on the bars
+        marker=dict(color='skyblue')
+    )])
+
+    # Add annotations for the total values above each bar
+    for i, value in enumerate(monthly_delta.values / 10_000):  # Convert to 10k
+        fig.add_annotation(
+            x=monthly_delta.index[i],  # Use the correct x-value from the month index
+            y=value + 1,  # Add a small offset above the bar for visibility
+            text=f"<b>{value:.1f}k</b>",  # Bold value text with 'k'
+            showarrow=False,
+            font=dict(size=12, color="black", family="Arial"),
+            align="center")
+
+    # Customize layout
+    fig.update_layout(
+        title='Monthly Rental Surplus 2012',
+        xaxis_title='Month',
+        yaxis_title='Total Rentals (in 10k)',
+        xaxis=dict(
+            tickmode='array',
+            tickvals=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
+            ticktext=['January', 'February', 'March', 'April', 'May', 'June',
+                      'July', 'August', 'September', 'October', 'November', 'December']),
+        template='plotly_white')
+    return fig
+
+
+# 3. Monthly rentals per user type; expects the timestamp as index
+def monthly_trends_figure(data):
+    # Resample monthly, summing rentals for each month
+    with timed('eda.resample.monthly', rows=len(data)):
+        monthly_data = pd.DataFrame({
+            'Total': data['cnt'].resample('M').sum(),
+            'Casual': data['casual'].resample('M').sum(),
+            'Registered': data['registered'].resample('M').sum()
+        })
+
+    # Melt the DataFrame to have a long format suitable for Plotly Express
+    monthly_data = monthly_data.reset_index().melt(
+        id_vars='dteday', value_vars=['Total', 'Casual', 'Registered'],
+        var_name='User Type', value_name='Bike Rentals'
+    )
+
+    # Create the line chart with Plotly Express
+    fig = px.line(
+        monthly_data,
+        x='dteday',
+        y='Bike Rentals',
+        color='User Type',
+        title='Monthly Trends by User Type',
+        labels={'dteday': 'Months', 'Bike Rentals': 'Bike Rentals'}
+    )
+
+    # Generate tick values for every 3 months
+    start_date = monthly_data['dteday'].min()
+    end_date = monthly_data['dteday'].max()
+    tickvals = pd.date_range(start=start_date, end=end_date, freq='3MS')  # '3MS' for 3-month start frequency
+
+    # Update layout for cleaner appearance
+    fig.update_layout(
+        plot_bgcolor='white'
+    )
+
+    # Customize the x-axis to show both month and year
+    fig.update_xaxes(
+        tickformat="%b\n%Y",  # Format as abbreviated month and year with a line break
+        tickangle=0,  # No rotation of the ticks
+        tickvals=tickvals
+    )
+
+    # Set specific colors for each trace
+    color_map = {'Total': 'skyblue', 'Casual': 'magenta', 'Registered': 'lightgreen'}
+    for trace in fig.data:
+        trace.marker.color = color_map[trace.name]  # Set the line color based on trace name
+        trace.line.color = color_map[trace.name]  # Apply color to the line
+    return fig
+
+
+# 4.1 Average rentals per user type for one view (month, season, weekday, working day)
+def view_distribution_figure(data, view_option):
+    column, mapping, x_title, x_order = _VIEWS[view_option]
+    with timed('eda.groupby.view_distribution', rows=len(data)):
+        distribution = data.groupby(column)[['registered', 'casual']].mean().reset_index()
+    distribution[column] = distribution[column].replace(mapping)
+
+    # Melt the data for stacked plotting
+    distribution = distribution.melt(id_vars=column,
+                                     value_vars=['registered', 'casual'],
+                                     var_name='user_type',
+                                     value_name='count')
+
+    # Create the stacked bar chart
+    fig = px.bar(distribution,
+                x=column,
+                y='count',
+                color='user_type',
+                labels={column: x_title, 'count': 'Average Rentals'},
+                color_discrete_map={'registered': 'lightgreen', 'casual': 'magenta'},
+                title=_VIEW_TITLES[view_option])
+    if view_option != "Working/Non-Working Day":
+        fig.update_xaxes(categoryorder='array', categoryarray=x_order)
+    return fig
+
+
+# 4.2 Share of casual users for one view
+@timed('eda.casual_share')
+def casual_share_figure(data, view_option):
+    column, mapping, x_title, x_order = _VIEWS[view_option]
+
+    # Group and calculate share of casual users
+    grouped_data = (data.groupby(column)['casual'].sum() / data.groupby(column)['cnt'].sum()).reset_index()
+    grouped_data.columns = [column, 'share_of_casual_users']
+    grouped_data['share_of_casual_users'] *= 100
+    grouped_data[column] = grouped_data[column].replace(mapping)
+
+    # Create the line chart
+    fig = px.line(
+        grouped_data,
+        x=grouped_data.columns[0],
+        y='share_of_casual_users',
+        title=f'Share of Casual Bike Rentals by {view_option} (%)',
+        labels={grouped_data.columns[0]: x_title, 'share_of_casual_users': 'Share of Casual Users (%)'}
+    )
+
+    fig.update_traces(line=dict(color='magenta'))
+    fig.update_xaxes(categoryorder='array', categoryarray=x_order)
+    fig.update_layout(plot_bgcolor='white')
+    return fig
+
+
+# 5. Hourly rentals for one day type; with the bitmap index of the frame's rows, the day type is selected from
+# the precomputed workingday bitmaps instead of a mask over the whole frame
+def hourly_figure(data, day_type_option, index=None):
+    # Filter the data by day type
+    conditions = {"Working Days": {'workingday': 1}, "Holidays": {'workingday': 0}}.get(day_type_option)
+    if conditions is None:
+        filtered_data = data
+    elif index is not None:
+        filtered_data = index.take(data, conditions, ['hr', 'cnt'])
+    else:
+        filtered_data = data[data['workingday'] == conditions['workingday']]
+
+    # Create the distribution for each data type
+    with timed('eda.groupby.hourly', rows=len(filtered_data)):
+        hourly_distribution = filtered_data.groupby('hr')['cnt'].mean().reset_index()
+
+    # Calculate the Mean of Bike Rentals for 'All Days'
+    overall_avg_rentals = hourly_distribution['cnt'].mean()
+
+    # Create the bar charts
+    fig = px.bar(hourly_distribution,
+                x='hr',
+                y='cnt',
+                labels={'hr': 'Hour of Day', 'cnt': 'Average Rentals'},
+                color_discrete_sequence=['skyblue'],
+                title=f'Average Bike Rentals per Hour ({day_type_option})')
+
+    # Create an average line
+    fig.add_scatter(x=hourly_distribution['hr'],
+                    y=[overall_avg_rentals] * len(hourly_distribution),
+                    mode='lines',
+                    name='Overall Average',
+                    line=dict(color='red', dash='dash'))
+    return fig
+
+
+# Mean rentals per cell, or a percentile read from the per-group quantile sketch: the sketch merged from the
+# partitions when it was built from the current data_eda.csv (and the frame has all of its rows), otherwise one
+# built from the frame
+def _heatmap_values(data, by, statistic):
+    if statistic == "Mean":
+        return data.groupby(by, observed=True)['cnt'].mean().reset_index()
+    q = PERCENTILES[statistic]
+    sketch = load_sketch(by)
+    if sketch is None or sketch.source_rows != len(data):
+        sketch = GroupedSketch.build(data, by)
+    return sketch.quantiles([q]).rename(columns={q: 'cnt'}).reset_index()
+
+
+# 6. Heatmap of hourly rentals by weather condition, temperature bucket or wind condition (mean or percentile)
+def heatmap_figure(data, analysis_option, statistic="Mean"):
+    if analysis_option == "Weather Condition":
+        with timed('eda.groupby.heatmap', rows=len(data)):
+            heatmap_data = _heatmap_values(data, ['hr', 'weathersit'], statistic)
+        heatmap_data['weathersit'] = heatmap_data['weathersit'].replace({1: 'Sunny', 2: 'Cloudy', 3: 'Light Rain', 4: 'Heavy Rain'})
+        y, y_title, title = 'weathersit', 'Weather Condition', 'Hourly Bike Rentals by Weather Condition'
+
+    elif analysis_option == "Temperature Buckets":
+        # Create a new column called 'temp_buckets'
+        with timed('eda.temp_buckets', rows=len(data)):
+            data = add_temp_buckets(data[['hr', 'temp', 'cnt']].copy())
+
+        # Prepare the data for heatmap
+        with timed('eda.groupby.heatmap', rows=len(data)):
+            heatmap_data = _heatmap_values(data, ['hr', 'temp_buckets'], statistic)
+        y, y_title, title = 'temp_buckets', 'Temperature Buckets', 'Hourly Bike Rentals by Temperature Buckets'
+
+    elif analysis_option == "Wind Condition":
+        # Create a new column called 'wind_buckets'
+        with timed('eda.wind_buckets', rows=len(data)):
+            data = add_wind_buckets(data[['hr', 'windspeed', 'cnt']].copy())
+
+        # Prepare the data for heatmap
+        with timed('eda.groupby.heatmap', rows=len(data)):
+            heatmap_data = _heatmap_values(data, ['hr', 'wind_buckets'], statistic)
+        y, y_title, title = 'wind_buckets', 'Wind Condition', 'Hourly Bike Rentals by Wind Condition'
+
+    # Create the heatmaps
+    prefix = 'Average' if statistic == "Mean" else statistic
+    fig = px.density_heatmap(heatmap_data,
+                            x='hr',
+                            y=y,
+                            z='cnt',
+                            color_continuous_scale='Viridis',
+                            labels={'hr': 'Hour of Day', y: y_title, 'cnt': f'{prefix} Rentals'},
+                            title=f'{prefix} {title}')
+    return fig
+
+
+# Above these sizes the predictions vs actual scatter switches to WebGL, then to a server-side 2D histogram
+WEBGL_THRESHOLD = 5_000
+DENSITY_THRESHOLD = 100_000
+DENSITY_BINS = 150
+SCATTER_MODES = ['auto', 'svg', 'webgl', 'density']
+
+
+def scatter_mode(points, mode='auto'):
+    if mode != 'auto':
+        return mode
+    if points > DENSITY_THRESHOLD:
+        return 'density'
+    return 'webgl' if points > WEBGL_THRESHOLD else 'svg'
+
+
+# Predictions vs actual values of one model, with the identity line. 'svg' draws every point with outlined markers,
+# 'webgl' every point on the GPU, 'density' a fixed grid of counts so the figure size does not grow with the data.
+def prediction_scatter_figure(y_test, y_pred, model_name, mode='auto'):
+    y_test, y_pred = np.asarray(y_test, dtype=float), np.asarray(y_pred, dtype=float)
+    mode = scatter_mode(len(y_test), mode)
+    title = f"{MODEL_TITLES[model_name]}: Predictions vs Actual"
+    labels = {'x': 'Actual Values', 'y': 'Predicted Values'}
+
+    if mode == 'density':
+        counts, x_edges, y_edges = np.histogram2d(y_test, y_pred, bins=DENSITY_BINS)
+        with np.errstate(divide='ignore'):
+            z = np.where(counts > 0, np.log10(counts), np.nan).T  # empty cells stay transparent
+        ticks = np.arange(0, int(np.nanmax(z)) + 1) if np.isfinite(z).any() else np.array([0])
+        fig = go.Figure(go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2, z=z,
+            colorscale='Viridis', hovertemplate='Actual %{x:.0f}<br>Predicted %{y:.0f}<extra></extra>',
+            colorbar=dict(title='Points', tickvals=ticks, ticktext=[f'{10 ** tick:,}' for tick in ticks])))
+        fig.update_layout(title=title, xaxis_title=labels['x'], yaxis_title=labels['y'], plot_bgcolor='white')
+    else:
+        fig = px.scatter(x=y_test, y=y_pred, labels=labels, title=title,
+                         render_mode='webgl' if mode == 'webgl' else 'svg')
+        if mode == 'webgl':
+            fig.update_traces(marker=dict(size=4, color=MODEL_COLORS[model_name], opacity=0.5))
+        else:
+            fig.update_traces(marker=dict(size=8, color=MODEL_COLORS[model_name], line=dict(width=1, color="black")))
+
+    fig.add_shape(
+        type="line",
+        x0=y_test.min(), y0=y_test.min(),
+        x1=y_test.max(), y1=y_test.max(),
+        line=dict(color="red", dash="dash")
+    )
+    return fig
@@ -0,0 +1,68 @@
+# import libraries
+import numpy as np
+import pandas as pd
+
+from utils.calendar_table import calendar_columns, lookup
+
+RAW_DATA_PATH = 'data/hour.csv'
+
+# Scale factors of the normalized weather columns in hour.csv
+DENORMALIZE = {'temp': 41, 'atemp': 50, 'hum': 100, 'windspeed': 67}
+
+# Temperature buckets in 5-degree intervals and wind speed buckets with descriptive labels
+TEMP_BINS = [0, 5, 10, 15, 20, 25, 30, 35, 40]
+TEMP_LABELS = ['0-5', '6-10', '11-15', '16-20', '21-25', '26-30', '31-35', '36-40']
+WIND_BINS = [0, 10, 20, 30, 40, 50, 60]
+WIND_LABELS = ['Calm', 'Light', 'Moderate', 'Fresh', 'Strong', 'Gale']
+
+
+# Combine `dteday` with `hr` into a full timestamp and use it as the index
+def merge_timestamp(data):
+    data["dteday"] = pd.to_datetime(data["dteday"], format='%Y-%m-%d')
+    data["dteday"] = data["dteday"] + pd.to_timedelta(data['hr'], unit='h')
+    data.set_index('dteday', inplace=True)
+    return data
+
+
+# Scale the normalized weather columns back to °C, % and m/s
+def denormalize(data):
+    for column, factor in DENORMALIZE.items():
+        data[column] = data[column] * factor
+    return data
+
+
+# 1 if the timestamp falls within the daylight hours of its season: a join on the calendar table by hour,
+# with the rule evaluated directly only for timestamps that are not on the hour
+def add_daylight_column(data):
+    daylight = lookup(data.index, ['daylight'])['daylight'].to_numpy().astype(int)
+    partial = data.index.minute != 0
+    if partial.any():
+        daylight[partial] = calendar_columns(data.index[partial])['daylight'].to_numpy()
+    data['daylight'] = daylight
+    return data
+
+
+def add_temp_buckets(data):
+    data['temp_buckets'] = pd.cut(data['temp'], bins=TEMP_BINS, labels=TEMP_LABELS, right=False)
+    return data
+
+
+def add_wind_buckets(data):
+    data['wind_buckets'] = pd.cut(data['windspeed'], bins=WIND_BINS, labels=WIND_LABELS, right=False)
+    return data
+
+
+# Model features as in data_cleaned.csv: weather situation one-hot encoded, hour/month/weekday as sin/cos
+# (looked up from the calendar table when the index holds the timestamps)
+def encode_features(data):
+    features = data[['season', 'holiday', 'workingday', 'temp', 'hum', 'windspeed']].copy()
+    for code in (2, 3, 4):
+        features[f'weathersit_{code}'] = data['weathersit'] == code
+    cyclical = [f'{column}_{f}' for column in ('hr', 'mnth', 'weekday') for f in ('sin', 'cos')]
+    if isinstance(data.index, pd.DatetimeIndex):
+        features[cyclical] = lookup(data.index, cyclical).to_numpy()
+        return features
+    for column, period in [('hr', 24), ('mnth', 12), ('weekday', 7)]:
+        features[f'{column}_sin'] = np.sin(2 * np.pi * data[column] / period)
+        features[f'{column}_cos'] = np.cos(2 * np.pi * data[column] / period)
+    return features
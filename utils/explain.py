@@ -0,0 +1,89 @@
+# import libraries
+import hashlib
+import os
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+from catboost import Pool
+
+from utils.instrumentation import cache_lookup
+from utils.modeling import unwrap_pipeline
+
+# Contributions are cached on disk, keyed on the fitted model and the input rows; the least recently used
+# files are removed once the cache grows beyond SHAP_CACHE_MAX_BYTES
+SHAP_CACHE_DIR = 'data/shap_cache'
+SHAP_CACHE_MAX_BYTES = 64 * 2**20
+EXPECTED_VALUE = 'expected_value'
+
+
+# Hash of the fitted pipeline's parameters and state (joblib.hash is stable across processes, unlike the
+# bytes of a pickle); a retrained or different model gets a different hash
+def model_hash(model):
+    return joblib.hash(unwrap_pipeline(model))[:16]
+
+
+# Fingerprint of the input rows: values, column names and index, hashed vectorized by pandas
+def input_fingerprint(X):
+    digest = hashlib.sha1(pd.util.hash_pandas_object(X, index=True).to_numpy().tobytes())
+    digest.update(','.join(map(str, X.columns)).encode())
+    return digest.hexdigest()[:16]
+
+
+# Tree SHAP contributions of every feature for a batch of rows, computed natively by CatBoost.
+# Returns one column per input feature plus the expected value; each row sums to the model prediction.
+def shap_values(model, X):
+    pipeline = unwrap_pipeline(model)
+    preprocessing, regressor = pipeline[:-1], pipeline.steps[-1][1]
+    X_transformed = preprocessing.transform(X)
+
+    # Column names after the ColumnTransformer ('num__temp', 'remainder__weathersit_2', ...)
+    names = [name.split('__', 1)[-1] for name in preprocessing.get_feature_names_out()]
+    values = regressor.get_feature_importance(Pool(X_transformed), type='ShapValues', thread_count=-1)
+    contributions = pd.DataFrame(values, index=X.index, columns=names + [EXPECTED_VALUE])
+    return contributions[list(X.columns) + [EXPECTED_VALUE]]
+
+
+# Remove the least recently used cache files until the cache fits into max_bytes
+def evict(cache_dir=SHAP_CACHE_DIR, max_bytes=SHAP_CACHE_MAX_BYTES):
+    entries = []
+    for entry in os.scandir(cache_dir):
+        try:
+            if entry.name.endswith('.npy'):
+                entries.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+        except FileNotFoundError:  # removed by another session
+            continue
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        total -= size
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# Same as shap_values, but reuses contributions computed earlier for the same model and rows
+def cached_shap_values(model, X, cache_dir=SHAP_CACHE_DIR, max_bytes=SHAP_CACHE_MAX_BYTES):
+    path = os.path.join(cache_dir, f"{model_hash(model)}_{input_fingerprint(X)}.npy")
+    try:
+        values = np.load(path)
+        os.utime(path)  # mark as recently used
+        cache_lookup('shap', True)
+    except FileNotFoundError:
+        cache_lookup('shap', False)
+        values = shap_values(model, X).to_numpy()
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write under a temporary name first so other sessions never read a partial file
+        with tempfile.NamedTemporaryFile(dir=cache_dir, suffix='.tmp', delete=False) as f:
+            np.save(f, values)
+        os.replace(f.name, path)
+        evict(cache_dir, max_bytes)
+    return pd.DataFrame(values, index=X.index, columns=list(X.columns) + [EXPECTED_VALUE])
+
+
+# Mean absolute contribution per feature, largest first
+def global_importance(contributions):
+    return contributions.drop(columns=EXPECTED_VALUE).abs().mean().sort_values(ascending=False)
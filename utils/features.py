@@ -0,0 +1,38 @@
+# import libraries
+import pandas as pd
+
+from utils.calendar_table import lookup
+
+# Feature columns of data_cleaned.csv, in the order the models were trained on
+FEATURE_COLUMNS = [
+    'season', 'holiday', 'workingday', 'temp', 'hum', 'windspeed',
+    'weathersit_2', 'weathersit_3', 'weathersit_4',
+    'hr_sin', 'hr_cos', 'mnth_sin', 'mnth_cos', 'weekday_sin', 'weekday_cos',
+]
+
+CALENDAR_FEATURES = ['season', 'holiday', 'workingday',
+                     'hr_sin', 'hr_cos', 'mnth_sin', 'mnth_cos', 'weekday_sin', 'weekday_cos']
+
+
+# Calendar part of the model features for an array of hourly timestamps, looked up from the calendar table;
+# `holidays` are extra dates flagged on top of the table's holiday calendar
+def calendar_features(timestamps, holidays=()):
+    features = lookup(timestamps, CALENDAR_FEATURES)
+    if len(holidays):
+        extra = features.index.normalize().isin(pd.DatetimeIndex(holidays))
+        features['holiday'] = features['holiday'] | extra
+        features['workingday'] = features['workingday'] & ~extra
+    return features[CALENDAR_FEATURES].astype({'season': int, 'holiday': int, 'workingday': int})
+
+
+# Model features for a forecast horizon: calendar features per hour plus constant weather inputs
+def forecast_features(start, hours, temp, hum, windspeed, weathersit=1, holidays=()):
+    timestamps = pd.date_range(pd.Timestamp(start).floor('h'), periods=hours, freq='h')
+    features = calendar_features(timestamps, holidays)
+    features['temp'] = float(temp)
+    features['hum'] = float(hum)
+    features['windspeed'] = float(windspeed)
+    for code in (2, 3, 4):
+        features[f'weathersit_{code}'] = weathersit == code
+    features.index.name = 'dteday'
+    return features[FEATURE_COLUMNS]
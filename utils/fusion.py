@@ -0,0 +1,116 @@
+# import libraries
+import argparse
+import time
+
+import numpy as np
+from sklearn.feature_selection import SelectorMixin
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from utils.modeling import MODEL_PATHS, load_cleaned_data, load_model, split_features_target, unwrap_pipeline
+
+FUSED_LINEAR_PATH = 'data/trained_linear_fused.npz'
+
+
+# A fitted linear pipeline collapsed into one weight per raw input column and one intercept
+class FusedLinearModel:
+    def __init__(self, weights, intercept, feature_names):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.feature_names = list(feature_names)
+
+    # One matrix-vector product; DataFrames are reordered to the training columns first
+    def predict(self, X):
+        if hasattr(X, 'columns'):
+            X = X[self.feature_names].to_numpy(dtype=np.float64)
+        return np.asarray(X, dtype=np.float64) @ self.weights + self.intercept
+
+    def save(self, path=FUSED_LINEAR_PATH):
+        np.savez(path, weights=self.weights, intercept=self.intercept, feature_names=np.array(self.feature_names))
+
+    @classmethod
+    def load(cls, path=FUSED_LINEAR_PATH):
+        with np.load(path) as f:
+            return cls(f['weights'], f['intercept'][()], f['feature_names'].tolist())
+
+
+# Track the pipeline as an affine map x -> x @ A + b from the raw columns to the current columns, step by step.
+# Scalers rescale it, selectors drop columns, and the final linear model projects it to one output.
+def fuse_linear_pipeline(model):
+    pipeline = unwrap_pipeline(model)
+    n_features = pipeline.n_features_in_
+    A, b = np.eye(n_features), np.zeros(n_features)
+
+    for name, step in pipeline.steps[:-1]:
+        if step is None or step == 'passthrough':
+            continue
+        if isinstance(step, StandardScaler):
+            mean = step.mean_ if step.with_mean else 0.0
+            scale = step.scale_ if step.with_std else 1.0
+            A, b = A / scale, (b - mean) / scale
+        elif isinstance(step, MinMaxScaler):
+            A, b = A * step.scale_, b * step.scale_ + step.min_
+        elif isinstance(step, SelectorMixin):
+            support = step.get_support()
+            A, b = A[:, support], b[support]
+        else:
+            raise ValueError(f"Cannot fuse pipeline step '{name}' ({type(step).__name__})")
+
+    regressor = pipeline.steps[-1][1]
+    if not (hasattr(regressor, 'coef_') and hasattr(regressor, 'intercept_')) or np.ndim(regressor.coef_) != 1:
+        raise ValueError(f"The last step must be a single-output linear model, got {type(regressor).__name__}")
+    weights = A @ regressor.coef_
+    intercept = b @ regressor.coef_ + regressor.intercept_
+    feature_names = getattr(pipeline, 'feature_names_in_', [f'x{i}' for i in range(n_features)])
+    return FusedLinearModel(weights, intercept, feature_names)
+
+
+# Largest absolute difference between the fused scorer and the original pipeline
+def check(fused, model, X, atol=1e-6):
+    difference = float(np.max(np.abs(fused.predict(X) - model.predict(X))))
+    if difference > atol:
+        raise AssertionError(f"Fused predictions differ from the pipeline by up to {difference:.3g}")
+    return difference
+
+
+def _best_ms(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuse the linear pipeline into one dot product and compare it to predict.")
+    parser.add_argument('--batch-rows', type=int, default=1_000_000)
+    parser.add_argument('--save', action='store_true', help=f"Write the fused weights to {FUSED_LINEAR_PATH}")
+    args = parser.parse_args()
+
+    model = load_model('linear')
+    fused = fuse_linear_pipeline(model)
+    X, _ = split_features_target(load_cleaned_data())
+    difference = check(fused, model, X)
+    print(f"Fused {MODEL_PATHS['linear']} into {len(fused.weights)} weights + intercept; "
+          f"max |difference| on {len(X):,} rows: {difference:.2e}")
+
+    single = X.iloc[[0]]
+    single_array = single.to_numpy(dtype=np.float64)
+    batch = X.sample(args.batch_rows, replace=True, random_state=0)
+    batch_array = batch.to_numpy(dtype=np.float64)
+    print(f"{'':<24} {'pipeline ms':>12} {'fused ms':>10}")
+    print(f"{'1 row (DataFrame)':<24} {_best_ms(lambda: model.predict(single), 50):>12.3f} "
+          f"{_best_ms(lambda: fused.predict(single), 50):>10.3f}")
+    print(f"{'1 row (array)':<24} {'':>12} {_best_ms(lambda: fused.predict(single_array), 50):>10.4f}")
+    print(f"{f'{len(batch):,} rows':<24} {_best_ms(lambda: model.predict(batch), 3):>12.1f} "
+          f"{_best_ms(lambda: fused.predict(batch), 3):>10.1f}")
+    print(f"{f'{len(batch):,} rows (array)':<24} {'':>12} {_best_ms(lambda: fused.predict(batch_array), 3):>10.1f}")
+
+    if args.save:
+        fused.save()
+        print(f"Saved {FUSED_LINEAR_PATH}")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
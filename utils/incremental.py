@@ -0,0 +1,188 @@
+# import libraries
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+import joblib
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.pipeline import Pipeline
+
+from utils.modeling import (MODEL_PATHS, load_cleaned_data, split_features_target,
+                            unwrap_pipeline)
+
+# Versioned artifacts are written below this folder, one sub-folder per model
+VERSIONS_DIR = 'data/model_versions'
+
+
+# Continue boosting the final estimator of a fitted pipeline on new rows only.
+# The preprocessing steps are reused as fitted, so the new trees see the same feature space as the old ones.
+def continue_boosting(pipeline, X_new, y_new, rounds):
+    pipeline = unwrap_pipeline(pipeline)
+    preprocessing = Pipeline(pipeline.steps[:-1])
+    X_transformed = preprocessing.transform(X_new)
+    name, model = pipeline.steps[-1]
+
+    model_type = type(model).__name__
+    if model_type == 'XGBRegressor':
+        # XGBoost appends `n_estimators` new trees to the booster passed as `xgb_model`
+        updated = clone(model).set_params(n_estimators=rounds)
+        updated.fit(X_transformed, y_new, xgb_model=model.get_booster())
+    elif model_type == 'CatBoostRegressor':
+        # CatBoost appends `iterations` new trees to the model passed as `init_model`
+        updated = clone(model)
+        updated.set_params(iterations=rounds)
+        updated.fit(X_transformed, y_new, init_model=model, verbose=False)
+    else:
+        raise ValueError(f"Continued training is not supported for {model_type}")
+
+    return Pipeline(pipeline.steps[:-1] + [(name, updated)])
+
+
+# Refit a copy of the pipeline from scratch on the full history (used as the reference)
+def full_retrain(pipeline, X, y):
+    refit = clone(unwrap_pipeline(pipeline))
+    return refit.fit(X, y)
+
+
+# Evaluate a model on the holdout rows
+def evaluate(model, X, y):
+    y_pred = model.predict(X)
+    return {
+        'mae': round(float(mean_absolute_error(y, y_pred)), 4),
+        'mse': round(float(mean_squared_error(y, y_pred)), 4),
+        'r2': round(float(r2_score(y, y_pred)), 4),
+    }
+
+
+# Store the model under a new version and append an entry to the manifest of that model
+def save_version(model, name, record, versions_dir=VERSIONS_DIR):
+    model_dir = os.path.join(versions_dir, name)
+    os.makedirs(model_dir, exist_ok=True)
+    manifest_path = os.path.join(model_dir, 'manifest.json')
+
+    manifest = []
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    version = len(manifest) + 1
+    path = os.path.join(model_dir, f"v{version:04d}.pkl")
+    joblib.dump(model, path)
+
+    record = dict(record, version=version, path=path)
+    manifest.append(record)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return record
+
+
+# Path of the latest versioned model, or the original pickle if no version exists yet
+def latest_model_path(name, versions_dir=VERSIONS_DIR):
+    manifest_path = os.path.join(versions_dir, name, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return MODEL_PATHS[name]
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    # Versions that scored worse than the model they were trained from are kept for reference but not used
+    accepted = [record for record in manifest if record.get('accepted', True)]
+    return accepted[-1]['path'] if accepted else MODEL_PATHS[name]
+
+
+# An update is accepted when its holdout MAE is not worse than the current model's on the same rows
+def is_improvement(results, tolerance=0.0):
+    return results['incremental']['mae'] <= results['current']['mae'] * (1 + tolerance)
+
+
+# Split the history into already-seen rows, newly arrived rows and a holdout taken from the newest rows
+def split_new_rows(data, since, new_data_path=None, holdout_fraction=0.2):
+    if new_data_path:
+        history = data
+        new_rows = pd.read_csv(new_data_path, parse_dates=['dteday']).set_index('dteday')
+    else:
+        since = pd.Timestamp(since)
+        history = data[data.index < since]
+        new_rows = data[data.index >= since]
+
+    if new_rows.empty:
+        raise ValueError("No new rows to train on")
+
+    n_holdout = max(1, int(len(new_rows) * holdout_fraction))
+    return history, new_rows.iloc[:-n_holdout], new_rows.iloc[-n_holdout:]
+
+
+# Run the incremental update and the full retrain side by side and store the incremental result
+def main():
+    parser = argparse.ArgumentParser(description="Warm-start retraining of the boosted models on newly arrived hours.")
+    parser.add_argument('--model', choices=['xgb', 'catboost'], default='catboost')
+    parser.add_argument('--since', default='2012-12-01', help="Rows from this timestamp on are treated as new hours")
+    parser.add_argument('--new-data', help="CSV in the data_cleaned.csv format with the new hours (overrides --since)")
+    parser.add_argument('--rounds', type=int, default=50, help="Number of boosting rounds to add")
+    parser.add_argument('--holdout-fraction', type=float, default=0.2, help="Share of the newest rows kept for evaluation")
+    parser.add_argument('--skip-full', action='store_true', help="Do not run the full retrain comparison")
+    parser.add_argument('--promote', action='store_true',
+                        help="Copy the new version over the model used by the pages, if it is not worse than the current one")
+    parser.add_argument('--tolerance', type=float, default=0.0,
+                        help="Relative holdout MAE increase still accepted, e.g. 0.02 for 2%%")
+    args = parser.parse_args()
+
+    # - Load data and the current model (latest version if there is one)
+    data = load_cleaned_data()
+    history, new_rows, holdout = split_new_rows(data, args.since, args.new_data, args.holdout_fraction)
+    current_path = latest_model_path(args.model)
+    current_model = joblib.load(current_path)
+
+    X_new, y_new = split_features_target(new_rows)
+    X_holdout, y_holdout = split_features_target(holdout)
+
+    # 1. Incremental update on the new rows only
+    start = time.perf_counter()
+    updated = continue_boosting(current_model, X_new, y_new, args.rounds)
+    incremental_seconds = time.perf_counter() - start
+
+    results = {
+        'current': evaluate(current_model, X_holdout, y_holdout),
+        'incremental': dict(evaluate(updated, X_holdout, y_holdout), train_seconds=round(incremental_seconds, 3)),
+    }
+
+    # 2. Full retrain on history + new rows for comparison
+    if not args.skip_full:
+        X_full, y_full = split_features_target(pd.concat([history, new_rows]))
+        start = time.perf_counter()
+        retrained = full_retrain(current_model, X_full, y_full)
+        full_seconds = time.perf_counter() - start
+        results['full_retrain'] = dict(evaluate(retrained, X_holdout, y_holdout), train_seconds=round(full_seconds, 3))
+
+    # 3. Version the incremental artifact; a regression is recorded as not accepted
+    accepted = is_improvement(results, args.tolerance)
+    record = save_version(updated, args.model, {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'mode': 'incremental',
+        'rounds': args.rounds,
+        'new_rows': len(new_rows),
+        'trained_from': current_path,
+        'results': results,
+        'accepted': accepted,
+    })
+    print(json.dumps(record, indent=2))
+
+    current, incremental = results['current'], results['incremental']
+    if not accepted:
+        print(f"REGRESSION: holdout MAE {current['mae']} -> {incremental['mae']}, R2 {current['r2']} -> "
+              f"{incremental['r2']}; version {record['version']} is kept but not used for later updates")
+    if args.promote:
+        if not accepted:
+            print(f"Not promoted: {MODEL_PATHS[args.model]} is unchanged")
+            sys.exit(1)
+        shutil.copyfile(record['path'], MODEL_PATHS[args.model])
+        print(f"Promoted version {record['version']} to {MODEL_PATHS[args.model]}")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
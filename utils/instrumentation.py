@@ -0,0 +1,121 @@
+# import libraries
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+# Events are kept in a fixed-size ring buffer shared by all sessions of the server process.
+# Set BIKE_METRICS_PATH to also append every event to a local JSON-lines file.
+BUFFER_SIZE = int(os.environ.get('BIKE_METRICS_BUFFER', 10_000))
+EXPORT_PATH = os.environ.get('BIKE_METRICS_PATH')
+
+_events = deque(maxlen=BUFFER_SIZE)
+_counters = Counter()
+_lock = threading.Lock()
+_page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+# Resident memory of the process in MB
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _page_size / 2**20
+    except OSError:
+        pass
+    # Without /proc: peak RSS from getrusage (bytes on macOS, kB elsewhere); not available on Windows
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+def _record(event):
+    with _lock:
+        _events.append(event)
+    if EXPORT_PATH:
+        with open(EXPORT_PATH, 'a') as f:
+            f.write(json.dumps(event) + '\n')
+
+
+# Time a section, as a context manager or as a decorator:
+#     with timed('eda.load_csv') as t:
+#         data = pd.read_csv(...)
+#         t.rows = len(data)
+class timed:
+    def __init__(self, section, rows=None):
+        self.section = section
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.ms = (time.perf_counter() - self.start) * 1000
+        _record({
+            'type': 'timing',
+            'section': self.section,
+            'ms': self.ms,
+            'rows': self.rows,
+            'rss_mb': rss_mb(),
+            'error': exc_type.__name__ if exc_type else None,
+            'ts': time.time(),
+        })
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(self.section):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+# Increment a named counter (reruns per page, predictions, ...)
+def count(name, n=1):
+    with _lock:
+        _counters[name] += n
+
+
+# Record one script run of a page
+def rerun(page):
+    count(f'rerun.{page}')
+    _record({'type': 'rerun', 'section': page, 'rss_mb': rss_mb(), 'ts': time.time()})
+
+
+# Record a cache lookup; hit rates are derived from the hit/miss counters
+def cache_lookup(cache, hit):
+    count(f"cache.{cache}.{'hit' if hit else 'miss'}")
+
+
+# Copies of the current buffer and counters
+def events():
+    with _lock:
+        return list(_events)
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+# Hit rate per cache name
+def cache_hit_rates():
+    rates = {}
+    for name, value in counters().items():
+        if name.startswith('cache.'):
+            cache, outcome = name[len('cache.'):].rsplit('.', 1)
+            hits, lookups = rates.get(cache, (0, 0))
+            rates[cache] = (hits + value * (outcome == 'hit'), lookups + value)
+    return {cache: {'hits': hits, 'lookups': lookups, 'hit_rate': hits / lookups} for cache, (hits, lookups) in rates.items()}
+
+
+def reset():
+    with _lock:
+        _events.clear()
+        _counters.clear()
@@ -0,0 +1,183 @@
+# import libraries
+import argparse
+from collections import deque
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, r2_score
+
+from utils.modeling import (LAG_MODEL_PATH, TARGET, load_cleaned_data, load_model,
+                            split_features_target, train_test, unwrap_pipeline)
+
+# Lags in hours (previous hour, same hour yesterday, same hour last week) and rolling windows in hours
+LAGS = (1, 24, 168)
+WINDOWS = (24, 168)
+LAG_COLUMNS = [f'cnt_lag_{lag}' for lag in LAGS] + [
+    f'cnt_roll_{stat}_{window}' for window in WINDOWS for stat in ('mean', 'max')
+]
+
+HOUR = pd.Timedelta(hours=1)
+
+
+# Offline path: lag and rolling features for every hour of a cnt series, with vectorized window operations.
+# The series is put on a complete hourly index first, so missing hours count as gaps and not as neighbours.
+def lag_features(cnt):
+    hourly = cnt.astype(float).asfreq('h')
+    previous = hourly.shift(1)  # windows only look at hours before the one being predicted
+
+    features = pd.DataFrame(index=hourly.index)
+    for lag in LAGS:
+        features[f'cnt_lag_{lag}'] = hourly.shift(lag)
+    for window in WINDOWS:
+        rolling = previous.rolling(window, min_periods=1)
+        features[f'cnt_roll_mean_{window}'] = rolling.mean()
+        features[f'cnt_roll_max_{window}'] = rolling.max()
+    return features.reindex(cnt.index)
+
+
+# Add the lag features to a frame indexed by hourly timestamps
+def add_lag_features(data):
+    return data.join(lag_features(data[TARGET]))
+
+
+# Online path: ring buffer of the last hours, updated once per new hour.
+# Lags are O(1) lookups, rolling means keep running sums and rolling maxima keep monotonic queues (amortized O(1)).
+class LagFeatureStore:
+    def __init__(self):
+        self.size = max(max(LAGS), max(WINDOWS))
+        self.values = np.full(self.size, np.nan)
+        self.last_hour = None
+        self.sums = {window: 0.0 for window in WINDOWS}
+        self.counts = {window: 0 for window in WINDOWS}
+        self.maxima = {window: deque() for window in WINDOWS}
+
+    # Warm up a store from the tail of a cnt series indexed by hourly timestamps
+    @classmethod
+    def from_history(cls, cnt):
+        store = cls()
+        tail = cnt[cnt.index > cnt.index.max() - store.size * HOUR]
+        for timestamp, value in tail.items():
+            store.update(timestamp, value)
+        return store
+
+    def _push(self, hour, value):
+        slot = hour % self.size
+        for window in WINDOWS:
+            # Drop the value leaving the window (read before the slot is overwritten)
+            leaving = self.values[(hour - window) % self.size]
+            if not np.isnan(leaving):
+                self.sums[window] -= leaving
+                self.counts[window] -= 1
+        self.values[slot] = value
+
+        for window in WINDOWS:
+            maxima = self.maxima[window]
+            while maxima and maxima[0][0] <= hour - window:
+                maxima.popleft()
+            if not np.isnan(value):
+                self.sums[window] += value
+                self.counts[window] += 1
+                while maxima and maxima[-1][1] <= value:
+                    maxima.pop()
+                maxima.append((hour, value))
+        self.last_hour = hour
+
+    # Record the demand observed for one hour; skipped hours are stored as gaps
+    def update(self, timestamp, value):
+        hour = int(pd.Timestamp(timestamp).value // HOUR.value)
+        if self.last_hour is not None:
+            if hour <= self.last_hour:
+                raise ValueError(f"Hour {timestamp} is not after the last recorded hour")
+            if hour - self.last_hour > self.size:
+                # A gap longer than the buffer leaves nothing of the old hours
+                self.__init__()
+            else:
+                for missing in range(self.last_hour + 1, hour):
+                    self._push(missing, np.nan)
+        self._push(hour, float(value))
+
+    # Features of the hour following the last recorded one
+    def features(self):
+        if self.last_hour is None:
+            return {column: np.nan for column in LAG_COLUMNS}
+        target = self.last_hour + 1
+        features = {f'cnt_lag_{lag}': self.values[(target - lag) % self.size] for lag in LAGS}
+        for window in WINDOWS:
+            count = self.counts[window]
+            features[f'cnt_roll_mean_{window}'] = self.sums[window] / count if count else np.nan
+            features[f'cnt_roll_max_{window}'] = self.maxima[window][0][1] if self.maxima[window] else np.nan
+        return features
+
+    # Timestamp of the hour the features are for
+    def next_timestamp(self):
+        return pd.Timestamp(self.last_hour * HOUR.value) + HOUR
+
+
+# Replay a cnt series through the online store and return the features it produced for every hour
+def replay(cnt):
+    store = LagFeatureStore()
+    rows = []
+    for timestamp, value in cnt.items():
+        if store.last_hour is not None:
+            # Advance the store to the hour right before this one so the features are for `timestamp`
+            gap_end = int(timestamp.value // HOUR.value) - 1
+            if gap_end > store.last_hour:
+                store.update(pd.Timestamp(gap_end * HOUR.value), np.nan)
+        rows.append(store.features())
+        store.update(timestamp, value)
+    return pd.DataFrame(rows, index=cnt.index)[LAG_COLUMNS]
+
+
+# Features of any hour from a cnt series: the store is warmed up with the week before the hour and advanced to
+# the hour before it, so hours after the end of the series get missing values instead of the latest lags
+def features_at(cnt, timestamp):
+    hour = pd.Timestamp(timestamp).floor('h')
+    store = LagFeatureStore()
+    store.update(hour - (store.size + 1) * HOUR, np.nan)
+    for observed, value in cnt[(cnt.index >= hour - store.size * HOUR) & (cnt.index < hour)].items():
+        store.update(observed, value)
+    if store.next_timestamp() < hour:
+        store.update(hour - HOUR, np.nan)
+    return store.features()
+
+
+# Train copies of the CatBoost pipeline with and without the lag features on the same split, so the difference
+# in test accuracy comes from the features only
+def train_lag_model(data):
+    data = add_lag_features(data).dropna(subset=LAG_COLUMNS)
+    X, y = split_features_target(data)
+    X_train, X_test, y_train, y_test = train_test(X, y)
+    pipeline = unwrap_pipeline(load_model('catboost'))
+    model = clone(pipeline).fit(X_train, y_train)
+    baseline = clone(pipeline).fit(X_train.drop(columns=LAG_COLUMNS), y_train)
+    return model, baseline, X_test, y_test
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the lag feature store and train a CatBoost model with lag features.")
+    parser.add_argument('--save', action='store_true', help=f"Store the model at {LAG_MODEL_PATH}")
+    args = parser.parse_args()
+
+    data = load_cleaned_data()
+
+    # 1. The offline and the online path must produce the same values
+    offline = lag_features(data[TARGET])
+    online = replay(data[TARGET])
+    if not np.allclose(offline.to_numpy(), online.to_numpy(), equal_nan=True):
+        raise AssertionError("Offline and online lag features differ")
+    print(f"Offline and online features match on {len(data):,} hours")
+
+    # 2. Accuracy with and without the lag features, both trained and tested on the same rows
+    model, baseline, X_test, y_test = train_lag_model(data)
+    for name, y_pred in [('without lags', baseline.predict(X_test.drop(columns=LAG_COLUMNS))), ('with lags', model.predict(X_test))]:
+        print(f"{name:>13}: MAE={mean_absolute_error(y_test, y_pred):.2f} R2={r2_score(y_test, y_pred):.4f}")
+
+    if args.save:
+        joblib.dump(model, LAG_MODEL_PATH)
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
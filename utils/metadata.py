@@ -0,0 +1,51 @@
+# import libraries
+import json
+
+# Small bundle with widget bounds, category lists and warm-up rows, so pages and the model warm-up do not read
+# the full CSVs
+METADATA_PATH = 'data/metadata.json'
+NUMERIC_COLUMNS = ['temp', 'atemp', 'hum', 'windspeed', 'cnt']
+CATEGORY_COLUMNS = ['season', 'yr', 'mnth', 'hr', 'holiday', 'weekday', 'workingday', 'weathersit']
+
+
+# Compute the bundle from the EDA data (same rows as data_cleaned.csv, with the raw categorical columns) and the
+# representative model inputs of utils.warmup
+def build_metadata(eda_path='data/data_eda.csv'):
+    import pandas as pd
+    from utils.warmup import representative_rows
+
+    data = pd.read_csv(eda_path, parse_dates=['dteday'])
+    rows = representative_rows()
+    return {
+        'rows': len(data),
+        'start': data['dteday'].min().isoformat(),
+        'end': data['dteday'].max().isoformat(),
+        'numeric': {
+            column: {'min': float(data[column].min()), 'max': float(data[column].max())}
+            for column in NUMERIC_COLUMNS
+        },
+        'categories': {
+            column: sorted(int(value) for value in data[column].unique())
+            for column in CATEGORY_COLUMNS
+        },
+        'warmup_rows': json.loads(rows.to_json(orient='split', date_format='iso')),
+    }
+
+
+# Read the bundle (a few KB of JSON, no pandas needed)
+def load_metadata(path=METADATA_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+# Regenerate the bundle after the data changes
+def main():
+    metadata = build_metadata()
+    with open(METADATA_PATH, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    print(f"Wrote {METADATA_PATH} for {metadata['rows']:,} rows")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
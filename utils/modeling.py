@@ -0,0 +1,46 @@
+# import libraries
+import joblib
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+# Paths of the data and the pre-trained models used by the pages
+DATA_CLEANED_PATH = 'data/data_cleaned.csv'
+MODEL_PATHS = {
+    'linear': 'data/trained_linear_model.pkl',
+    'xgb': 'data/trained_xgb_model.pkl',
+    'catboost': 'data/trained_catboost_model.pkl',
+}
+# The Random Forest of the original study is not in the repository; pages show it only when the file is present
+RF_MODEL_PATH = 'data/trained_rf_model.pkl'
+# Optional models trained by `python -m utils.segments --save` and `python -m utils.lag_features --save`
+FLEET_PATH = 'data/trained_catboost_fleet.pkl'
+LAG_MODEL_PATH = 'data/trained_catboost_lag_model.pkl'
+TARGET = 'cnt'
+
+
+# Load the cleaned data with the timestamp as index
+def load_cleaned_data(path=DATA_CLEANED_PATH):
+    data = pd.read_csv(path, parse_dates=['dteday'])
+    return data.set_index('dteday')
+
+
+# Split a cleaned frame into features and target
+def split_features_target(data):
+    X = data.drop(columns=[TARGET])
+    y = data[TARGET]
+    return X, y
+
+
+# Same 80-20 split as the Modeling page, so metrics stay comparable
+def train_test(X, y):
+    return train_test_split(X, y, test_size=0.2, random_state=42)
+
+
+# Load a pre-trained model by its short name ('linear', 'xgb', 'catboost')
+def load_model(name):
+    return joblib.load(MODEL_PATHS[name])
+
+
+# The pickles hold the fitted search object, the pipeline lives in best_estimator_
+def unwrap_pipeline(model):
+    return getattr(model, 'best_estimator_', model)
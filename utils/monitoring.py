@@ -0,0 +1,412 @@
+# import libraries
+import argparse
+import bisect
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.modeling import load_cleaned_data, load_model, split_features_target, train_test
+
+MONITOR_STATE_PATH = 'data/monitor_state.json'
+
+# Monitored inputs of the model, the weather situation (one-hot in the features) and the residual hour bands
+NUMERIC_FEATURES = ['temp', 'hum', 'windspeed']
+WEATHERSIT_CODES = [1, 2, 3, 4]
+HOUR_BANDS = {'night': (0, 6), 'morning peak': (6, 10), 'midday': (10, 16), 'evening peak': (16, 20), 'late': (20, 24)}
+BINS = 20
+
+# Alert levels: population stability index per feature, live / reference MAE per hour band
+PSI_WARN, PSI_ALERT = 0.1, 0.25
+MAE_WARN, MAE_ALERT = 1.2, 1.5
+MIN_OBSERVATIONS = 100  # per feature
+MIN_BAND_OBSERVATIONS = 30  # per hour band
+PSI_EPSILON = 1e-4
+
+_BAND_OF_HOUR = np.array([next(i for i, (low, high) in enumerate(HOUR_BANDS.values()) if low <= hour < high)
+                          for hour in range(24)])
+_BAND_NAMES = list(HOUR_BANDS)
+
+# Serializes the load-update-save cycles of the sessions of one server process
+_state_lock = threading.Lock()
+
+
+# Running count, mean and sum of squared deviations (Welford); batches are merged with Chan's formula
+class Welford:
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n, self.mean, self.m2 = n, mean, m2
+
+    def update(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def update_batch(self, values):
+        if len(values) == 0:
+            return
+        n, mean = len(values), float(np.mean(values))
+        m2 = float(np.sum((values - mean) ** 2))
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.n * n / total
+        self.n = total
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else float('nan')
+
+    def to_dict(self):
+        return {'n': self.n, 'mean': self.mean, 'm2': self.m2}
+
+
+# Slot of a value in a fixed-bin histogram: 0 below the reference range, 1..BINS inside, BINS + 1 above
+def bin_index(values, edges):
+    values = np.asarray(values, dtype=float)
+    slots = np.searchsorted(edges[1:-1], values, side='right') + 1
+    return np.where(values < edges[0], 0, np.where(values > edges[-1], len(edges), slots))
+
+
+# Same slot for a single value, in pure Python
+def _slot(value, edges):
+    if value < edges[0]:
+        return 0
+    if value > edges[-1]:
+        return len(edges)
+    return bisect.bisect_right(edges, value, 1, len(edges) - 1)
+
+
+# Population stability index between two count vectors over the same bins
+def psi(reference_counts, live_counts):
+    expected = np.asarray(reference_counts, dtype=float) / max(np.sum(reference_counts), 1) + PSI_EPSILON
+    actual = np.asarray(live_counts, dtype=float) / max(np.sum(live_counts), 1) + PSI_EPSILON
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+# Weather situation code (1-4) from the one-hot model features
+def weathersit_codes(X):
+    onehot = X[[f'weathersit_{code}' for code in WEATHERSIT_CODES[1:]]].to_numpy(dtype=bool)
+    return np.where(onehot.any(axis=1), onehot.argmax(axis=1) + 2, 1)
+
+
+# Incremental drift and accuracy monitor: the reference is computed once from the training data, the live
+# statistics are updated per observation in constant time (a histogram slot, a Welford step, a band lookup)
+# and persisted as a few KB of JSON.
+class DriftMonitor:
+    def __init__(self, reference, live=None, updated=None):
+        self.reference = reference
+        self.updated = updated
+        self.reset() if live is None else self._load_live(live)
+
+    # Reference distributions from data_cleaned.csv and reference residuals of the model on the test split
+    @classmethod
+    def from_training_data(cls, data=None, model=None):
+        data = load_cleaned_data() if data is None else data
+        model = load_model('catboost') if model is None else model
+        X, y = split_features_target(data)
+
+        features = {}
+        for name in NUMERIC_FEATURES:
+            values = X[name].to_numpy(dtype=float)
+            edges = np.linspace(values.min(), values.max(), BINS + 1)
+            features[name] = {'edges': edges.tolist(), 'counts': np.bincount(bin_index(values, edges), minlength=BINS + 2).tolist(),
+                              'mean': float(values.mean()), 'std': float(values.std(ddof=1))}
+        weathersit = np.bincount(weathersit_codes(X), minlength=5)[1:].tolist()
+
+        _, X_test, _, y_test = train_test(X, y)
+        residuals = y_test.to_numpy() - model.predict(X_test)
+        bands = _BAND_OF_HOUR[pd.DatetimeIndex(X_test.index).hour]
+        residual_reference = {}
+        for i, band in enumerate(HOUR_BANDS):
+            r = residuals[bands == i]
+            residual_reference[band] = {'n': int(len(r)), 'mae': float(np.abs(r).mean()), 'bias': float(r.mean())}
+        return cls({'features': features, 'weathersit': weathersit, 'residuals': residual_reference,
+                    'rows': len(X), 'created': datetime.now().isoformat(timespec='seconds')})
+
+    # Empty live statistics
+    def reset(self):
+        self.stats = {name: Welford() for name in NUMERIC_FEATURES}
+        self.counts = {name: np.zeros(BINS + 2, dtype=np.int64) for name in NUMERIC_FEATURES}
+        self.weathersit = np.zeros(len(WEATHERSIT_CODES), dtype=np.int64)
+        self.residuals = {band: Welford() for band in HOUR_BANDS}
+        self.abs_errors = {band: 0.0 for band in HOUR_BANDS}
+        self.observations = 0
+
+    def _load_live(self, live):
+        self.stats = {name: Welford(**live['stats'][name]) for name in NUMERIC_FEATURES}
+        self.counts = {name: np.array(live['counts'][name], dtype=np.int64) for name in NUMERIC_FEATURES}
+        self.weathersit = np.array(live['weathersit'], dtype=np.int64)
+        self.residuals = {band: Welford(**live['residuals'][band]) for band in HOUR_BANDS}
+        self.abs_errors = dict(live['abs_errors'])
+        self.observations = live['observations']
+
+    # One observation: a mapping with the model features, its hour, and the actual count once it is known
+    def update(self, features, hour, prediction=None, actual=None):
+        for name in NUMERIC_FEATURES:
+            value = float(features[name])
+            self.stats[name].update(value)
+            self.counts[name][_slot(value, self.reference['features'][name]['edges'])] += 1
+        code = next((c for c in WEATHERSIT_CODES[1:] if features[f'weathersit_{c}']), 1)
+        self.weathersit[code - 1] += 1
+        if prediction is not None and actual is not None:
+            band = _BAND_NAMES[_BAND_OF_HOUR[hour]]
+            residual = float(actual) - float(prediction)
+            self.residuals[band].update(residual)
+            self.abs_errors[band] += abs(residual)
+        self.observations += 1
+
+    # Many observations at once (a frame of model features indexed by timestamp), same statistics as update()
+    def update_batch(self, X, predictions=None, actuals=None):
+        for name in NUMERIC_FEATURES:
+            values = X[name].to_numpy(dtype=float)
+            self.stats[name].update_batch(values)
+            self.counts[name] += np.bincount(bin_index(values, self.reference['features'][name]['_edges']),
+                                             minlength=BINS + 2)
+        self.weathersit += np.bincount(weathersit_codes(X), minlength=5)[1:]
+        if predictions is not None and actuals is not None:
+            residuals = np.asarray(actuals, dtype=float) - np.asarray(predictions, dtype=float)
+            bands = _BAND_OF_HOUR[pd.DatetimeIndex(X.index).hour]
+            for i, band in enumerate(HOUR_BANDS):
+                self.residuals[band].update_batch(residuals[bands == i])
+                self.abs_errors[band] += float(np.abs(residuals[bands == i]).sum())
+        self.observations += len(X)
+
+    # Drift per monitored input: live vs reference mean (in reference standard deviations) and PSI
+    def feature_report(self):
+        rows = []
+        for name in NUMERIC_FEATURES:
+            reference, stats = self.reference['features'][name], self.stats[name]
+            rows.append({'feature': name, 'observations': stats.n, 'reference mean': reference['mean'],
+                         'live mean': stats.mean if stats.n else np.nan, 'live std': stats.std,
+                         'shift (std)': (stats.mean - reference['mean']) / reference['std'] if stats.n else np.nan,
+                         'PSI': psi(reference['counts'], self.counts[name]) if stats.n else np.nan})
+        n = int(self.weathersit.sum())
+        rows.append({'feature': 'weathersit', 'observations': n, 'reference mean': np.nan, 'live mean': np.nan,
+                     'live std': np.nan, 'shift (std)': np.nan,
+                     'PSI': psi(self.reference['weathersit'], self.weathersit) if n else np.nan})
+        report = pd.DataFrame(rows).set_index('feature')
+        report['status'] = [_level(p, n, PSI_WARN, PSI_ALERT, MIN_OBSERVATIONS)
+                            for p, n in zip(report['PSI'], report['observations'])]
+        return report
+
+    # Accuracy per hour band: live MAE and bias vs the model's test-split residuals
+    def residual_report(self):
+        rows = []
+        for band, stats in self.residuals.items():
+            reference = self.reference['residuals'][band]
+            mae = self.abs_errors[band] / stats.n if stats.n else np.nan
+            rows.append({'band': band, 'hours': '{}-{}'.format(*HOUR_BANDS[band]), 'observations': stats.n,
+                         'reference MAE': reference['mae'], 'live MAE': mae, 'MAE ratio': mae / reference['mae'],
+                         'reference bias': reference['bias'], 'live bias': stats.mean if stats.n else np.nan})
+        report = pd.DataFrame(rows).set_index('band')
+        report['status'] = [_level(r, n, MAE_WARN, MAE_ALERT, MIN_BAND_OBSERVATIONS)
+                            for r, n in zip(report['MAE ratio'], report['observations'])]
+        return report
+
+    # Warnings and alerts as (level, message)
+    def alerts(self):
+        messages = []
+        for name, row in self.feature_report().iterrows():
+            if row['status'] in ('warn', 'alert'):
+                messages.append((row['status'], f"{name}: PSI {row['PSI']:.2f} over {row['observations']:,} observations"))
+        for band, row in self.residual_report().iterrows():
+            if row['status'] in ('warn', 'alert'):
+                messages.append((row['status'], f"{band} ({row['hours']} h): MAE {row['live MAE']:.1f} is "
+                                                f"{row['MAE ratio']:.2f}x the reference {row['reference MAE']:.1f}"))
+        return sorted(messages, key=lambda message: message[0] != 'alert')
+
+    # Reference and live histograms of one feature as proportions, labelled by bin
+    def histogram(self, name):
+        if name == 'weathersit':
+            labels = [str(code) for code in WEATHERSIT_CODES]
+            reference, live = self.reference['weathersit'], self.weathersit
+        else:
+            edges = self.reference['features'][name]['edges']
+            labels = [f'< {edges[0]:.1f}'] + [f'{low:.1f}-{high:.1f}' for low, high in zip(edges[:-1], edges[1:])] + [f'> {edges[-1]:.1f}']
+            reference, live = self.reference['features'][name]['counts'], self.counts[name]
+        return pd.DataFrame({'bin': labels,
+                             'reference': np.asarray(reference) / max(np.sum(reference), 1),
+                             'live': np.asarray(live) / max(np.sum(live), 1)})
+
+    # Live statistics as JSON-serializable lists and dicts, the inverse of _load_live()
+    def live_state(self):
+        return {
+            'stats': {name: stats.to_dict() for name, stats in self.stats.items()},
+            'counts': {name: counts.tolist() for name, counts in self.counts.items()},
+            'weathersit': self.weathersit.tolist(),
+            'residuals': {band: stats.to_dict() for band, stats in self.residuals.items()},
+            'abs_errors': self.abs_errors,
+            'observations': self.observations,
+        }
+
+    # Persist reference and live state. Every writer uses its own temporary file, renamed over the state at
+    # the end, so concurrent writers never see a partial file (the last rename wins).
+    def save(self, path=MONITOR_STATE_PATH):
+        self.updated = datetime.now().isoformat(timespec='seconds')
+        reference = {**self.reference, 'features': {name: {k: v for k, v in f.items() if k != '_edges'}
+                                                      for name, f in self.reference['features'].items()}}
+        state = {'reference': reference, 'updated': self.updated, 'live': self.live_state()}
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path) or '.', suffix='.tmp', delete=False) as f:
+            json.dump(state, f)
+        os.replace(f.name, path)
+
+    @classmethod
+    def load(cls, path=MONITOR_STATE_PATH):
+        with open(path) as f:
+            state = json.load(f)
+        return cls(state['reference'], state['live'], state['updated'])
+
+    # Saved monitor, or a new one with the reference built from the training data (offline only: building the
+    # reference reads data_cleaned.csv and predicts the test split)
+    @classmethod
+    def load_or_create(cls, path=MONITOR_STATE_PATH):
+        if os.path.exists(path):
+            return cls.load(path)
+        monitor = cls.from_training_data()
+        monitor.save(path)
+        return monitor
+
+    # New reference from the training data, keeping the live statistics when the histogram bins are unchanged
+    # (live counts binned on other edges cannot be compared with the new reference, so they are reset then)
+    def rebuild_reference(self, data=None, model=None):
+        rebuilt = DriftMonitor.from_training_data(data, model)
+        kept = all(rebuilt.reference['features'][name]['edges'] == self.reference['features'][name]['edges']
+                   for name in NUMERIC_FEATURES)
+        live = self.live_state() if kept else None
+        self.reference = rebuilt.reference
+        self.reset() if live is None else self._load_live(live)
+        return kept
+
+    @property
+    def reference(self):
+        return self._reference
+
+    # Bin edges are kept as arrays next to the JSON lists, for the per-observation searchsorted
+    @reference.setter
+    def reference(self, reference):
+        for feature in reference['features'].values():
+            feature['_edges'] = np.asarray(feature['edges'])
+        self._reference = reference
+
+
+# Exclusive access to the saved state for a load-update-save cycle: the thread lock for the sessions of this
+# process, plus an advisory lock on <state>.lock for other processes (several servers, the command line) where
+# fcntl is available; on Windows only the sessions of one process are serialized
+@contextlib.contextmanager
+def state_lock(path=MONITOR_STATE_PATH):
+    with _state_lock:
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        with open(f'{path}.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Record one served prediction's inputs in the saved monitor; the actual count comes later with the
+# observations. Does nothing until the reference has been built with `python -m utils.monitoring`.
+def record_observation(features, hour, prediction=None, actual=None, path=MONITOR_STATE_PATH):
+    if not os.path.exists(path):
+        return False
+    with state_lock(path):
+        monitor = DriftMonitor.load(path)
+        monitor.update(features, hour, prediction, actual)
+        monitor.save(path)
+    return True
+
+
+# Clear the live statistics of the saved monitor
+def reset_state(path=MONITOR_STATE_PATH):
+    with state_lock(path):
+        monitor = DriftMonitor.load(path)
+        monitor.reset()
+        monitor.save(path)
+
+
+def _level(value, observations, warn, alert, minimum):
+    if observations < minimum or np.isnan(value):
+        return 'collecting'
+    return 'alert' if value >= alert else 'warn' if value >= warn else 'ok'
+
+
+# Replay test-split hours one by one through the monitor, optionally with shifted inputs to simulate drift
+def replay(monitor, rows, shifts=None, seed=0):
+    model = load_model('catboost')
+    X, y = split_features_target(load_cleaned_data())
+    _, X_test, _, y_test = train_test(X, y)
+    sample = X_test.sample(min(rows, len(X_test)), random_state=seed).sort_index()
+    for name, shift in (shifts or {}).items():
+        sample[name] = sample[name] + shift
+    predictions = model.predict(sample)
+    records, hours, actuals = sample.to_dict('records'), sample.index.hour, y_test[sample.index].to_numpy()
+
+    start = time.perf_counter()
+    for features, hour, prediction, actual in zip(records, hours, predictions, actuals):
+        monitor.update(features, hour, prediction, actual)
+    return len(sample), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the drift and accuracy monitor of the CatBoost model.")
+    parser.add_argument('--state', default=MONITOR_STATE_PATH)
+    parser.add_argument('--observations', help="CSV in the data_cleaned.csv format with newly observed hours")
+    parser.add_argument('--replay', type=int, help="Replay this many test-split hours one observation at a time")
+    parser.add_argument('--shift', default='', help="Shift replayed inputs to simulate drift, e.g. temp=6,hum=-15")
+    parser.add_argument('--reset', action='store_true', help="Clear the live statistics (the reference is kept)")
+    parser.add_argument('--rebuild-reference', action='store_true',
+                        help="Recompute the reference from data_cleaned.csv; the live statistics are kept unless the "
+                             "histogram bins change")
+    parser.add_argument('--strict', action='store_true', help="Exit with status 1 when there is an alert")
+    args = parser.parse_args()
+
+    # The whole load-update-save cycle holds the lock, so prediction pages recording meanwhile are not lost
+    with state_lock(args.state):
+        if args.rebuild_reference and os.path.exists(args.state):
+            monitor = DriftMonitor.load(args.state)
+            if monitor.rebuild_reference():
+                print(f"Reference rebuilt, {monitor.observations:,} live observations kept")
+            else:
+                print("Reference rebuilt with new histogram bins, live statistics reset")
+        else:
+            monitor = DriftMonitor.load_or_create(args.state)
+        if args.reset:
+            monitor.reset()
+        if args.observations:
+            observed = pd.read_csv(args.observations, parse_dates=['dteday']).set_index('dteday')
+            X, y = split_features_target(observed)
+            predictions = load_model('catboost').predict(X)
+            start = time.perf_counter()
+            monitor.update_batch(X, predictions, y)
+            print(f"Added {len(X):,} observations in {(time.perf_counter() - start) * 1000:.1f} ms")
+        if args.replay:
+            shifts = {name: float(value) for name, value in (item.split('=') for item in args.shift.split(',') if item)}
+            n, seconds = replay(monitor, args.replay, shifts)
+            print(f"Replayed {n:,} observations: {seconds / n * 1e6:.1f} µs per update")
+        monitor.save(args.state)
+
+    print(monitor.feature_report().round(3).to_string())
+    print()
+    print(monitor.residual_report().round(2).to_string())
+    alerts = monitor.alerts()
+    print()
+    print('\n'.join(f"{level.upper()}: {message}" for level, message in alerts) or "No alerts")
+    if args.strict and any(level == 'alert' for level, _ in alerts):
+        sys.exit(1)
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# import libraries
+import argparse
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from utils.cleaning import denormalize, merge_timestamp
+
+# Parquet datasets in hive layout: <root>/yr=1/mnth=7/[city=3/]part-*.parquet
+PARTITIONED_ROOT = 'data/partitioned'
+PARTITION_COLUMNS = ['yr', 'mnth']
+BASE_YEAR = 2011  # yr = 0 in hour.csv
+
+# Path and modification time of the CSV a dataset was built from, next to the partitions (files starting with
+# an underscore are not part of the dataset)
+SOURCE_FILE = '_source.json'
+
+
+# Bring a chunk of any of the CSVs to the EDA layout: timestamp column, denormalized weather, yr/mnth present
+def _prepare(chunk):
+    if 'instant' in chunk.columns:  # raw hour.csv schema (also the synthetic data)
+        chunk = denormalize(merge_timestamp(chunk).drop(columns='instant')).reset_index()
+    chunk['dteday'] = pd.to_datetime(chunk['dteday'])
+    if 'yr' not in chunk.columns:  # data_cleaned.csv only has the timestamp
+        chunk['yr'] = chunk['dteday'].dt.year - BASE_YEAR
+    if 'mnth' not in chunk.columns:
+        chunk['mnth'] = chunk['dteday'].dt.month
+    return chunk
+
+
+# Partition a CSV in chunks, so files larger than memory can be converted
+def build(source, root, chunksize=1_000_000):
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    rows = 0
+    for i, chunk in enumerate(pd.read_csv(source, chunksize=chunksize)):
+        chunk = _prepare(chunk)
+        partition_columns = PARTITION_COLUMNS + (['city'] if 'city' in chunk.columns else [])
+        ds.write_dataset(pa.Table.from_pandas(chunk, preserve_index=False), root, format='parquet',
+                         partitioning=ds.partitioning(pa.schema([(c, pa.int64()) for c in partition_columns]), flavor='hive'),
+                         basename_template=f'part-{i:05d}-{{i}}.parquet', existing_data_behavior='overwrite_or_ignore',
+                         max_rows_per_group=1 << 20)
+        rows += len(chunk)
+    with open(os.path.join(root, SOURCE_FILE), 'w') as f:
+        json.dump({'source': source, 'mtime': os.path.getmtime(source)}, f)
+    return rows
+
+
+# Modification time the source CSV had when the dataset was built; None for datasets written before it was recorded
+def source_mtime(root):
+    try:
+        with open(os.path.join(root, SOURCE_FILE)) as f:
+            return json.load(f)['mtime']
+    except FileNotFoundError:
+        return None
+
+
+def open_dataset(root):
+    return ds.dataset(root, format='parquet', partitioning='hive')
+
+
+# Filters use the pandas/pyarrow notation: [('workingday', '==', 1), ('mnth', 'in', [6, 7, 8])].
+# Predicates on partition columns skip whole directories; the others are pushed down to the parquet reader,
+# which skips row groups by their statistics. Only the requested columns are read.
+def query(root, columns=None, filters=None, dataset=None):
+    dataset = open_dataset(root) if dataset is None else dataset
+    expression = pq.filters_to_expression(filters) if filters else None
+    data = dataset.to_table(columns=columns, filter=expression).to_pandas()
+    # Partition values are discovered from the directory names as int32; restore the CSV dtype
+    for column in set(PARTITION_COLUMNS + ['city']) & set(data.columns):
+        data[column] = data[column].astype('int64')
+    return data
+
+
+# Files that a query would read, for checking the pruning
+def matching_files(root, filters=None, dataset=None):
+    dataset = open_dataset(root) if dataset is None else dataset
+    expression = pq.filters_to_expression(filters) if filters else None
+    return [fragment.path for fragment in dataset.get_fragments(filter=expression)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a CSV as a parquet dataset partitioned by year/month (and city).")
+    parser.add_argument('--source', default='data/data_eda.csv', help="data_eda.csv, data_cleaned.csv or an hour.csv-like file")
+    parser.add_argument('--root', help="Output folder, default data/partitioned/<source name>")
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    root = args.root or os.path.join(PARTITIONED_ROOT, os.path.splitext(os.path.basename(args.source))[0])
+    start = time.perf_counter()
+    rows = build(args.source, root, args.chunksize)
+    files = len(matching_files(root))
+    print(f"Wrote {rows:,} rows to {root} in {files} files ({time.perf_counter() - start:.1f}s)")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# import libraries
+import argparse
+import functools
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from utils.cleaning import add_temp_buckets, add_wind_buckets
+from utils.partitioned import PARTITIONED_ROOT, matching_files, open_dataset, source_mtime
+
+# Relative accuracy of the sketches: every quantile is within 1% of the value of the data at its (lower) rank
+ALPHA = 0.01
+QUANTILES = [0.5, 0.9, 0.99]
+
+# Partitioned copy of data_eda.csv (`python -m utils.partitioned`)
+EDA_SOURCE = 'data/data_eda.csv'
+EDA_ROOT = os.path.join(PARTITIONED_ROOT, 'data_eda')
+
+# Merged sketches of the EDA heatmaps, precomputed from the partitions with `python -m utils.quantiles --save`
+SKETCH_DIR = 'data/sketches'
+HEATMAP_GROUPINGS = [['hr', 'weathersit'], ['hr', 'temp_buckets'], ['hr', 'wind_buckets']]
+
+
+# Per-group quantile sketch with logarithmic buckets (DDSketch): a positive value x falls into bucket
+# k = ceil(log_gamma(x)) with gamma = (1 + alpha) / (1 - alpha), zeros are counted apart. A quantile is read as
+# the midpoint of its bucket, which is within alpha of the true value. Sketches merge by adding bucket counts,
+# so partitions can be sketched independently; the size depends on the value range, not on the row count.
+class GroupedSketch:
+    def __init__(self, groups, counts, zeros, offset, alpha=ALPHA, source_rows=None, source_mtime=None):
+        self.groups = groups  # MultiIndex, one entry per group
+        self.counts = counts  # (groups, buckets) counts of the positive values, bucket j is key offset + j
+        self.zeros = zeros  # (groups,) counts of the zeros
+        self.offset = offset
+        self.alpha = alpha
+        self.source_rows = source_rows  # rows of the data the sketch was built from, including skipped ones
+        self.source_mtime = source_mtime  # modification time of the CSV those rows were read from, when known
+
+    @property
+    def gamma(self):
+        return (1 + self.alpha) / (1 - self.alpha)
+
+    # One pass: group ids by mixed-radix codes of the group columns, then a single bincount of (group, bucket)
+    @classmethod
+    def build(cls, data, by, value='cnt', alpha=ALPHA):
+        values = data[value].to_numpy(dtype=float)
+        keep = ~np.isnan(values)
+        if (values[keep] < 0).any():
+            raise ValueError(f"Negative values in '{value}' cannot be sketched")
+
+        codes, levels = np.zeros(len(data), dtype=np.int64), []
+        for column in by:
+            column_codes, uniques = pd.factorize(data[column], sort=True)
+            keep &= column_codes >= 0
+            codes = codes * len(uniques) + column_codes
+            levels.append(uniques)
+        codes, values = codes[keep], values[keep]
+
+        present = np.bincount(codes, minlength=int(np.prod([len(level) for level in levels]))) > 0
+        cells = np.flatnonzero(present)
+        group_ids = (np.cumsum(present) - 1)[codes]
+        groups = pd.MultiIndex.from_arrays(
+            [level.take(index) for level, index in zip(levels, np.unravel_index(cells, [len(l) for l in levels]))],
+            names=by)
+
+        positive = values > 0
+        gamma = (1 + alpha) / (1 - alpha)
+        keys = np.ceil(np.log(values[positive]) / np.log(gamma)).astype(np.int64)
+        offset = int(keys.min()) if len(keys) else 0
+        n_buckets = int(keys.max()) - offset + 1 if len(keys) else 1
+        counts = np.bincount(group_ids[positive] * n_buckets + (keys - offset),
+                             minlength=len(groups) * n_buckets).reshape(len(groups), n_buckets)
+        zeros = np.bincount(group_ids[~positive], minlength=len(groups))
+        return cls(groups, counts, zeros, offset, alpha, len(data))
+
+    # Sum of two sketches: union of the groups, buckets aligned on the common key range
+    def merge(self, other):
+        if self.alpha != other.alpha:
+            raise ValueError("Only sketches with the same accuracy can be merged")
+        groups = self.groups.union(other.groups)
+        offset = min(self.offset, other.offset)
+        n_buckets = max(self.offset + self.counts.shape[1], other.offset + other.counts.shape[1]) - offset
+        counts = np.zeros((len(groups), n_buckets), dtype=np.int64)
+        zeros = np.zeros(len(groups), dtype=np.int64)
+        for sketch in (self, other):
+            rows = groups.get_indexer(sketch.groups)
+            start = sketch.offset - offset
+            counts[rows, start:start + sketch.counts.shape[1]] += sketch.counts
+            zeros[rows] += sketch.zeros
+        source_rows = None if None in (self.source_rows, other.source_rows) else self.source_rows + other.source_rows
+        return GroupedSketch(groups, counts, zeros, offset, self.alpha, source_rows)
+
+    def count(self):
+        return pd.Series(self.counts.sum(axis=1) + self.zeros, index=self.groups)
+
+    # Quantiles of every group (lower rank, like interpolation='lower'); a frame with one column per quantile
+    def quantiles(self, qs=QUANTILES):
+        cumulative = np.cumsum(np.column_stack([self.zeros, self.counts]), axis=1)
+        totals = cumulative[:, -1]
+        midpoints = 2 * self.gamma ** np.arange(self.offset, self.offset + self.counts.shape[1]) / (self.gamma + 1)
+        values = np.concatenate([[0.0], midpoints])
+        result = {}
+        for q in qs:
+            ranks = np.floor(q * (totals - 1))
+            buckets = (cumulative > ranks[:, None]).argmax(axis=1)
+            result[q] = np.where(totals > 0, values[buckets], np.nan)
+        return pd.DataFrame(result, index=self.groups)
+
+    def nbytes(self):
+        return self.counts.nbytes + self.zeros.nbytes
+
+    # Store as .npz; categorical group columns keep their categories (and so their order)
+    def save(self, path):
+        arrays = {'counts': self.counts, 'zeros': self.zeros, 'offset': self.offset, 'alpha': self.alpha,
+                  'source_rows': -1 if self.source_rows is None else self.source_rows,
+                  'source_mtime': np.nan if self.source_mtime is None else self.source_mtime,
+                  'names': np.array(self.groups.names, dtype=str)}
+        for i in range(self.groups.nlevels):
+            values = self.groups.get_level_values(i)
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                arrays[f'codes_{i}'] = values.codes
+                arrays[f'categories_{i}'] = values.categories.to_numpy(dtype=str)
+                arrays[f'ordered_{i}'] = values.dtype.ordered
+            else:
+                arrays[f'values_{i}'] = values.to_numpy()
+        # Written under a temporary name and renamed, so a page never reads a partial file
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or '.', suffix='.tmp', delete=False) as f:
+            np.savez(f, **arrays)
+        os.replace(f.name, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            levels = []
+            for i, name in enumerate(arrays['names']):
+                if f'codes_{i}' in arrays:
+                    levels.append(pd.Categorical.from_codes(arrays[f'codes_{i}'], arrays[f'categories_{i}'],
+                                                            ordered=bool(arrays[f'ordered_{i}'])))
+                else:
+                    levels.append(arrays[f'values_{i}'])
+            source_rows = int(arrays['source_rows'])
+            mtime = float(arrays['source_mtime']) if 'source_mtime' in arrays else np.nan
+            return cls(pd.MultiIndex.from_arrays(levels, names=list(arrays['names'])), arrays['counts'],
+                       arrays['zeros'], int(arrays['offset']), float(arrays['alpha']),
+                       None if source_rows < 0 else source_rows, None if np.isnan(mtime) else mtime)
+
+
+# Bucket columns of the EDA heatmaps, derived from temp and windspeed when they are read
+def _with_buckets(data):
+    if 'temp' in data.columns:
+        data = add_temp_buckets(data)
+    if 'windspeed' in data.columns:
+        data = add_wind_buckets(data)
+    return data
+
+
+# File of the stored sketch of a grouping
+def sketch_path(by, sketch_dir=SKETCH_DIR):
+    return os.path.join(sketch_dir, f"{'-'.join(by)}.npz")
+
+
+@functools.lru_cache(maxsize=32)
+def _load_cached(path, mtime):
+    return GroupedSketch.load(path)
+
+
+# Stored sketch of a grouping, read once per file version; None when it has not been precomputed or when the
+# source CSV has been modified since the partitions it was built from were written
+def load_sketch(by, sketch_dir=SKETCH_DIR, source=EDA_SOURCE):
+    path = sketch_path(by, sketch_dir)
+    try:
+        sketch = _load_cached(path, os.path.getmtime(path))
+        mtime = os.path.getmtime(source)
+    except FileNotFoundError:
+        return None
+    return sketch if sketch.source_mtime == mtime else None
+
+
+# Worker: sketch the value per group for one batch of partition files
+def sketch_files(files, root, groupings, value, alpha):
+    columns = sorted({value, 'temp', 'windspeed'} | {c for by in groupings for c in by} - {'temp_buckets', 'wind_buckets'})
+    dataset = ds.dataset(files, format='parquet', partitioning='hive', partition_base_dir=root)
+    data = _with_buckets(dataset.to_table(columns=columns).to_pandas())
+    return [GroupedSketch.build(data, by, value, alpha) for by in groupings]
+
+
+# Sketch the partition files in a process pool, a few batches per worker, and merge the results per grouping
+def sketch_partitioned(root=EDA_ROOT, groupings=(('hr', 'weathersit'),), value='cnt', alpha=ALPHA,
+                       workers=None, tasks_per_worker=4, filters=None):
+    files = matching_files(root, filters, open_dataset(root))
+    n_batches = min(len(files), (workers or os.cpu_count()) * tasks_per_worker)
+    batches = [files[i::n_batches] for i in range(n_batches)]
+    groupings = [list(by) for by in groupings]
+    worker = functools.partial(sketch_files, root=root, groupings=groupings, value=value, alpha=alpha)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = list(pool.map(worker, batches))
+    return [functools.reduce(GroupedSketch.merge, sketches) for sketches in zip(*partials)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-group demand percentiles of the partitioned dataset from merged sketches.")
+    parser.add_argument('--root', default=EDA_ROOT)
+    parser.add_argument('--by', default='hr,weathersit', help="Comma-separated group columns")
+    parser.add_argument('--quantiles', default='0.5,0.9,0.99')
+    parser.add_argument('--alpha', type=float, default=ALPHA)
+    parser.add_argument('--workers', type=int, help="Processes, default one per CPU")
+    parser.add_argument('--save', action='store_true',
+                        help=f"Sketch the groupings of the EDA heatmaps instead of --by and store them in {SKETCH_DIR}")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.root):
+        parser.error(f"{args.root} does not exist; build it with `python -m utils.partitioned`")
+    start = time.perf_counter()
+    groupings = HEATMAP_GROUPINGS if args.save else [args.by.split(',')]
+    sketches = sketch_partitioned(args.root, groupings, alpha=args.alpha, workers=args.workers)
+    if args.save:
+        os.makedirs(SKETCH_DIR, exist_ok=True)
+        for by, sketch in zip(groupings, sketches):
+            sketch.source_mtime = source_mtime(args.root)
+            sketch.save(sketch_path(by))
+            print(f"Wrote {sketch_path(by)}: {len(sketch.groups)} groups, {sketch.nbytes() / 1024:.0f} KB")
+        print(f"{sketches[0].source_rows:,} rows in {time.perf_counter() - start:.1f}s")
+        return
+
+    sketch, = sketches
+    qs = [float(q) for q in args.quantiles.split(',')]
+    print(sketch.quantiles(qs).round(1).to_string())
+    print(f"{int(sketch.count().sum()):,} rows in {len(sketch.groups)} groups, sketch {sketch.nbytes() / 1024:.0f} KB, "
+          f"{time.perf_counter() - start:.1f}s")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# import libraries
+import argparse
+import functools
+import hashlib
+import html
+import inspect
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import pandas as pd
+import plotly
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from utils import charts
+from utils.modeling import (DATA_CLEANED_PATH, MODEL_PATHS, RF_MODEL_PATH, load_cleaned_data, split_features_target,
+                            train_test)
+
+EDA_PATH = 'data/data_eda.csv'
+REPORT_DIR = 'data/report'
+SCATTER_MODELS = {'linear': MODEL_PATHS['linear'], 'rf': RF_MODEL_PATH, 'xgb': MODEL_PATHS['xgb'],
+                  'catboost': MODEL_PATHS['catboost']}
+
+
+# Every chart variant of the EDA and Modeling pages: (key, section, figure function name, arguments, input files)
+def report_tasks():
+    tasks = [
+        ('eda-yearly', 'eda', 'yearly_totals_figure', (), [EDA_PATH]),
+        ('eda-monthly-delta', 'eda', 'monthly_delta_figure', (), [EDA_PATH]),
+        ('eda-monthly-trends', 'eda', 'monthly_trends_figure', (), [EDA_PATH]),
+    ]
+    for option in charts.VIEW_OPTIONS:
+        slug = _slug(option)
+        tasks.append((f'eda-view-{slug}', 'eda', 'view_distribution_figure', (option,), [EDA_PATH]))
+        tasks.append((f'eda-share-{slug}', 'eda', 'casual_share_figure', (option,), [EDA_PATH]))
+    for option in charts.DAY_TYPE_OPTIONS:
+        tasks.append((f'eda-hourly-{_slug(option)}', 'eda', 'hourly_figure', (option,), [EDA_PATH]))
+    for option in charts.ANALYSIS_OPTIONS:
+        for statistic in charts.STATISTIC_OPTIONS:
+            key = f'eda-heatmap-{_slug(option)}' + ('' if statistic == "Mean" else f'-{statistic}')
+            tasks.append((key, 'eda', 'heatmap_figure', (option, statistic), [EDA_PATH]))
+    for name, path in SCATTER_MODELS.items():
+        if os.path.exists(path):
+            tasks.append((f'modeling-scatter-{name}', 'modeling', 'prediction_scatter_figure', (name,),
+                          [DATA_CLEANED_PATH, path]))
+    return tasks
+
+
+def _slug(option):
+    return ''.join(c if c.isalnum() else '-' for c in option.lower()).strip('-')
+
+
+# Hash of the bytes of a file
+@functools.lru_cache(maxsize=None)
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Source files of the chart code: charts.py and the utils modules it uses, directly or through each other
+@functools.lru_cache(maxsize=None)
+def _chart_sources():
+    seen, pending = set(), [charts.__name__]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        for value in vars(sys.modules[name]).values():
+            module = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+            if isinstance(module, str) and module.startswith('utils.') and module in sys.modules:
+                pending.append(module)
+    return tuple(sorted(sys.modules[name].__file__ for name in seen))
+
+
+# A figure is re-rendered only when its inputs, the chart code or the plotly version change
+def fingerprint(task, png):
+    key, _, function, args, inputs = task
+    digest = hashlib.sha1(json.dumps([key, function, args, png, plotly.__version__]).encode())
+    for path in inputs + list(_chart_sources()):
+        digest.update(_file_hash(path).encode())
+    return digest.hexdigest()[:16]
+
+
+# Inputs, loaded once per worker process
+@functools.lru_cache(maxsize=None)
+def _eda_data():
+    return pd.read_csv(EDA_PATH, parse_dates=['dteday']).set_index('dteday')
+
+
+@functools.lru_cache(maxsize=None)
+def _test_split():
+    X, y = split_features_target(load_cleaned_data())
+    _, X_test, _, y_test = train_test(X, y)
+    return X_test, y_test
+
+
+# Worker: build one figure with the page code and write it as an HTML fragment (and a PNG if asked)
+def render(task, output_dir, png):
+    key, section, function, args, _ = task
+    start = time.perf_counter()
+    metrics = None
+    if section == 'eda':
+        fig = getattr(charts, function)(_eda_data(), *args)
+    else:
+        X_test, y_test = _test_split()
+        y_pred = joblib.load(SCATTER_MODELS[args[0]]).predict(X_test)
+        fig = charts.prediction_scatter_figure(y_test, y_pred, args[0])
+        metrics = {'MAE': mean_absolute_error(y_test, y_pred), 'MSE': mean_squared_error(y_test, y_pred),
+                   'R2': r2_score(y_test, y_pred)}
+
+    with open(os.path.join(output_dir, 'figures', f'{key}.html'), 'w', encoding='utf-8') as f:
+        f.write(fig.to_html(full_html=False, include_plotlyjs=False))
+    if png:
+        fig.write_image(os.path.join(output_dir, 'figures', f'{key}.png'), width=900, height=500)
+    return key, time.perf_counter() - start, metrics
+
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Bike-Sharing Report</title>
+<script src="plotly.min.js"></script>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+.grid {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(600px, 1fr)); gap: 1em; }}
+table {{ border-collapse: collapse; }} th, td {{ padding: 6px 12px; border: 1px solid #ddd; text-align: center; }}
+</style></head>
+<body>
+<h1>Bike-Sharing Report</h1>
+<p>Generated {generated} from {sources}.</p>
+<h2>Exploratory Data Analysis</h2>
+<div class="grid">{eda}</div>
+<h2>Modeling</h2>
+{metrics}
+<div class="grid">{modeling}</div>
+</body></html>
+"""
+
+
+# index.html with every fragment inlined; plotly.js is copied next to it so the bundle works offline
+def write_index(output_dir, tasks, manifest):
+    fragments = {'eda': [], 'modeling': []}
+    for key, section, *_ in tasks:
+        with open(os.path.join(output_dir, 'figures', f'{key}.html'), encoding='utf-8') as f:
+            fragments[section].append(f'<div>{f.read()}</div>')
+
+    rows = [(charts.MODEL_TITLES[key.rsplit('-', 1)[-1]], entry['metrics']) for key, entry in manifest.items()
+            if entry.get('metrics')]
+    metrics = ''
+    if rows:
+        metrics = '<table><tr><th>Model</th><th>MAE</th><th>MSE</th><th>R²</th></tr>' + ''.join(
+            f"<tr><td>{html.escape(name)}</td><td>{m['MAE']:.2f}</td><td>{m['MSE']:.2f}</td><td>{m['R2']:.2f}</td></tr>"
+            for name, m in rows) + '</table>'
+
+    plotly_js = os.path.join(os.path.dirname(plotly.__file__), 'package_data', 'plotly.min.js')
+    shutil.copyfile(plotly_js, os.path.join(output_dir, 'plotly.min.js'))
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(_PAGE.format(generated=time.strftime('%Y-%m-%d %H:%M'), sources=', '.join([EDA_PATH, DATA_CLEANED_PATH]),
+                             eda='\n'.join(fragments['eda']), metrics=metrics, modeling='\n'.join(fragments['modeling'])))
+
+
+# Render the figures whose fingerprint changed in a process pool, then assemble the bundle
+def build_report(output_dir=REPORT_DIR, workers=None, png=False, force=False):
+    os.makedirs(os.path.join(output_dir, 'figures'), exist_ok=True)
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    tasks = report_tasks()
+    fingerprints = {task[0]: fingerprint(task, png) for task in tasks}
+    stale = [task for task in tasks
+             if manifest.get(task[0], {}).get('fingerprint') != fingerprints[task[0]]
+             or not os.path.exists(os.path.join(output_dir, 'figures', f'{task[0]}.html'))]
+
+    timings = {}
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for key, seconds, metrics in pool.map(render, stale, [output_dir] * len(stale), [png] * len(stale)):
+                manifest[key] = {'fingerprint': fingerprints[key], 'metrics': metrics}
+                timings[key] = seconds
+
+    # Drop figures that are no longer part of the report (e.g. a model file was removed)
+    manifest = {task[0]: manifest[task[0]] for task in tasks}
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    write_index(output_dir, tasks, manifest)
+    return len(tasks), timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render every EDA and Modeling chart into an offline HTML report.")
+    parser.add_argument('--output', default=REPORT_DIR)
+    parser.add_argument('--workers', type=int, help="Processes, default one per CPU")
+    parser.add_argument('--png', action='store_true', help="Also write PNG files (needs the kaleido package)")
+    parser.add_argument('--force', action='store_true', help="Re-render every figure")
+    args = parser.parse_args()
+
+    if args.png:
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            parser.error("--png needs the kaleido package: pip install kaleido")
+
+    start = time.perf_counter()
+    total, timings = build_report(args.output, args.workers, args.png, args.force)
+    print(f"{len(timings)} of {total} figures rendered, {total - len(timings)} unchanged; "
+          f"{time.perf_counter() - start:.1f}s wall, {sum(timings.values()):.1f}s of rendering")
+    print(f"Open {os.path.join(args.output, 'index.html')}")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
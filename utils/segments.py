@@ -0,0 +1,156 @@
+# import libraries
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, r2_score
+
+from utils.modeling import (FLEET_PATH, load_cleaned_data, load_model, split_features_target,
+                            train_test, unwrap_pipeline)
+
+# Hour bands used to split working and non-working days
+HOUR_BANDS = {
+    'night': range(0, 6),
+    'morning_peak': range(6, 10),
+    'midday': range(10, 16),
+    'evening_peak': range(16, 20),
+    'evening': range(20, 24),
+}
+HOUR_TO_BAND = {hour: band for band, hours in HOUR_BANDS.items() for hour in hours}
+
+
+# Recover the hour of day from the sin/cos encoding (the cleaned data has no raw `hr` column)
+def hour_of_day(X):
+    angle = np.arctan2(X['hr_sin'].to_numpy(dtype=float), X['hr_cos'].to_numpy(dtype=float))
+    return np.rint(angle * 24 / (2 * np.pi)).astype(int) % 24
+
+
+def _segment_workingday_hour(X):
+    bands = pd.Series(hour_of_day(X)).map(HOUR_TO_BAND)
+    day_type = pd.Series(np.where(X['workingday'].to_numpy() == 1, 'working', 'off'))
+    return (day_type + '_' + bands).to_numpy()
+
+
+def _segment_season(X):
+    return 'season_' + X['season'].astype(int).astype(str).to_numpy()
+
+
+# Available ways to split the rows into segments
+SEGMENTERS = {
+    'workingday_hour': _segment_workingday_hour,
+    'season': _segment_season,
+}
+
+
+# Limit the threads of one fleet member so that parallel training does not oversubscribe the cores
+def _single_threaded(pipeline):
+    model = pipeline.steps[-1][1]
+    model_type = type(model).__name__
+    if model_type == 'CatBoostRegressor':
+        pipeline.set_params(model__thread_count=1)
+    elif model_type == 'XGBRegressor':
+        pipeline.set_params(model__n_jobs=1)
+    return pipeline
+
+
+def _fit_member(pipeline, X, y):
+    return _single_threaded(clone(pipeline)).fit(X, y)
+
+
+# A fleet of pipelines, one per segment, with the global model as fallback for unseen segments
+class SegmentedModel:
+    def __init__(self, base_model, segmenter='workingday_hour', n_jobs=-1):
+        self.base_model = base_model
+        self.segmenter = segmenter
+        self.n_jobs = n_jobs
+
+    def fit(self, X, y):
+        self.feature_names_in_ = list(X.columns)
+        segments = SEGMENTERS[self.segmenter](X)
+        keys = sorted(set(segments))
+
+        # Train one pipeline per segment in parallel
+        base = unwrap_pipeline(self.base_model)
+        members = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_member)(base, X[segments == key], y[segments == key]) for key in keys
+        )
+        self.models_ = dict(zip(keys, members))
+        return self
+
+    def predict(self, X):
+        X = X[self.feature_names_in_]
+        segments = SEGMENTERS[self.segmenter](X)
+        predictions = np.empty(len(X), dtype=float)
+
+        # Score the batch grouped by segment: one predict call per segment instead of per row
+        keys, inverse = np.unique(segments, return_inverse=True)
+        for i, key in enumerate(keys):
+            rows = np.flatnonzero(inverse == i)
+            model = self.models_.get(key, self.base_model)
+            predictions[rows] = model.predict(X.iloc[rows])
+        return predictions
+
+
+# Rows per second of a model on a batch of rows
+def _throughput(model, X, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(X)
+        best = min(best, time.perf_counter() - start)
+    return len(X) / best
+
+
+# Train the single model and the fleet on the same split and compare them
+def main():
+    parser = argparse.ArgumentParser(description="Train a per-segment CatBoost fleet and compare it with the single model.")
+    parser.add_argument('--segmenter', choices=sorted(SEGMENTERS), default='workingday_hour')
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--scoring-rows', type=int, default=100_000, help="Batch size used to measure inference throughput")
+    parser.add_argument('--save', action='store_true', help=f"Store the fleet at {FLEET_PATH}")
+    args = parser.parse_args()
+
+    # - Load data and the global model
+    X, y = split_features_target(load_cleaned_data())
+    X_train, X_test, y_train, y_test = train_test(X, y)
+    base = unwrap_pipeline(load_model('catboost'))
+
+    # 1. Single model retrained on the same split
+    start = time.perf_counter()
+    single = clone(base).fit(X_train, y_train)
+    single_seconds = time.perf_counter() - start
+
+    # 2. Fleet of per-segment models
+    start = time.perf_counter()
+    fleet = SegmentedModel(single, args.segmenter, args.n_jobs).fit(X_train, y_train)
+    fleet_seconds = time.perf_counter() - start
+
+    # 3. Accuracy on the test split and throughput on a large batch
+    repeats = -(-args.scoring_rows // len(X_test))
+    X_batch = pd.concat([X_test] * repeats).iloc[:args.scoring_rows]
+
+    rows = []
+    for name, model, seconds in [('single', single, single_seconds), (f'fleet ({len(fleet.models_)} segments)', fleet, fleet_seconds)]:
+        y_pred = model.predict(X_test)
+        rows.append({
+            'model': name,
+            'train_seconds': round(seconds, 2),
+            'rows_per_second': int(_throughput(model, X_batch)),
+            'mae': round(mean_absolute_error(y_test, y_pred), 2),
+            'r2': round(r2_score(y_test, y_pred), 4),
+        })
+    print(pd.DataFrame(rows).to_string(index=False))
+
+    if args.save:
+        joblib.dump(fleet, FLEET_PATH)
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    # Run from the imported module so the pickled fleet refers to utils.segments.SegmentedModel, not __main__
+    from utils.segments import main
+    main()
@@ -0,0 +1,120 @@
+# import libraries
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+
+from utils.modeling import load_cleaned_data, split_features_target, unwrap_pipeline
+
+# Default location of the materialized feature matrix
+MATRIX_DIR = 'data/feature_matrix'
+
+
+# Rows stored after the shuffled matrix so the training rows of every fold are one contiguous slice: with
+# n_splits folds the last fold starts at rows - rows // n_splits, and its training rows wrap around up to there
+def ring_rows(rows, n_splits):
+    return rows + rows - rows // n_splits
+
+
+# Write X and y once as contiguous float32 .npy files plus a manifest with the column names. The rows are
+# shuffled once and written as a ring (the shuffled rows followed by their first ones again), so every fold of
+# cross_validate() is a pair of slices of the files and the workers never copy the rows they read.
+def materialize(data, matrix_dir=MATRIX_DIR, n_splits=5, random_state=42):
+    os.makedirs(matrix_dir, exist_ok=True)
+    X, y = split_features_target(data)
+    order = np.random.default_rng(random_state).permutation(len(X))
+    ring = np.concatenate([order, order[:ring_rows(len(X), n_splits) - len(X)]])
+
+    X_file = np.lib.format.open_memmap(os.path.join(matrix_dir, 'X.npy'), mode='w+', dtype=np.float32,
+                                       shape=(len(ring), X.shape[1]))
+    # Fill column by column so no full float64 copy of the frame is created
+    for i, column in enumerate(X.columns):
+        X_file[:, i] = X[column].to_numpy(dtype=np.float32)[ring]
+    X_file.flush()
+    del X_file
+
+    np.save(os.path.join(matrix_dir, 'y.npy'), y.to_numpy(dtype=np.float32)[ring])
+
+    manifest = {
+        'columns': list(X.columns),
+        'target': y.name,
+        'rows': len(X),
+        'ring_rows': len(ring),
+        'n_splits': n_splits,
+        'random_state': random_state,
+        'dtype': 'float32',
+        'start': str(data.index.min()),
+        'end': str(data.index.max()),
+    }
+    with open(os.path.join(matrix_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# Attach to a materialized matrix without copying: the arrays are read-only memory maps of the whole ring,
+# the shuffled data set is X[:manifest['rows']]
+def attach(matrix_dir=MATRIX_DIR):
+    with open(os.path.join(matrix_dir, 'manifest.json')) as f:
+        manifest = json.load(f)
+    X = np.load(os.path.join(matrix_dir, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(matrix_dir, 'y.npy'), mmap_mode='r')
+    return X, y, manifest
+
+
+# Per-process state of the workers, filled once by the pool initializer
+_worker = {}
+
+
+def _attach_worker(matrix_dir):
+    _worker['X'], _worker['y'], manifest = attach(matrix_dir)
+    _worker['columns'] = manifest['columns']
+
+
+# Fit a fresh copy of the pipeline on one fold and score it; only two slices travel between processes and the
+# frames passed to the pipeline are views of the memory map
+def _fit_and_score(pipeline, train, test):
+    X, y, columns = _worker['X'], _worker['y'], _worker['columns']
+    model = clone(pipeline)
+    model.fit(pd.DataFrame(X[train], columns=columns, copy=False), y[train])
+    y_pred = model.predict(pd.DataFrame(X[test], columns=columns, copy=False))
+    return float(r2_score(y[test], y_pred))
+
+
+# Folds as (train, test) slices of the ring, in the same sizes as KFold(n_splits) on the shuffled rows: the test
+# rows of fold i are one block and its training rows are the n_rows - len(test) rows after it
+def fold_slices(n_rows, n_splits=5):
+    sizes = np.full(n_splits, n_rows // n_splits)
+    sizes[:n_rows % n_splits] += 1
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    return [(slice(int(start + size), int(start + n_rows)), slice(int(start), int(start + size)))
+            for start, size in zip(starts, sizes)]
+
+
+# Cross-validate a pipeline with every worker attached to the same memory-mapped matrix
+def cross_validate(pipeline, matrix_dir=MATRIX_DIR, n_splits=None, n_workers=None, mp_context=None):
+    pipeline = unwrap_pipeline(pipeline)
+    _, _, manifest = attach(matrix_dir)
+    n_splits = n_splits or manifest['n_splits']
+    if ring_rows(manifest['rows'], n_splits) > manifest['ring_rows']:
+        raise ValueError(f"{matrix_dir} was materialized for at most {manifest['n_splits']} folds, not {n_splits}")
+    folds = fold_slices(manifest['rows'], n_splits)
+
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp_context,
+                             initializer=_attach_worker, initargs=(matrix_dir,)) as pool:
+        futures = [pool.submit(_fit_and_score, pipeline, train, test) for train, test in folds]
+        return [future.result() for future in futures]
+
+
+# Materialize data_cleaned.csv into the default location
+def main():
+    manifest = materialize(load_cleaned_data())
+    print(f"Wrote {manifest['rows']:,} rows x {len(manifest['columns'])} columns to {MATRIX_DIR}")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
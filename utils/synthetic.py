@@ -0,0 +1,195 @@
+# import libraries
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from utils.calendar_table import lookup
+
+# Columns of hour.csv; a `city` column is added in front of them when more than one city is generated
+COLUMNS = ['instant', 'dteday', 'season', 'yr', 'mnth', 'hr', 'holiday', 'weekday', 'workingday', 'weathersit',
+           'temp', 'atemp', 'hum', 'windspeed', 'casual', 'registered', 'cnt']
+USER_TYPES = ['casual', 'registered']
+TEMP_BINS = np.linspace(0, 1, 21)
+
+
+# Statistics of hour.csv that drive the generator: climate per month and hour, a weather Markov chain per season,
+# and multiplicative demand factors per user type (day type x hour, temperature, weather, month, yearly growth)
+def fit_profile(path='data/hour.csv'):
+    data = pd.read_csv(path, parse_dates=['dteday'])
+    profile = {}
+
+    # Temperature: mean per month x hour, AR(1) anomaly around it
+    temp_mean = data.groupby(['mnth', 'hr'])['temp'].mean().unstack().to_numpy()
+    anomaly = data['temp'].to_numpy() - temp_mean[data['mnth'] - 1, data['hr']]
+    profile['temp_mean'] = temp_mean
+    profile['temp_phi'] = float(np.corrcoef(anomaly[:-1], anomaly[1:])[0, 1])
+    profile['temp_noise'] = float(anomaly.std() * np.sqrt(1 - profile['temp_phi'] ** 2))
+    profile['atemp_fit'] = np.polyfit(data['temp'], data['atemp'], 1)
+
+    # Weather situation: hourly transition matrix per season (codes 1-4)
+    current, following = data['weathersit'].to_numpy()[:-1], data['weathersit'].to_numpy()[1:]
+    season = data['season'].to_numpy()[:-1]
+    transitions = np.ones((4, 4, 4))  # add-one smoothing keeps rare transitions possible
+    np.add.at(transitions, (season - 1, current - 1, following - 1), 1)
+    profile['weather_cum'] = np.cumsum(transitions / transitions.sum(axis=2, keepdims=True), axis=2)
+
+    # Humidity and wind speed per weather situation
+    profile['hum'] = data.groupby('weathersit')['hum'].agg(['mean', 'std']).reindex(range(1, 5)).ffill().to_numpy()
+    profile['wind'] = data.groupby('weathersit')['windspeed'].agg(['mean', 'std']).reindex(range(1, 5)).ffill().to_numpy()
+
+    # Demand factors, fitted one after the other on the remaining ratio
+    temp_bin = np.clip(np.digitize(data['temp'], TEMP_BINS) - 1, 0, len(TEMP_BINS) - 2)
+    for user in USER_TYPES:
+        counts = data[user].astype(float)
+        base = data.groupby(['workingday', 'hr'])[user].transform('mean')
+        ratio = counts / base.clip(lower=1e-9)
+        factors = {'base': data.groupby(['workingday', 'hr'])[user].mean().unstack().to_numpy()}
+        for name, key, size in [('temp', temp_bin, len(TEMP_BINS) - 1), ('weather', data['weathersit'] - 1, 4),
+                                ('month', data['mnth'] - 1, 12)]:
+            factor = ratio.groupby(np.asarray(key)).mean().reindex(range(size)).interpolate().bfill().ffill().to_numpy()
+            factors[name] = factor
+            ratio = ratio / factor[np.asarray(key)]
+        by_year = ratio.groupby(data['yr']).mean()
+        factors['growth'] = float(by_year.iloc[-1] / by_year.iloc[0])
+        factors['year0'] = float(by_year.iloc[0])
+        profile[user] = factors
+
+    # Over-dispersion of the counts (gamma-Poisson shape)
+    profile['dispersion'] = 8.0
+    return profile
+
+
+# Demand growth relative to the first year: the observed 2011 -> 2012 growth in the second year, then slowing
+# down so that long runs level off at twice that growth instead of compounding without limit
+def _growth(growth, year_index):
+    return growth ** (2 * (1 - 0.5 ** year_index))
+
+
+# Generate one year for a block of cities at once: arrays of shape (cities, hours), looping over hours only
+# for the weather Markov chain
+def generate_year(profile, year, year_index, city_scales, rng):
+    timestamps = pd.date_range(f'{year}-01-01', f'{year}-12-31 23:00', freq='h')
+    n_cities, n_hours = len(city_scales), len(timestamps)
+
+    # Calendar columns from the shared calendar table, so the holidays and seasons match the app's
+    calendar = lookup(timestamps, ['season', 'mnth', 'hr', 'weekday', 'holiday', 'workingday'])
+    season, mnth, hr, weekday, holiday, workingday = (calendar[name].to_numpy().astype(np.int64) for name in
+                                                      ['season', 'mnth', 'hr', 'weekday', 'holiday', 'workingday'])
+
+    # Weather situation: Markov chain per city
+    weathersit = np.empty((n_cities, n_hours), dtype=np.int64)
+    state = np.zeros(n_cities, dtype=np.int64)
+    uniform = rng.random((n_cities, n_hours))
+    cum = profile['weather_cum']
+    for h in range(n_hours):
+        state = np.minimum((uniform[:, h, None] > cum[season[h] - 1, state]).sum(axis=1), 3)
+        weathersit[:, h] = state
+    weathersit += 1
+
+    # Temperature around the monthly/hourly climate with an AR(1) anomaly, then the other weather variables
+    shocks = rng.normal(0, profile['temp_noise'], (n_cities, n_hours))
+    anomaly = lfilter([1.0], [1.0, -profile['temp_phi']], shocks, axis=1)
+    temp = np.clip(profile['temp_mean'][mnth - 1, hr] + anomaly, 0.02, 1.0)
+    atemp = np.clip(np.polyval(profile['atemp_fit'], temp) + rng.normal(0, 0.02, temp.shape), 0.0, 1.0)
+    hum_stats, wind_stats = profile['hum'][weathersit - 1], profile['wind'][weathersit - 1]
+    hum = np.clip(rng.normal(hum_stats[..., 0], hum_stats[..., 1]), 0.0, 1.0)
+    windspeed = np.clip(rng.normal(wind_stats[..., 0], wind_stats[..., 1]), 0.0, 0.85)
+
+    # Demand per user type: product of the fitted factors, gamma-Poisson noise around it
+    temp_bin = np.clip(np.digitize(temp, TEMP_BINS) - 1, 0, len(TEMP_BINS) - 2)
+    counts = {}
+    for user in USER_TYPES:
+        factors = profile[user]
+        expected = (factors['base'][workingday, hr] * factors['month'][mnth - 1]
+                    * factors['temp'][temp_bin] * factors['weather'][weathersit - 1]
+                    * factors['year0'] * _growth(factors['growth'], year_index) * city_scales[:, None])
+        shape = profile['dispersion']
+        counts[user] = rng.poisson(expected * rng.gamma(shape, 1 / shape, expected.shape))
+
+    # Flatten city by city, with the calendar columns repeated per city
+    def tile(values):
+        return np.tile(values, n_cities)
+
+    return pd.DataFrame({
+        'dteday': tile(timestamps.strftime('%Y-%m-%d').to_numpy()),
+        'season': tile(season),
+        'yr': year_index,
+        'mnth': tile(mnth),
+        'hr': tile(hr),
+        'holiday': tile(holiday),
+        'weekday': tile(weekday),
+        'workingday': tile(workingday),
+        'weathersit': weathersit.ravel(),
+        'temp': temp.ravel().round(2),
+        'atemp': atemp.ravel().round(4),
+        'hum': hum.ravel().round(2),
+        'windspeed': windspeed.ravel().round(4),
+        'casual': counts['casual'].ravel(),
+        'registered': counts['registered'].ravel(),
+        'cnt': (counts['casual'] + counts['registered']).ravel(),
+    })
+
+
+# Generate `years` x `cities` of hourly data chunk by chunk (one year for a block of cities per chunk)
+def generate(years=2, cities=1, start_year=2011, seed=0, cities_per_chunk=256, missing_rate=0.0, profile=None):
+    profile = fit_profile() if profile is None else profile
+    rng = np.random.default_rng(seed)
+    city_scales = np.ones(cities) if cities == 1 else rng.lognormal(0, 0.5, cities)
+
+    instant = 1
+    for first_city in range(0, cities, cities_per_chunk):
+        block = np.arange(first_city, min(first_city + cities_per_chunk, cities))
+        for year_index in range(years):
+            chunk = generate_year(profile, start_year + year_index, year_index, city_scales[block], rng)
+            if cities > 1:
+                chunk.insert(0, 'city', np.repeat(block, len(chunk) // len(block)))
+            if missing_rate:
+                chunk = chunk[rng.random(len(chunk)) >= missing_rate]
+            chunk['instant'] = np.arange(instant, instant + len(chunk))
+            instant += len(chunk)
+            yield chunk[(['city'] if cities > 1 else []) + COLUMNS]
+
+
+# Write the chunks as one CSV (same format as hour.csv) or as a folder of parquet files
+def write(chunks, output, file_format='csv'):
+    rows = 0
+    if file_format == 'csv':
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(output, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            rows += len(chunk)
+    else:
+        os.makedirs(output, exist_ok=True)
+        for i, chunk in enumerate(chunks):
+            chunk.to_parquet(os.path.join(output, f'part-{i:05d}.parquet'), index=False)
+            rows += len(chunk)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic hourly bike-sharing data with the schema of hour.csv.")
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--cities', type=int, default=1)
+    parser.add_argument('--start-year', type=int, default=2011)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cities-per-chunk', type=int, default=256, help="Cities generated together; bounds memory per chunk")
+    parser.add_argument('--missing-rate', type=float, default=0.0, help="Share of hours dropped at random, like the gaps in hour.csv")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--output', default='data/synthetic/hour.csv', help="CSV file, or folder for parquet")
+    args = parser.parse_args()
+
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    start = time.perf_counter()
+    chunks = generate(args.years, args.cities, args.start_year, args.seed, args.cities_per_chunk, args.missing_rate)
+    rows = write(chunks, args.output, args.format)
+    seconds = time.perf_counter() - start
+    print(f"Wrote {rows:,} rows to {args.output} in {seconds:.1f}s ({rows / seconds:,.0f} rows/s)")
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# import libraries
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.calendar_table import HOUR_NS, lookup
+from utils.cleaning import RAW_DATA_PATH
+
+# Whole-column checks on the raw hour.csv schema: allowed ranges of the normalized weather and the counts,
+# allowed codes of the categorical columns
+RANGES = {
+    'temp': (0.0, 1.0), 'atemp': (0.0, 1.0), 'hum': (0.0, 1.0), 'windspeed': (0.0, 1.0),
+    'casual': (0, None), 'registered': (0, None), 'cnt': (0, None),
+}
+CODES = {
+    'season': [1, 2, 3, 4], 'weathersit': [1, 2, 3, 4], 'weekday': list(range(7)), 'mnth': list(range(1, 13)),
+    'hr': list(range(24)), 'holiday': [0, 1], 'workingday': [0, 1],
+}
+CALENDAR_COLUMNS = ['season', 'yr', 'mnth', 'hr', 'weekday', 'holiday', 'workingday']
+WEATHER_COLUMNS = ['temp', 'atemp', 'hum', 'windspeed']
+COUNT_COLUMNS = ['casual', 'registered', 'cnt']
+
+COUNT_FILLS = ['zero', 'interpolate']
+WEATHER_FILLS = ['ffill', 'interpolate']
+
+# Row indices kept per failed check in the report
+EXAMPLES = 3
+
+
+# First row of each run of equal values and the run lengths; strings of a time-ordered file repeat row after row,
+# so per-value work is done once per run. None when most runs are single rows and this would not pay off.
+def _runs(values):
+    changed = np.ones(len(values), dtype=bool)
+    np.not_equal(values[1:], values[:-1], out=changed[1:])
+    starts = np.flatnonzero(changed)
+    if len(starts) > len(values) // 2:
+        return None
+    return starts, np.diff(np.append(starts, len(values)))
+
+
+# Hours since the epoch of every row, from the date column and `hr`. Date strings are parsed once per distinct
+# date (found among the run starts in time-ordered files); they still cost about 0.3 s per 10M time-ordered rows
+# (0.9 s unordered) against 0.05 s for a parsed datetime column, so read large files with parse_dates=['dteday'].
+def hour_numbers(data):
+    dates = data['dteday']
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        nanoseconds = dates.to_numpy('datetime64[ns]').view(np.int64)
+    else:
+        values = dates.to_numpy()
+        runs = _runs(values)
+        if runs is None:
+            codes, distinct = pd.factorize(values)
+        else:
+            codes, distinct = pd.factorize(values[runs[0]])
+            codes = np.repeat(codes, runs[1])
+        nanoseconds = pd.to_datetime(distinct, format='%Y-%m-%d').asi8[codes]
+    return nanoseconds // HOUR_NS + data['hr'].to_numpy()
+
+
+# Missing values of a column; string columns are checked once per run of equal values (NaN never equals itself,
+# so every missing value starts its own run)
+def _nulls(column):
+    values = column.to_numpy()
+    runs = _runs(values) if values.dtype == object else None
+    if runs is None:
+        return column.isna().to_numpy()
+    return np.repeat(pd.isna(values[runs[0]]), runs[1])
+
+
+# Dense key per row (city * span + hour offset) over the complete hourly index from `start` to `end`;
+# rows outside that window get -1
+def _hour_keys(data, start=None, end=None):
+    hours = hour_numbers(data)
+    first = hours.min() if start is None else pd.Timestamp(start).value // HOUR_NS
+    last = hours.max() if end is None else pd.Timestamp(end).value // HOUR_NS
+    span = int(last - first + 1)
+    if 'city' in data.columns:
+        cities, codes = _factorize(data['city'].to_numpy())
+    else:
+        cities, codes = np.array([None]), np.zeros(len(data), dtype=np.int64)
+    keys = codes * span + (hours - first)
+    if start is not None or end is not None:
+        keys[(hours < first) | (hours > last)] = -1
+    return keys, cities, int(first), span
+
+
+# Sorted distinct cities and the position of each row's city; integer ids by counting instead of sorting
+def _factorize(values):
+    if np.issubdtype(values.dtype, np.integer):
+        low = values.min()
+        offsets = values - low
+        present = np.bincount(offsets) > 0
+        if present.all():  # ids already dense
+            return np.arange(low, low + len(present)), offsets
+        return np.flatnonzero(present) + low, (np.cumsum(present) - 1)[offsets]
+    codes, cities = pd.factorize(values, sort=True)
+    return np.asarray(cities), codes
+
+
+# Number of runs of consecutive missing hours per city and the longest ones: (city, first missing hour, hours)
+def _gaps(counts, cities, first, span, longest):
+    slots = np.flatnonzero(counts == 0)
+    # A gap starts at a missing slot that does not follow a missing slot of the same city
+    new = np.ones(len(slots), dtype=bool)
+    new[1:] = (np.diff(slots) != 1) | (slots[1:] % span == 0)
+    starts = np.flatnonzero(new)
+    lengths = np.diff(np.append(starts, len(slots)))
+    top = np.argsort(-lengths, kind='stable')[:longest]
+    return len(starts), [(cities[slots[starts[i]] // span], pd.Timestamp((first + slots[starts[i]] % span) * HOUR_NS),
+                          int(lengths[i])) for i in top]
+
+
+# Codes outside [min, max] in one unsigned comparison (negative offsets wrap around), then the holes of that
+# interval if the codes are not contiguous
+def _invalid_codes(values, codes):
+    low, high = min(codes), max(codes)
+    offsets = (values - low).astype(np.int64).view(np.uint64)
+    invalid = offsets > high - low
+    if len(set(codes)) < high - low + 1:
+        allowed = np.zeros(high - low + 2, dtype=bool)
+        allowed[np.array(codes) - low] = True
+        invalid |= ~allowed[np.minimum(offsets, high - low + 1)]
+    return invalid
+
+
+def _failed(mask):
+    failed = int(np.count_nonzero(mask))
+    return {'failed': failed, 'examples': np.flatnonzero(mask)[:EXAMPLES].tolist() if failed else []}
+
+
+# Validate a frame in the raw hour.csv schema (optionally with a `city` column). Every check is one vectorized
+# pass over its columns; missing hours are found by counting rows per slot of the complete hourly index and fail
+# the validation unless allow_gaps is set.
+def validate(data, start=None, end=None, max_gaps=5, allow_gaps=False):
+    checks = {}
+    nulls = np.zeros(len(data), dtype=bool)
+    for column in data.columns:
+        if not pd.api.types.is_integer_dtype(data[column]):  # integer columns cannot hold missing values
+            nulls |= _nulls(data[column])
+    checks['nulls'] = _failed(nulls)
+
+    for column, (low, high) in RANGES.items():
+        if column in data.columns:
+            values = data[column].to_numpy()
+            bad = (values < low) if high is None else (values < low) | (values > high)
+            checks[f'range.{column}'] = _failed(bad)
+    for column, codes in CODES.items():
+        if column in data.columns:
+            checks[f'codes.{column}'] = _failed(_invalid_codes(data[column].to_numpy(), codes))
+    checks['sum.casual+registered=cnt'] = _failed(
+        data['casual'].to_numpy() + data['registered'].to_numpy() != data['cnt'].to_numpy())
+
+    keys, cities, first, span = _hour_keys(data, start, end)
+    counts = np.bincount(keys[keys >= 0], minlength=len(cities) * span)
+    duplicated = counts > 1
+    if duplicated.any():
+        checks['duplicates'] = _failed(duplicated[np.maximum(keys, 0)] & (keys >= 0))
+    else:
+        checks['duplicates'] = _failed(duplicated[:0])
+    if start is not None or end is not None:
+        checks['outside_window'] = _failed(keys < 0)
+
+    n_gaps, longest_gaps = _gaps(counts, cities, first, span, max_gaps)
+    missing_hours = int((counts == 0).sum())
+    return {
+        'rows': len(data),
+        'cities': len(cities),
+        'expected_rows': len(cities) * span,
+        'missing_hours': missing_hours,
+        'gaps': n_gaps,
+        'longest_gaps': [{'city': city.item() if isinstance(city, np.generic) else city, 'start': str(start),
+                          'hours': hours} for city, start, hours in longest_gaps],
+        'checks': checks,
+        'passed': all(check['failed'] == 0 for check in checks.values()) and (allow_gaps or missing_hours == 0),
+    }
+
+
+# Compact report: one line per failed check, then the missing hours
+def format_report(report):
+    lines = [f"{report['rows']:,} rows, {report['cities']} cities, {report['expected_rows']:,} expected hours: "
+             f"{'passed' if report['passed'] else 'FAILED'}"]
+    for name, check in report['checks'].items():
+        if check['failed']:
+            lines.append(f"  {name:<28} {check['failed']:>10,} rows  e.g. rows {check['examples']}")
+    lines.append(f"  {'missing hours':<28} {report['missing_hours']:>10,} in {report['gaps']:,} gaps")
+    for gap in report['longest_gaps']:
+        city = '' if gap['city'] is None else f"city {gap['city']}, "
+        lines.append(f"    {city}{gap['start']}: {gap['hours']} h")
+    return '\n'.join(lines)
+
+
+# Per-city fill of a (cities x hours) block: forward fill or linear interpolation along the hours
+def _fill_block(values, method):
+    block = pd.DataFrame(values.T)
+    if method == 'ffill':
+        block = block.ffill().bfill()
+    else:
+        block = block.interpolate(limit_direction='both')
+    return block.to_numpy().T.ravel()
+
+
+# Reindex to the complete hourly index and fill the missing hours: calendar columns from the calendar table,
+# counts as zero or interpolated (cnt stays casual + registered), weather forward-filled or interpolated
+# (weathersit and any other column are forward-filled). `instant` is renumbered. Built column by column.
+def fill_gaps(data, counts='zero', weather='ffill', start=None, end=None):
+    if counts not in COUNT_FILLS or weather not in WEATHER_FILLS:
+        raise ValueError(f"counts must be one of {COUNT_FILLS} and weather one of {WEATHER_FILLS}")
+    keys, cities, first, span = _hour_keys(data, start, end)
+    inside = keys >= 0
+    if not inside.all():
+        data, keys = data[inside], keys[inside]
+    total, shape = len(cities) * span, (len(cities), span)
+    missing = np.ones(total, dtype=bool)
+    missing[keys] = False
+    if total - np.count_nonzero(missing) != len(keys):
+        raise ValueError("Resolve duplicate timestamps before filling gaps")
+
+    slots = np.flatnonzero(missing)
+    timestamps = pd.DatetimeIndex((first + slots % span) * HOUR_NS)
+    calendar = lookup(timestamps, CALENDAR_COLUMNS)
+
+    columns = {}
+    for column in data.columns:
+        values = data[column].to_numpy()
+        if column in CALENDAR_COLUMNS + ['dteday', 'city', 'instant']:
+            out = np.empty(total, dtype=values.dtype)
+            out[keys] = values
+            if column in CALENDAR_COLUMNS:
+                out[slots] = calendar[column].to_numpy()
+            elif column == 'dteday':
+                dates = timestamps.normalize()
+                out[slots] = dates if values.dtype.kind == 'M' else dates.strftime('%Y-%m-%d')
+            elif column == 'city':
+                out[slots] = cities[slots // span]
+            else:
+                out = np.arange(1, total + 1)
+        else:
+            out = np.full(total, np.nan, dtype=float if values.dtype.kind in 'iufb' else object)
+            out[keys] = values
+            if column in ('casual', 'registered') and counts == 'zero':
+                out[slots] = 0
+            elif column in ('casual', 'registered'):
+                out = np.round(_fill_block(out.reshape(shape), 'interpolate'))
+            elif column in WEATHER_COLUMNS:
+                out = _fill_block(out.reshape(shape), weather)
+            elif column != 'cnt':
+                out = _fill_block(out.reshape(shape), 'ffill')
+            if values.dtype.kind in 'iu' and column != 'cnt':
+                out = out.astype(values.dtype)
+        columns[column] = out
+    columns['cnt'] = columns['casual'] + columns['registered']
+    return pd.DataFrame(columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a CSV in the hour.csv schema and optionally fill the missing hours.")
+    parser.add_argument('path', nargs='?', default=RAW_DATA_PATH)
+    parser.add_argument('--start', help="First hour of the complete index (default: first hour in the data)")
+    parser.add_argument('--end', help="Last hour of the complete index (default: last hour in the data)")
+    parser.add_argument('--fill-counts', choices=COUNT_FILLS, help="Fill the missing hours and write them to --output")
+    parser.add_argument('--fill-weather', choices=WEATHER_FILLS, default='ffill')
+    parser.add_argument('--output', help="CSV for the gap-filled data")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    parser.add_argument('--strict', action='store_true', help="Exit with status 1 when a check fails or hours are missing")
+    parser.add_argument('--allow-gaps', action='store_true',
+                        help="Do not fail on missing hours (implied by --fill-counts, which fills them)")
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.path)
+    start = time.perf_counter()
+    report = validate(data, args.start, args.end, allow_gaps=args.allow_gaps or args.fill_counts is not None)
+    seconds = time.perf_counter() - start
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    print(f"Validated in {seconds * 1000:.0f} ms")
+
+    if args.fill_counts:
+        if not args.output:
+            parser.error("--fill-counts needs --output")
+        filled = fill_gaps(data, args.fill_counts, args.fill_weather, args.start, args.end)
+        filled.to_csv(args.output, index=False)
+        print(f"Wrote {len(filled):,} rows ({len(filled) - len(data):,} filled) to {args.output}")
+
+    if args.strict and not report['passed']:
+        sys.exit(1)
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    main()
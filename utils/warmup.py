@@ -0,0 +1,140 @@
+# import libraries
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+import joblib
+import numpy as np
+
+from utils.instrumentation import cache_lookup, timed
+from utils.metadata import load_metadata
+from utils.modeling import MODEL_PATHS, load_cleaned_data, load_model, split_features_target
+
+# Models preloaded before the server starts; override with BIKE_PRELOAD_MODELS=catboost,xgb
+PRELOAD_MODELS = os.environ.get('BIKE_PRELOAD_MODELS', 'catboost,xgb,linear').split(',')
+STATUS_PATH = 'data/warmup_status.json'
+
+# Process-wide registry: Streamlit imports this module once per server process, so every session shares it
+_models = {}
+_latency = {}
+_lock = threading.Lock()
+_ready = threading.Event()
+
+
+# Representative rows: one per working/non-working day and hour of day, so every tree path family is touched once
+def representative_rows():
+    X, _ = split_features_target(load_cleaned_data())
+    groups = X.groupby([X['workingday'], X.index.hour], sort=False)
+    return X.loc[groups.head(1).index]
+
+
+# The same rows from the metadata bundle, without reading data_cleaned.csv
+def warmup_rows():
+    import pandas as pd
+
+    rows = load_metadata()['warmup_rows']
+    return pd.DataFrame(rows['data'], index=pd.DatetimeIndex(rows['index'], name='dteday'), columns=rows['columns'])
+
+
+# Load a model and run warm-up predictions, recording the cold (first call) and warm latency in milliseconds
+def load_and_warm(name, rows=None, repeats=20):
+    with timed(f'models.load.{name}') as load:
+        model = joblib.load(MODEL_PATHS[name])
+    load_ms = load.ms
+
+    rows = warmup_rows() if rows is None else rows
+    single = rows.iloc[[0]]
+
+    start = time.perf_counter()
+    model.predict(single)
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    model.predict(rows)  # touch every representative row once
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(single)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return model, {'load_ms': round(load_ms, 1), 'cold_ms': round(cold_ms, 2), 'warm_ms': round(float(np.median(timings)), 2)}
+
+
+# Preload and warm up all configured models, then mark the process as ready
+def preload(names=PRELOAD_MODELS):
+    rows = warmup_rows()
+    for name in names:
+        model, latency = load_and_warm(name, rows)
+        with _lock:
+            _models[name] = model
+            _latency[name] = latency
+    _ready.set()
+    return status()
+
+
+# Model from the registry; models that were not preloaded are only loaded on first use, without warm-up
+# predictions, so a page does not wait for them
+def get_model(name):
+    with _lock:
+        model = _models.get(name)
+    cache_lookup('models', model is not None)
+    if model is None:
+        with timed(f'models.load.{name}') as load:
+            model = load_model(name)
+        latency = {'load_ms': round(load.ms, 1)}
+        with _lock:
+            model = _models.setdefault(name, model)
+            _latency.setdefault(name, latency)
+    return model
+
+
+# Readiness of this process: True once preload() has finished
+def is_ready():
+    return _ready.is_set()
+
+
+def status():
+    with _lock:
+        return {'ready': _ready.is_set(), 'models': dict(_latency)}
+
+
+# Readiness check for a running server: Streamlit only answers its health endpoint after the warm-up
+def check(url):
+    try:
+        with urllib.request.urlopen(f"{url.rstrip('/')}/_stcore/health", timeout=5) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+# Preload the models, then start the Streamlit server in this same process so the pages find them warm
+def main():
+    parser = argparse.ArgumentParser(description="Preload and warm up the models, then start the app.")
+    parser.add_argument('--models', default=','.join(PRELOAD_MODELS), help="Comma-separated model names")
+    parser.add_argument('--check', metavar='URL', help="Only check whether the server at URL is ready")
+    args, streamlit_args = parser.parse_known_args()
+
+    if args.check:
+        ready = check(args.check)
+        print('ready' if ready else 'not ready')
+        sys.exit(0 if ready else 1)
+
+    result = preload(args.models.split(','))
+    with open(STATUS_PATH, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+
+    from streamlit.web import cli
+    sys.argv = ['streamlit', 'run', 'Home.py'] + streamlit_args
+    sys.exit(cli.main())
+
+
+# Check if the script is being run directly
+if __name__ == "__main__":
+    # Run from the imported module so the pages share this registry instead of a second copy under __main__
+    from utils.warmup import main
+    main()